@@ -0,0 +1,65 @@
+# benchmarks/e2e.py
+"""
+End-to-end /render throughput against the FastAPI app in-process
+(TestClient, no network), sequentially and from concurrent clients.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+from .harness import summarize
+from .synthetic import make_canvas
+
+
+def _render_payloads(assets: Dict[str, Any], n: int) -> List[Dict[str, Any]]:
+    bg_id = assets["backgrounds"][0]
+    payloads = []
+    for i in range(n):
+        # every third request uses an (stubbed) AI background instead of an upload
+        if i % 3 == 2:
+            canvas = make_canvas("story", seed=i, background_prompt=f"studio backdrop {i % 4}",
+                                 packshot_ids=assets["packshots"][:1])
+        else:
+            canvas = make_canvas("story", seed=i, background_id=bg_id, packshot_ids=assets["packshots"])
+        formats = ["story", "feed", "banner"] if i % 2 else None
+        payloads.append({"canvas": canvas.dict(), "formats": formats})
+    return payloads
+
+
+def _throughput(client, payloads: List[Dict[str, Any]], concurrency: int) -> Dict[str, Any]:
+    def post(payload):
+        t0 = time.perf_counter()
+        resp = client.post("/render", json=payload)
+        elapsed = time.perf_counter() - t0
+        if resp.status_code != 200:
+            raise RuntimeError(f"/render returned {resp.status_code}: {resp.text[:200]}")
+        return elapsed
+
+    started = time.perf_counter()
+    if concurrency <= 1:
+        latencies = [post(p) for p in payloads]
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            latencies = list(pool.map(post, payloads))
+    wall = time.perf_counter() - started
+
+    stats = summarize(latencies)
+    stats["concurrency"] = concurrency
+    stats["requests_per_s"] = len(payloads) / wall if wall > 0 else None
+    return stats
+
+
+def run_e2e(assets: Dict[str, Any], quick: bool = False) -> Dict[str, Dict[str, Any]]:
+    from fastapi.testclient import TestClient
+
+    from backend.main import app
+
+    n = 6 if quick else 40
+    payloads = _render_payloads(assets, n)
+    results: Dict[str, Dict[str, Any]] = {}
+    with TestClient(app) as client:
+        _throughput(client, payloads[:3], 1)  # warm-up: fonts, templates, caches
+        results["e2e /render[seq]"] = _throughput(client, payloads, 1)
+        results["e2e /render[x4]"] = _throughput(client, payloads, 4)
+    return results
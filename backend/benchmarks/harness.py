@@ -0,0 +1,166 @@
+# benchmarks/harness.py
+"""
+Timing, JSON reports and baseline comparison for the benchmark suites.
+
+A report is {"environment": {...}, "results": {name: stats}}. Comparison uses
+the median of each benchmark: ratio = current / baseline, and a ratio above
+1 + threshold is a regression. A baseline may override the threshold per
+benchmark under "thresholds" (noisy end-to-end numbers need more slack).
+"""
+
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+DEFAULT_THRESHOLD = 0.25  # 25% slower than the baseline median
+
+
+def measure(
+    fn: Callable[[], Any],
+    repeat: int = 20,
+    warmup: int = 2,
+    setup: Optional[Callable[[], Any]] = None,
+    min_time_s: float = 0.0,
+    number: int = 1,
+) -> Dict[str, Any]:
+    """
+    Take `repeat` samples (more if min_time_s hasn't elapsed) after `warmup`
+    untimed calls. A sample is `number` back-to-back calls divided by
+    `number`, like timeit, so sub-millisecond functions aren't lost in timer
+    noise. `setup` runs before every sample, untimed.
+    """
+    for _ in range(warmup):
+        if setup:
+            setup()
+        fn()
+    samples: List[float] = []
+    started = time.perf_counter()
+    while len(samples) < repeat or time.perf_counter() - started < min_time_s:
+        if setup:
+            setup()
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - t0) / number)
+    return summarize(samples)
+
+
+def summarize(samples: List[float]) -> Dict[str, Any]:
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+    median = statistics.median(ordered)
+    return {
+        "n": len(ordered),
+        "mean_s": statistics.fmean(ordered),
+        "median_s": median,
+        "p95_s": p95,
+        "min_s": ordered[0],
+        "max_s": ordered[-1],
+        "stdev_s": statistics.stdev(ordered) if len(ordered) > 1 else 0.0,
+        "ops_per_s": 1.0 / median if median > 0 else None,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, timeout=5,
+            cwd=Path(__file__).resolve().parent,
+        )
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def environment() -> Dict[str, Any]:
+    import numpy
+    import PIL
+
+    return {
+        "timestamp": datetime.utcnow().isoformat(),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "pillow": PIL.__version__,
+        "numpy": numpy.__version__,
+    }
+
+
+def build_report(results: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    return {"environment": environment(), "results": results}
+
+
+def load_report(path: Path) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_report(report: Dict[str, Any], path: Path) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def compare(
+    report: Dict[str, Any],
+    baseline: Dict[str, Any],
+    threshold: float = DEFAULT_THRESHOLD,
+    metric: str = "median_s",
+) -> List[Dict[str, Any]]:
+    """
+    One row per benchmark: {name, baseline, current, ratio, threshold, status}
+    with status "regression", "improved", "ok", "new" (not in the baseline)
+    or "missing" (in the baseline but not run).
+    """
+    overrides = baseline.get("thresholds", {})
+    current = report.get("results", {})
+    base = baseline.get("results", {})
+    rows = []
+    for name in sorted(set(current) | set(base)):
+        limit = float(overrides.get(name, threshold))
+        row = {"name": name, "baseline": None, "current": None, "ratio": None, "threshold": limit}
+        if name not in base:
+            row.update(current=current[name][metric], status="new")
+        elif name not in current:
+            row.update(baseline=base[name][metric], status="missing")
+        else:
+            b, c = base[name][metric], current[name][metric]
+            ratio = c / b if b > 0 else float("inf")
+            if ratio > 1 + limit:
+                status = "regression"
+            elif ratio < 1 / (1 + limit):
+                status = "improved"
+            else:
+                status = "ok"
+            row.update(baseline=b, current=c, ratio=ratio, status=status)
+        rows.append(row)
+    return rows
+
+
+def format_table(results: Dict[str, Dict[str, Any]], rows: Optional[List[Dict[str, Any]]] = None) -> str:
+    by_name = {r["name"]: r for r in rows or []}
+    lines = [f"{'benchmark':44} {'median':>10} {'p95':>10} {'n':>5}  vs baseline"]
+    for name in sorted(set(results) | set(by_name)):
+        stats = results.get(name)
+        row = by_name.get(name)
+        cmp = ""
+        if row is not None:
+            cmp = row["status"] if row["ratio"] is None else f"{row['ratio']:.2f}x {row['status']}"
+        if stats is None:
+            lines.append(f"{name:44} {'-':>10} {'-':>10} {'-':>5}  {cmp}")
+        else:
+            lines.append(
+                f"{name:44} {stats['median_s'] * 1000:>8.2f}ms {stats['p95_s'] * 1000:>8.2f}ms {stats['n']:>5}  {cmp}"
+            )
+    return "\n".join(lines)
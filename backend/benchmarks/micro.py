@@ -0,0 +1,71 @@
+# benchmarks/micro.py
+"""
+Per-function benchmarks of the hot paths: rule validation, autofix,
+compositing/rendering and size-limited encoding.
+"""
+
+import tempfile
+from pathlib import Path
+from typing import Any, Dict
+
+from backend.models.autofix import autofix, hill_climb_autofix
+from backend.rules.batch import validate_catalog
+from backend.rules.engine import run_rules
+from backend.utils.images import clear_image_cache, save_with_size_limit
+
+from .harness import measure
+from .synthetic import FORMAT_SIZES, make_canvas, make_catalog
+
+
+def run_micro(assets: Dict[str, Any], quick: bool = False) -> Dict[str, Dict[str, Any]]:
+    """
+    assets: ids from synthetic.write_assets (already in UPLOAD_DIR).
+    quick: fewer repeats, for a smoke run rather than stable numbers.
+    """
+    # imported here: backend.main builds the app and reads config at import
+    from backend.main import compose_canvas, load_render_assets, render_canvas_image
+
+    r = 3 if quick else 20
+    r_slow = 2 if quick else 8
+    bg_id = assets["backgrounds"][0]
+    packshots = assets["packshots"]
+    results: Dict[str, Dict[str, Any]] = {}
+
+    # -- rules -------------------------------------------------------------
+    for fmt in FORMAT_SIZES:
+        canvas = make_canvas(fmt, seed=1, n_blocks=4)
+        results[f"run_rules[{fmt}]"] = measure(lambda c=canvas: run_rules(c), repeat=r, number=200)
+    catalog = make_catalog(200, seed=7)
+    results["validate_catalog[200]"] = measure(lambda: validate_catalog(catalog), repeat=r, number=10)
+
+    # -- autofix -----------------------------------------------------------
+    # hill-climb only takes passing moves, so give it a compliant canvas to polish
+    polish = make_canvas("story", seed=3, n_blocks=4)
+    results["hill_climb_autofix[story]"] = measure(lambda: hill_climb_autofix(polish), repeat=r, number=10)
+    broken = make_canvas("story", seed=3, n_blocks=4, compliant=False)
+    results["autofix[solve]"] = measure(lambda: autofix(broken, "solve"), repeat=r, number=50)
+    results["autofix[beam]"] = measure(lambda: autofix(broken, "beam"), repeat=r_slow, warmup=1)
+
+    # -- compositing and rendering -----------------------------------------
+    for fmt in FORMAT_SIZES:
+        canvas = make_canvas(fmt, seed=2, background_id=bg_id, packshot_ids=packshots)
+        render_assets = load_render_assets(canvas)
+        results[f"compose_canvas[{fmt}]"] = measure(
+            lambda c=canvas, a=render_assets: compose_canvas(c, a), repeat=r
+        )
+        results[f"render_canvas_image[{fmt}]"] = measure(lambda c=canvas: render_canvas_image(c), repeat=r)
+    story = make_canvas("story", seed=2, background_id=bg_id, packshot_ids=packshots)
+    # cold: decoded/resized images dropped before every call
+    results["render_canvas_image[story,cold]"] = measure(
+        lambda: render_canvas_image(story), repeat=r_slow, setup=clear_image_cache
+    )
+
+    # -- encoding ----------------------------------------------------------
+    composed = compose_canvas(story, load_render_assets(story))
+    with tempfile.TemporaryDirectory() as tmp:
+        for suffix in ("jpg", "png", "webp"):
+            dest = Path(tmp) / f"out.{suffix}"
+            results[f"save_with_size_limit[{suffix}]"] = measure(
+                lambda d=dest: save_with_size_limit(composed, d), repeat=r_slow
+            )
+    return results
@@ -0,0 +1,95 @@
+# benchmarks/run.py
+"""
+Run the benchmark suites and write a JSON report, optionally comparing it
+against a stored baseline. Exits with status 1 if anything regressed.
+
+Everything runs offline: Stable Diffusion, the LLM and YOLO are stubbed
+(see stubs.py) and all data (uploads, renders, DB, logs) goes to a
+temporary DATA_DIR unless --data-dir is given.
+
+Usage:
+  python -m backend.benchmarks.run --out bench.json
+  python -m backend.benchmarks.run --baseline backend/benchmarks/baseline.json
+  python -m backend.benchmarks.run --save-baseline backend/benchmarks/baseline.json
+  python -m backend.benchmarks.run --quick --suite micro
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--suite", choices=["all", "micro", "e2e"], default="all")
+    parser.add_argument("--quick", action="store_true", help="few repeats; a smoke run, not stable numbers")
+    parser.add_argument("--out", type=str, default=None, help="write the JSON report here")
+    parser.add_argument("--baseline", type=str, default=None, help="report to compare against")
+    parser.add_argument("--threshold", type=float, default=None, help="allowed slowdown, e.g. 0.25 = 25%%")
+    parser.add_argument("--save-baseline", type=str, default=None, help="write this run as the new baseline")
+    parser.add_argument("--data-dir", type=str, default=None)
+    args = parser.parse_args()
+
+    # must happen before backend.config is imported
+    tmp = None
+    if args.data_dir:
+        os.environ["DATA_DIR"] = args.data_dir
+    else:
+        tmp = tempfile.TemporaryDirectory(prefix="adora-bench-")
+        os.environ["DATA_DIR"] = tmp.name
+    os.environ["USE_OLLAMA"] = "0"
+    os.environ["SD_PRELOAD"] = "0"
+
+    from backend.config import UPLOAD_DIR
+    from backend.db import db_writer, init_db
+    from .harness import DEFAULT_THRESHOLD, build_report, compare, format_table, load_report, save_report
+    from .stubs import offline_backends
+    from .synthetic import write_assets
+
+    init_db()
+    assets = write_assets(UPLOAD_DIR, seed=0)
+    results = {}
+    with offline_backends():
+        if args.suite in ("all", "micro"):
+            from .micro import run_micro
+            print("⏱  micro benchmarks ...")
+            results.update(run_micro(assets, quick=args.quick))
+        if args.suite in ("all", "e2e"):
+            from .e2e import run_e2e
+            print("⏱  end-to-end /render ...")
+            results.update(run_e2e(assets, quick=args.quick))
+    db_writer.flush()
+
+    report = build_report(results)
+    report["environment"]["quick"] = args.quick
+    rows = None
+    if args.baseline:
+        baseline = load_report(Path(args.baseline))
+        threshold = args.threshold if args.threshold is not None else baseline.get("threshold", DEFAULT_THRESHOLD)
+        rows = compare(report, baseline, threshold=threshold)
+        report["comparison"] = {"baseline": args.baseline, "threshold": threshold, "rows": rows}
+
+    print(format_table(results, rows))
+    if args.out:
+        save_report(report, Path(args.out))
+        print("📝 Report written to", args.out)
+    if args.save_baseline:
+        baseline = {k: v for k, v in report.items() if k != "comparison"}
+        baseline["threshold"] = args.threshold if args.threshold is not None else DEFAULT_THRESHOLD
+        # whole requests through threads and the DB are noisier than single functions
+        baseline["thresholds"] = {name: 0.5 for name in results if name.startswith("e2e ")}
+        save_report(baseline, Path(args.save_baseline))
+        print("📌 Baseline written to", args.save_baseline)
+    if tmp is not None:
+        tmp.cleanup()
+
+    regressions = [r["name"] for r in rows or [] if r["status"] == "regression"]
+    if regressions:
+        print("❌ Regressions:", ", ".join(regressions))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+# benchmarks/stubs.py
+"""
+Stand-ins for the model backends (Stable Diffusion, the LLM, YOLO) so that
+benchmarks run offline and time our code rather than model inference.
+The stubs are cheap and deterministic; the caches in front of them
+(sd_client, compliance_client, detector) still run as in production.
+"""
+
+import contextlib
+import zlib
+from typing import Iterator, Optional, Tuple
+from unittest import mock
+
+from PIL import Image
+
+from backend.models import sd_client
+from backend.models.detection import _empty, detector
+from backend.models.llm_client import compliance_client
+
+from .synthetic import make_background
+
+
+def fake_generate_image(prompt: str, size: Tuple[int, int], seed: Optional[int] = None, **kwargs) -> Image.Image:
+    return make_background(tuple(size), seed=zlib.crc32((prompt or "").encode("utf-8")))
+
+
+def fake_detect_batch(images, hashes=None):
+    return [_empty() for _ in images]
+
+
+def fake_llm_generate(prompt: str, json_output: bool = False) -> str:
+    return '{"results": []}' if json_output else "OK"
+
+
+@contextlib.contextmanager
+def offline_backends() -> Iterator[None]:
+    """Patch the SD, LLM and YOLO backends for the duration of the block."""
+    with contextlib.ExitStack() as stack:
+        stack.enter_context(mock.patch.object(sd_client, "generate_image", fake_generate_image))
+        stack.enter_context(mock.patch.object(detector, "detect_batch", fake_detect_batch))
+        stack.enter_context(mock.patch.object(compliance_client, "_generate", fake_llm_generate))
+        yield
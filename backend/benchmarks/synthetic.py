@@ -0,0 +1,129 @@
+# benchmarks/synthetic.py
+"""
+Deterministic synthetic inputs for the benchmarks: canvases for each format
+and the images they reference. Everything is derived from a seed, so two runs
+(and two machines) time exactly the same work.
+"""
+
+import random
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from backend.schemas import CreativeCanvas, TextBlock
+
+FORMAT_SIZES: Dict[str, Tuple[int, int]] = {
+    "story": (1080, 1920),
+    "feed": (1080, 1080),
+    "banner": (1080, 450),
+}
+
+WORDS = (
+    "fresh new summer deal crisp bold taste save more today only "
+    "classic range pack family value bright morning flavour best"
+).split()
+
+
+def make_background(size: Tuple[int, int], seed: int = 0) -> Image.Image:
+    """Smooth two-colour gradient with some noise, like a photo backdrop (RGBA)."""
+    rng = np.random.default_rng(seed)
+    w, h = size
+    c0, c1 = rng.integers(0, 256, size=(2, 3))
+    t = np.linspace(0.0, 1.0, h, dtype=np.float32)[:, None, None]
+    grad = c0[None, None, :] * (1 - t) + c1[None, None, :] * t
+    noise = rng.normal(0.0, 8.0, size=(h, w, 3)).astype(np.float32)
+    rgb = np.clip(np.broadcast_to(grad, (h, w, 3)) + noise, 0, 255).astype(np.uint8)
+    return Image.fromarray(rgb, "RGB").convert("RGBA")
+
+
+def make_packshot(size: Tuple[int, int] = (800, 800), seed: int = 0) -> Image.Image:
+    """A 'product' on a transparent background: a few filled shapes (RGBA)."""
+    rnd = random.Random(seed)
+    w, h = size
+    img = Image.new("RGBA", size, (0, 0, 0, 0))
+    draw = ImageDraw.Draw(img)
+    draw.rounded_rectangle(
+        (w * 0.25, h * 0.1, w * 0.75, h * 0.95),
+        radius=int(w * 0.08),
+        fill=(rnd.randrange(256), rnd.randrange(256), rnd.randrange(256), 255),
+    )
+    for _ in range(4):
+        x0, y0 = rnd.uniform(0.3, 0.6) * w, rnd.uniform(0.2, 0.7) * h
+        draw.ellipse(
+            (x0, y0, x0 + w * 0.15, y0 + h * 0.1),
+            fill=(rnd.randrange(256), rnd.randrange(256), rnd.randrange(256), 255),
+        )
+    return img
+
+
+def make_canvas(
+    fmt: str = "story",
+    seed: int = 0,
+    n_blocks: int = 3,
+    background_id: str = None,
+    packshot_ids: List[str] = None,
+    background_prompt: str = None,
+    compliant: bool = True,
+) -> CreativeCanvas:
+    """
+    A canvas for `fmt`. With compliant=False some blocks start inside the top
+    safe zone or below the minimum font size, so autofix has work to do.
+    """
+    rnd = random.Random(seed)
+    W, H = FORMAT_SIZES[fmt]
+    blocks = []
+    for i in range(n_blocks):
+        font = rnd.choice((28, 36, 48, 64)) if i == 0 else rnd.choice((20, 24, 28))
+        y = int(H * (0.25 + 0.5 * i / max(1, n_blocks)))
+        if not compliant and i % 2 == 0:
+            y, font = rnd.randrange(0, max(1, int(H * 0.05))), 10
+        blocks.append(
+            TextBlock(
+                id=f"t{i}",
+                text=" ".join(rnd.choice(WORDS) for _ in range(rnd.randint(2, 6))).title(),
+                font_size=font,
+                color=rnd.choice(("#000000", "#ffffff", "#1a1a1a", "#d62828")),
+                x=rnd.randrange(20, max(21, W // 4)),
+                y=y,
+            )
+        )
+    extra = {"background_prompt": background_prompt} if background_prompt else {}
+    return CreativeCanvas(
+        id=f"bench-{fmt}-{seed}",
+        user_id="bench",
+        format=fmt,
+        width=W,
+        height=H,
+        background_image_id=background_id,
+        packshot_ids=list(packshot_ids or []),
+        text_blocks=blocks,
+        extra=extra,
+    )
+
+
+def write_assets(upload_dir: Path, seed: int = 0, n_packshots: int = 2) -> Dict[str, List[str]]:
+    """
+    Write a background (JPEG, story size) and packshots (PNG) into upload_dir
+    under the file-id naming the upload endpoints use. Returns their ids.
+    """
+    upload_dir = Path(upload_dir)
+    upload_dir.mkdir(parents=True, exist_ok=True)
+    bg_id = f"bench-bg-{seed}"
+    make_background(FORMAT_SIZES["story"], seed).convert("RGB").save(upload_dir / f"{bg_id}.jpg", quality=90)
+    packshot_ids = []
+    for i in range(n_packshots):
+        pid = f"bench-pack-{seed}-{i}"
+        make_packshot(seed=seed * 100 + i).save(upload_dir / f"{pid}.png")
+        packshot_ids.append(pid)
+    return {"backgrounds": [bg_id], "packshots": packshot_ids}
+
+
+def make_catalog(n: int, seed: int = 0) -> List[CreativeCanvas]:
+    """n canvases across all formats, roughly a third of them non-compliant."""
+    fmts = list(FORMAT_SIZES)
+    return [
+        make_canvas(fmts[i % len(fmts)], seed=seed + i, n_blocks=2 + i % 4, compliant=i % 3 != 0)
+        for i in range(n)
+    ]
@@ -10,6 +10,17 @@ UPLOAD_DIR = Path(os.getenv("UPLOAD_DIR", DATA_DIR / "uploads"))
 RENDER_DIR = Path(os.getenv("RENDER_DIR", DATA_DIR / "renders"))
 AUDIT_LOG_DIR = Path(os.getenv("AUDIT_LOG_DIR", DATA_DIR / "audit_logs"))
 
+# Audit/event log: JSON Lines segments appended by a background writer
+AUDIT_SEGMENT_MAX_BYTES = int(os.getenv("AUDIT_SEGMENT_MAX_BYTES", str(64 * 1024 ** 2)))  # rotate at 64 MiB
+AUDIT_SEGMENT_MAX_SECONDS = float(os.getenv("AUDIT_SEGMENT_MAX_SECONDS", "3600"))  # ... or after an hour
+AUDIT_QUEUE_MAX = int(os.getenv("AUDIT_QUEUE_MAX", "10000"))
+# When the queue is full: "drop" the record, or "block" the caller up to AUDIT_BLOCK_TIMEOUT
+AUDIT_ON_FULL = os.getenv("AUDIT_ON_FULL", "drop")
+AUDIT_BLOCK_TIMEOUT = float(os.getenv("AUDIT_BLOCK_TIMEOUT", "0.5"))
+# fsync policy: "always" (every flushed batch), "interval" (at most every AUDIT_FSYNC_INTERVAL s) or "never"
+AUDIT_FSYNC = os.getenv("AUDIT_FSYNC", "interval")
+AUDIT_FSYNC_INTERVAL = float(os.getenv("AUDIT_FSYNC_INTERVAL", "1.0"))
+
 # App host/port
 APP_HOST = os.getenv("APP_HOST", "0.0.0.0")
 APP_PORT = int(os.getenv("APP_PORT", "8000"))
@@ -18,17 +29,49 @@ APP_PORT = int(os.getenv("APP_PORT", "8000"))
 ENABLE_SD = bool(os.getenv("ENABLE_SD", "0") in ("1", "true", "True"))
 USE_OLLAMA = bool(os.getenv("USE_OLLAMA", "0") in ("1", "true", "True"))
 ENABLE_DALLE = bool(os.getenv("ENABLE_DALLE", "0") in ("1", "true", "True"))
+# Load (and warm up) the ONNX SD pipeline when the API starts instead of on first use
+SD_PRELOAD = bool(os.getenv("SD_PRELOAD", "0") in ("1", "true", "True"))
 
 # SD model / LLM config
 SD_MODEL_ID = os.getenv("SD_MODEL_ID", "runwayml/stable-diffusion-v1-5")
 OLLAMA_URL = os.getenv("OLLAMA_URL", "http://localhost:11434/api/generate")
 OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "llama3")
 
+# AI background cache (sd_client): decoded images in memory, PNGs on disk
+SD_CACHE_DIR = Path(os.getenv("SD_CACHE_DIR", DATA_DIR / "sd_cache"))
+SD_CACHE_MAX_BYTES = int(os.getenv("SD_CACHE_MAX_BYTES", str(2 * 1024 ** 3)))  # 2 GiB on disk
+SD_CACHE_MEMORY_BYTES = int(os.getenv("SD_CACHE_MEMORY_BYTES", str(256 * 1024 ** 2)))  # 256 MiB decoded
+
+# Background-removal cutouts (bg_remove), PNGs on disk keyed by source hash
+CUTOUT_CACHE_DIR = Path(os.getenv("CUTOUT_CACHE_DIR", DATA_DIR / "cutouts"))
+CUTOUT_CACHE_MAX_BYTES = int(os.getenv("CUTOUT_CACHE_MAX_BYTES", str(2 * 1024 ** 3)))  # 2 GiB
+
+# LLM compliance answers (llm_client): JSON on disk, keyed by normalized text/model/prompt version
+LLM_CACHE_DIR = Path(os.getenv("LLM_CACHE_DIR", DATA_DIR / "llm_cache"))
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(64 * 1024 ** 2)))  # 64 MiB
+
+# Decoded/resized image cache behind utils.images.load_image (decoded pixel bytes)
+IMAGE_CACHE_BYTES = int(os.getenv("IMAGE_CACHE_BYTES", str(512 * 1024 ** 2)))  # 512 MiB
+
 # File size limits
 MAX_FILE_SIZE_BYTES = int(os.getenv("MAX_FILE_SIZE", "512000"))  # default 500 KiB
 
 # DB
 DB_PATH = Path(os.getenv("DB_PATH", DATA_DIR / "retail_tool.db"))
+# Connections kept open (WAL lets readers run alongside the single writer)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "8"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "8"))
+# How long a connection waits on a locked database before raising
+DB_BUSY_TIMEOUT_MS = int(os.getenv("DB_BUSY_TIMEOUT_MS", "5000"))
+# Canvas history: full snapshot every N versions, JSON Patch deltas in between
+CANVAS_SNAPSHOT_EVERY = int(os.getenv("CANVAS_SNAPSHOT_EVERY", "10"))
+CANVAS_VERSION_CACHE_SIZE = int(os.getenv("CANVAS_VERSION_CACHE_SIZE", "1000"))  # documents kept
+# Write-behind queue for asset/render records: rows per commit, max wait, capacity
+DB_WRITE_BATCH = int(os.getenv("DB_WRITE_BATCH", "256"))
+DB_WRITE_INTERVAL = float(os.getenv("DB_WRITE_INTERVAL", "0.2"))
+DB_WRITE_QUEUE_MAX = int(os.getenv("DB_WRITE_QUEUE_MAX", "10000"))
+# In-process cache of asset index rows (file id -> path/metadata), in entries
+ASSET_INDEX_CACHE_SIZE = int(os.getenv("ASSET_INDEX_CACHE_SIZE", "100000"))
 
 # Ensure directories exist
 for d in (UPLOAD_DIR, RENDER_DIR, AUDIT_LOG_DIR):
@@ -1,16 +1,54 @@
 # backend/db.py
+import atexit
+import hashlib
+import queue
+import threading
+import time
 from pathlib import Path
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from sqlalchemy import create_engine, event, Column, Index, Integer, String, Text, DateTime
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from datetime import datetime
-from .config import DB_PATH
+from .config import (
+    ASSET_INDEX_CACHE_SIZE,
+    DB_BUSY_TIMEOUT_MS,
+    DB_MAX_OVERFLOW,
+    DB_PATH,
+    DB_POOL_SIZE,
+    DB_WRITE_BATCH,
+    DB_WRITE_INTERVAL,
+    DB_WRITE_QUEUE_MAX,
+)
+from .utils.cache import LRUCache
 
 DB_PATH.parent.mkdir(parents=True, exist_ok=True)
 
 SQLITE_URL = f"sqlite:///{DB_PATH}"
 
-engine = create_engine(SQLITE_URL, connect_args={"check_same_thread": False})
+engine = create_engine(
+    SQLITE_URL,
+    connect_args={"check_same_thread": False, "timeout": DB_BUSY_TIMEOUT_MS / 1000.0},
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+)
+
+
+@event.listens_for(engine, "connect")
+def _sqlite_pragmas(dbapi_conn, _record):
+    # WAL: readers don't block the writer (or each other); NORMAL sync is
+    # durable across app crashes and only fsyncs at checkpoints.
+    cur = dbapi_conn.cursor()
+    try:
+        cur.execute("PRAGMA journal_mode=WAL")
+        cur.execute("PRAGMA synchronous=NORMAL")
+        cur.execute(f"PRAGMA busy_timeout={int(DB_BUSY_TIMEOUT_MS)}")
+        cur.execute("PRAGMA temp_store=MEMORY")
+    finally:
+        cur.close()
+
+
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
 
 Base = declarative_base()
@@ -31,7 +69,394 @@ class SessionCanvas(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     data = Column(Text)  # JSON blob
 
+    # "a user's recent canvases" is the common query
+    __table_args__ = (Index("ix_session_canvases_user_created", "user_id", "created_at"),)
+
+
+class AssetRecord(Base):
+    """Index of uploaded files: file id -> where it lives and what it is."""
+    __tablename__ = "assets"
+    file_id = Column(String(128), primary_key=True)
+    path = Column(Text, nullable=False)
+    asset_type = Column(String(32), index=True)
+    mime_type = Column(String(64))
+    width = Column(Integer)
+    height = Column(Integer)
+    sha256 = Column(String(64), index=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class RenderRecord(Base):
+    """One rendered creative file."""
+    __tablename__ = "renders"
+    id = Column(Integer, primary_key=True)
+    canvas_id = Column(String(256), index=True)
+    format = Column(String(32))
+    output_path = Column(Text, nullable=False)
+    size_bytes = Column(Integer)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+
+class CanvasVersion(Base):
+    """
+    One saved version of a canvas: a full JSON snapshot every few versions,
+    JSON Patch deltas against the previous version in between (see versions.py).
+    """
+    __tablename__ = "canvas_versions"
+    id = Column(Integer, primary_key=True)
+    canvas_id = Column(String(256), nullable=False)
+    version = Column(Integer, nullable=False)
+    user_id = Column(String(256), index=True)
+    kind = Column(String(16), nullable=False)  # "snapshot" | "delta"
+    data = Column(Text, nullable=False)  # canvas JSON, or a JSON Patch list
+    size_bytes = Column(Integer)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (Index("ux_canvas_versions_canvas_version", "canvas_id", "version", unique=True),)
+
 
 def init_db():
-    """Create tables if they don't exist."""
+    """Create tables (and indexes added to existing tables) if they don't exist."""
     Base.metadata.create_all(bind=engine)
+    # create_all only creates indexes together with a new table
+    for table in Base.metadata.sorted_tables:
+        for idx in table.indexes:
+            idx.create(bind=engine, checkfirst=True)
+
+
+_FLUSH = object()
+
+
+class WriteBehindQueue:
+    """
+    Buffers inserts/upserts and commits them from one background thread in
+    batches (up to batch_size rows, or whatever arrived within interval_s),
+    so concurrent requests don't each take SQLite's write lock for a
+    one-row transaction. If the queue is full the caller writes its row
+    synchronously instead: records are never dropped.
+    """
+
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        batch_size: int = DB_WRITE_BATCH,
+        interval_s: float = DB_WRITE_INTERVAL,
+        queue_max: int = DB_WRITE_QUEUE_MAX,
+        retries: int = 3,
+    ):
+        self._session_factory = session_factory
+        self.batch_size = max(1, batch_size)
+        self.interval_s = interval_s
+        self.retries = retries
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max(1, queue_max))
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._ready = False
+        self.queued = 0
+        self.committed = 0
+        self.batches = 0
+        self.sync_writes = 0
+        self.failed = 0
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if not self._ready:
+                init_db()
+                self._ready = True
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+                self._thread.start()
+
+    def submit(self, model, values: Dict[str, Any], upsert: bool = False) -> None:
+        """Queue one row; upsert=True merges on the primary key instead of inserting."""
+        self._ensure_started()
+        item = (model, values, upsert)
+        try:
+            self._queue.put_nowait(item)
+            self.queued += 1
+        except queue.Full:
+            # backpressure: pay for our own transaction rather than lose the row
+            self.sync_writes += 1
+            self._commit([item])
+
+    def flush(self, timeout: Optional[float] = 10.0) -> bool:
+        """
+        Wait until every row queued so far is committed. Returns False if that
+        didn't happen within `timeout` (including when the queue stayed full
+        for that long), so shutdown hooks never hang on a stuck writer.
+        """
+        if self._thread is None or not self._thread.is_alive():
+            return self._queue.empty()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        done = threading.Event()
+        try:
+            self._queue.put((_FLUSH, done, None), timeout=timeout)
+        except queue.Full:
+            return False
+        remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+        return done.wait(remaining)
+
+    @staticmethod
+    def _coalesce(items: List[Tuple[Any, Dict[str, Any], bool]]) -> List[Tuple[Any, Dict[str, Any], bool]]:
+        # several upserts of one primary key in a batch: keep the last
+        out: Dict[Any, Tuple[Any, Dict[str, Any], bool]] = {}
+        for n, (model, values, upsert) in enumerate(items):
+            if upsert:
+                pk = tuple(values.get(c.name) for c in model.__table__.primary_key.columns)
+                key = (model, pk)
+                out.pop(key, None)
+            else:
+                key = n
+            out[key] = (model, values, upsert)
+        return list(out.values())
+
+    def _commit(self, items: List[Tuple[Any, Dict[str, Any], bool]]) -> None:
+        items = self._coalesce(items)
+        for attempt in range(self.retries + 1):
+            session = self._session_factory()
+            try:
+                for model, values, upsert in items:
+                    if upsert:
+                        session.merge(model(**values))
+                    else:
+                        session.add(model(**values))
+                session.commit()
+                self.committed += len(items)
+                self.batches += 1
+                return
+            except OperationalError as e:
+                session.rollback()
+                if attempt == self.retries:
+                    self.failed += len(items)
+                    print("DB write-behind batch failed:", e)
+                    return
+                time.sleep(0.05 * (2 ** attempt))  # locked by another process; back off
+            except Exception as e:
+                session.rollback()
+                if len(items) > 1:
+                    # a bad row (e.g. constraint violation) shouldn't sink the rest
+                    for item in items:
+                        self._commit([item])
+                    return
+                self.failed += 1
+                print("DB write-behind row failed:", e)
+                return
+            finally:
+                session.close()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.interval_s
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            rows = [b for b in batch if b[0] is not _FLUSH]
+            if rows:
+                self._commit(rows)
+            for b in batch:
+                if b[0] is _FLUSH:
+                    b[1].set()
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": self._queue.qsize(),
+            "queued": self.queued,
+            "committed": self.committed,
+            "batches": self.batches,
+            "sync_writes": self.sync_writes,
+            "failed": self.failed,
+        }
+
+
+db_writer = WriteBehindQueue()
+atexit.register(db_writer.flush)
+
+
+class AssetInfo(NamedTuple):
+    file_id: str
+    path: Path
+    mime_type: Optional[str]
+    width: Optional[int]
+    height: Optional[int]
+    sha256: Optional[str]
+
+
+# file extensions the upload pipeline stores, used by rebuild()
+_IMAGE_MIME = {".png": "image/png", ".jpg": "image/jpeg", ".jpeg": "image/jpeg", ".webp": "image/webp"}
+
+
+class AssetIndex:
+    """
+    Resolves uploaded file ids via the `assets` table, with an in-process
+    LRU read cache in front so repeat lookups never touch SQLite or the disk.
+    """
+
+    def __init__(self, session_factory=SessionLocal, cache_size: int = 100_000):
+        self._session_factory = session_factory
+        self._cache = LRUCache(cache_size)
+        self._ready = False
+        self._ready_lock = threading.Lock()
+
+    def _ensure_table(self) -> None:
+        if self._ready:
+            return
+        with self._ready_lock:
+            if not self._ready:
+                init_db()
+                self._ready = True
+
+    @staticmethod
+    def _info(rec: AssetRecord) -> AssetInfo:
+        return AssetInfo(rec.file_id, Path(rec.path), rec.mime_type, rec.width, rec.height, rec.sha256)
+
+    def lookup(self, file_id: str) -> Optional[AssetInfo]:
+        info = self._cache.get(file_id)
+        if info is not None:
+            return info
+        self._ensure_table()
+        session = self._session_factory()
+        try:
+            rec = session.get(AssetRecord, file_id)
+            info = self._info(rec) if rec is not None else None
+        finally:
+            session.close()
+        if info is not None:
+            self._cache.put(file_id, info)
+        return info
+
+    def resolve(self, file_id: str) -> Optional[Path]:
+        info = self.lookup(file_id)
+        return info.path if info is not None else None
+
+    def register(
+        self,
+        file_id: str,
+        path,
+        asset_type: Optional[str] = None,
+        mime_type: Optional[str] = None,
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+        sha256: Optional[str] = None,
+        defer: bool = False,
+    ) -> AssetInfo:
+        """
+        Insert or update an asset row and prime the read cache. With defer=True
+        the row goes through the write-behind queue; lookups in this process
+        see it immediately via the cache.
+        """
+        values = dict(
+            file_id=file_id,
+            path=str(path),
+            asset_type=asset_type,
+            mime_type=mime_type,
+            width=width,
+            height=height,
+            sha256=sha256,
+        )
+        info = AssetInfo(file_id, Path(path), mime_type, width, height, sha256)
+        if defer:
+            self._cache.put(file_id, info)
+            db_writer.submit(AssetRecord, values, upsert=True)
+            return info
+        self._ensure_table()
+        session = self._session_factory()
+        try:
+            session.merge(AssetRecord(**values))
+            session.commit()
+        finally:
+            session.close()
+        self._cache.put(file_id, info)
+        return info
+
+    def rebuild(self, directory: Path, asset_type: Optional[str] = None) -> int:
+        """
+        Index every PNG/JPEG/WebP file in `directory` (file id = file stem), e.g. for
+        upload directories that predate the index. Returns the number indexed.
+        """
+        from PIL import Image
+
+        self._ensure_table()
+        count = 0
+        session = self._session_factory()
+        try:
+            for p in Path(directory).iterdir():
+                mime = _IMAGE_MIME.get(p.suffix.lower())
+                if mime is None or not p.is_file() or p.name.startswith("."):
+                    continue
+                try:
+                    with Image.open(p) as im:
+                        width, height = im.size
+                except Exception:
+                    continue
+                h = hashlib.sha256()
+                with open(p, "rb") as f:
+                    for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                        h.update(chunk)
+                session.merge(AssetRecord(
+                    file_id=p.stem,
+                    path=str(p),
+                    asset_type=asset_type,
+                    mime_type=mime,
+                    width=width,
+                    height=height,
+                    sha256=h.hexdigest(),
+                ))
+                count += 1
+                if count % 500 == 0:
+                    session.commit()
+            session.commit()
+        finally:
+            session.close()
+        self._cache.clear()
+        return count
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+asset_index = AssetIndex(cache_size=ASSET_INDEX_CACHE_SIZE)
+
+
+def save_asset_record(
+    file_id: str,
+    file_path,
+    asset_type: str,
+    mime_type: Optional[str] = None,
+    width: Optional[int] = None,
+    height: Optional[int] = None,
+    sha256: Optional[str] = None,
+) -> None:
+    """Record an uploaded asset in the asset index (committed in the background)."""
+    asset_index.register(
+        file_id,
+        file_path,
+        asset_type=asset_type,
+        mime_type=mime_type,
+        width=width,
+        height=height,
+        sha256=sha256,
+        defer=True,
+    )
+
+
+def save_render_record(
+    canvas_id: str,
+    output_path,
+    format: Optional[str] = None,
+    size_bytes: Optional[int] = None,
+) -> None:
+    """Record a rendered file (committed in the background)."""
+    db_writer.submit(RenderRecord, dict(
+        canvas_id=canvas_id,
+        format=format,
+        output_path=str(output_path),
+        size_bytes=size_bytes,
+    ))
@@ -0,0 +1,165 @@
+# backend/jobs.py
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+
+# Pool used for render jobs: "thread" (default) or "process". Processes avoid
+# the GIL for PIL-heavy work but each one loads its own models and caches.
+RENDER_POOL = os.getenv("RENDER_POOL", "thread")
+RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", str(os.cpu_count() or 2)))
+# Max jobs queued or running at once; further submissions get a 429
+RENDER_QUEUE_MAX = int(os.getenv("RENDER_QUEUE_MAX", "64"))
+# Finished jobs kept around for status/result lookups
+RENDER_JOB_RETENTION = int(os.getenv("RENDER_JOB_RETENTION", "1000"))
+
+
+class QueueFullError(Exception):
+    """Raised by JobManager.submit when the outstanding-job limit is reached."""
+
+
+@dataclass
+class Job:
+    id: str
+    future: Future
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+
+    @property
+    def status(self) -> str:
+        f = self.future
+        if f.cancelled():
+            return "cancelled"
+        if f.done():
+            return "failed" if f.exception() is not None else "done"
+        if f.running():
+            return "running"
+        return "queued"
+
+    def to_dict(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {
+            "job_id": self.id,
+            "status": self.status,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+        if out["status"] == "failed":
+            out["error"] = str(self.future.exception())
+        return out
+
+
+class JobManager:
+    """
+    Runs blocking work (e.g. render_canvas_image) on a bounded worker pool
+    and tracks it by job id so HTTP handlers can return immediately.
+    """
+
+    def __init__(
+        self,
+        kind: str = "thread",
+        workers: int = 2,
+        max_outstanding: int = 64,
+        retention: int = 1000,
+    ):
+        self.kind = kind if kind in ("thread", "process") else "thread"
+        self.workers = max(1, workers)
+        self.max_outstanding = max(1, max_outstanding)
+        self.retention = max(0, retention)
+        self._executor: Optional[Executor] = None
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._outstanding = 0
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+
+    def _pool(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="render-job")
+        return self._executor
+
+    def submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Job:
+        with self._lock:
+            if self._outstanding >= self.max_outstanding:
+                self.rejected += 1
+                raise QueueFullError(f"{self._outstanding} jobs outstanding (limit {self.max_outstanding})")
+            self._outstanding += 1
+            self.submitted += 1
+            try:
+                future = self._pool().submit(fn, *args, **kwargs)
+            except Exception:
+                self._outstanding -= 1
+                raise
+            job = Job(id=uuid.uuid4().hex, future=future)
+            self._jobs[job.id] = job
+            self._prune()
+        future.add_done_callback(lambda f, j=job: self._on_done(j))
+        return job
+
+    def _on_done(self, job: Job) -> None:
+        with self._lock:
+            self._outstanding -= 1
+            job.finished_at = time.time()
+            if job.future.cancelled():
+                self.cancelled += 1
+            elif job.future.exception() is not None:
+                self.failed += 1
+            else:
+                self.completed += 1
+
+    def _prune(self) -> None:
+        # drop the oldest finished jobs beyond the retention limit
+        excess = len(self._jobs) - self.retention - self._outstanding
+        if excess <= 0:
+            return
+        for job_id in list(self._jobs):
+            if excess <= 0:
+                break
+            if self._jobs[job_id].future.done():
+                del self._jobs[job_id]
+                excess -= 1
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a queued job. Jobs that already started cannot be interrupted."""
+        job = self._jobs.get(job_id)
+        if job is None:
+            return False
+        return job.future.cancel()
+
+    def shutdown(self, wait: bool = False) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pool": self.kind,
+            "workers": self.workers,
+            "outstanding": self._outstanding,
+            "max_outstanding": self.max_outstanding,
+            "submitted": self.submitted,
+            "rejected": self.rejected,
+            "completed": self.completed,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+        }
+
+
+render_jobs = JobManager(
+    kind=RENDER_POOL,
+    workers=RENDER_WORKERS,
+    max_outstanding=RENDER_QUEUE_MAX,
+    retention=RENDER_JOB_RETENTION,
+)
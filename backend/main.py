@@ -1,20 +1,63 @@
 # backend/main.py
 
 import os
+import json
+import time
 import uuid
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Optional
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException
+from functools import lru_cache
+from pathlib import Path
+from typing import List, NamedTuple, Optional, Tuple
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
-
-from PIL import Image, ImageDraw, ImageFont
-
-from backend.schemas import CanvasSchema
-from backend.db import save_asset_record, save_render_record
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse
+from starlette.concurrency import run_in_threadpool
+
+from PIL import Image, ImageDraw
+
+from backend.schemas import (
+    AutoFixRequest,
+    AutoFixResponse,
+    BatchValidationRequest,
+    BatchValidationResponse,
+    CanvasVersionInfo,
+    CanvasVersionResponse,
+    CreativeCanvas,
+    RenderItem,
+    RenderRequest,
+    RenderResponse,
+)
+from backend.db import asset_index, db_writer, init_db, save_asset_record, save_render_record
+from backend import config
+from backend.config import SD_PRELOAD
+from backend.jobs import render_jobs, QueueFullError
 from backend.models import sd_client
-from backend.utils.logging_utils import log_event
-from backend.utils.images import load_image, save_image
+from backend.models.aesthetics import aesthetic_scorer
+from backend.models.bg_remove import background_remover
+from backend.models.detection import detector
+from backend.models.llm_client import compliance_client
+from backend.models.sd_scheduler import GenerationTimeout
+from backend.models.autofix import STRATEGIES, autofix
+from backend.models.image_gen import pipeline_manager, generation_scheduler
+from backend.rules.batch import BatchInputError, check_raw_canvases, validate_catalog
+from backend.rules.contrast import contrast_cache_stats
+from backend.rules.engine import run_rules
+from backend.utils.fonts import font_cache_stats, get_font
+from backend.utils.logging_utils import audit_sink, log_event, write_audit_log
+from backend.utils.metrics import REQUEST_SECONDS, cache_samples, collect_timings, registry, stage
+from backend.utils.uploads import UploadError, store_upload
+from backend.versions import canvas_versions
+from backend.utils.images import (
+    find_uploaded_file,
+    image_cache_stats,
+    load_image,
+    packshot_rect,
+    resize_to_fit,
+    save_image,
+)
 
 # ------------------------------------------------------------------------------
 # App Init
@@ -30,23 +73,93 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-DATA_DIR = "data"
-UPLOAD_DIR = os.path.join(DATA_DIR, "uploads")
-RENDER_DIR = os.path.join(DATA_DIR, "renders")
+# Same locations the asset helpers (find_uploaded_file, etc.) resolve against
+DATA_DIR = str(config.DATA_DIR)
+UPLOAD_DIR = str(config.UPLOAD_DIR)
+RENDER_DIR = str(config.RENDER_DIR)
 
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 os.makedirs(RENDER_DIR, exist_ok=True)
 
+
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    t0 = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # route template, not the raw path, so ids don't explode the label set
+        route = request.scope.get("route")
+        REQUEST_SECONDS.observe(
+            time.perf_counter() - t0,
+            method=request.method,
+            route=getattr(route, "path", "unmatched"),
+            status=str(status),
+        )
+
+
+@app.on_event("startup")
+def create_tables():
+    init_db()
+
+
+@app.on_event("startup")
+def preload_sd_pipeline():
+    # Load in the background so the API is reachable (and /health can report
+    # "loading") while the model is still coming up.
+    if SD_PRELOAD and pipeline_manager.available():
+        threading.Thread(target=pipeline_manager.load, name="sd-preload", daemon=True).start()
+
+
+@app.on_event("shutdown")
+def stop_render_jobs():
+    render_jobs.shutdown(wait=False)
+
+
+@app.on_event("shutdown")
+def close_audit_log():
+    audit_sink.close()
+
+
+@app.on_event("shutdown")
+def flush_db_writes():
+    db_writer.flush()
+
 # ------------------------------------------------------------------------------
 # Helper: load font safely
 # ------------------------------------------------------------------------------
 
 def load_font(size: int):
+    # resolved once and cached per size; falls back to PIL's default font
+    return get_font(size)
+
+# ------------------------------------------------------------------------------
+# Helper: stream an upload to content-addressed storage
+# ------------------------------------------------------------------------------
+
+async def _handle_upload(file: UploadFile, asset_type: str) -> dict:
     try:
-        return ImageFont.truetype("arial.ttf", size)
-    except:
-        # fallback to PIL default font
-        return ImageFont.load_default()
+        stored = await store_upload(file)
+    except UploadError as e:
+        log_event(f"upload_{asset_type}_rejected", {"reason": str(e)})
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+
+    path = str(stored.path)
+    save_asset_record(
+        file_id=stored.file_id,
+        file_path=path,
+        asset_type=asset_type,
+        mime_type=stored.mime_type,
+        width=stored.width,
+        height=stored.height,
+        sha256=stored.sha256,
+    )
+    log_event(f"upload_{asset_type}", {"file": path, "deduplicated": stored.deduplicated})
+
+    return {"status": "ok", "file_id": stored.file_id, "path": path}
 
 # ------------------------------------------------------------------------------
 # Endpoint: Upload Packshot
@@ -54,18 +167,7 @@ def load_font(size: int):
 
 @app.post("/upload/packshot")
 async def upload_packshot(file: UploadFile = File(...)):
-    file_id = str(uuid.uuid4())
-    ext = file.filename.split(".")[-1]
-    path = os.path.join(UPLOAD_DIR, f"{file_id}.{ext}")
-
-    content = await file.read()
-    with open(path, "wb") as f:
-        f.write(content)
-
-    save_asset_record(file_id=file_id, file_path=path, asset_type="packshot")
-    log_event("upload_packshot", {"file": path})
-
-    return {"status": "ok", "file_id": file_id, "path": path}
+    return await _handle_upload(file, "packshot")
 
 # ------------------------------------------------------------------------------
 # Endpoint: Upload Background
@@ -73,107 +175,424 @@ async def upload_packshot(file: UploadFile = File(...)):
 
 @app.post("/upload/background")
 async def upload_background(file: UploadFile = File(...)):
-    file_id = str(uuid.uuid4())
-    ext = file.filename.split(".")[-1]
-    path = os.path.join(UPLOAD_DIR, f"{file_id}.{ext}")
-
-    content = await file.read()
-    with open(path, "wb") as f:
-        f.write(content)
-
-    save_asset_record(file_id=file_id, file_path=path, asset_type="background")
-    log_event("upload_background", {"file": path})
-
-    return {"status": "ok", "file_id": file_id, "path": path}
+    return await _handle_upload(file, "background")
 
 # ------------------------------------------------------------------------------
 # Helper: Compose final creative
 # ------------------------------------------------------------------------------
 
-def render_canvas_image(canvas: CanvasSchema) -> str:
-    W = canvas.width
-    H = canvas.height
+TEMPLATE_DIR = Path(__file__).resolve().parent / "templates"
 
-    # 1) Create a blank base
-    base = Image.new("RGBA", (W, H), (255, 255, 255, 255))
 
-    # 2) Background: uploaded OR AI-generated
+@lru_cache(maxsize=None)
+def format_size(fmt: str) -> Tuple[int, int]:
+    """Canvas (width, height) for a format, from backend/templates/<fmt>.json."""
+    with open(TEMPLATE_DIR / f"{fmt}.json", encoding="utf-8") as f:
+        tpl = json.load(f)
+    return int(tpl["width"]), int(tpl["height"])
+
+
+class RenderAssets(NamedTuple):
+    """Source images decoded once and shared by every format of a render."""
+    background: Optional[Image.Image]
+    packshots: List[Image.Image]
+    # source files, when the image came from disk (None for AI backgrounds)
+    background_path: Optional[Path] = None
+    packshot_paths: List[Path] = []
+
+
+def _fit(img: Image.Image, path: Optional[Path], size: Tuple[int, int]) -> Image.Image:
+    # uploaded files go through load_image's cache, so repeat renders skip the resample
+    if path is not None:
+        return load_image(path, size=size)
+    return resize_to_fit(img, size)
+
+
+def load_render_assets(canvas: CreativeCanvas) -> RenderAssets:
     bg_img: Optional[Image.Image] = None
+    bg_path: Optional[Path] = None
 
     # uploaded background takes priority
-    if canvas.background_image_path:
+    if canvas.background_image_id:
         try:
-            bg_img = load_image(canvas.background_image_path).convert("RGBA")
-        except:
+            bg_path = find_uploaded_file(canvas.background_image_id)
+            if bg_path is not None:
+                with stage("decode"):
+                    bg_img = load_image(bg_path)
+        except Exception:
             bg_img = None
+            bg_path = None
 
     # if no uploaded background, try AI
     if bg_img is None and canvas.extra and "background_prompt" in canvas.extra:
         prompt = canvas.extra["background_prompt"]
-        bg_img = sd_client.generate_background(prompt, size=(W, H))
+        with stage("generate"):
+            bg_img = sd_client.generate_background(prompt, size=(canvas.width, canvas.height))
 
-    # paste background
-    if bg_img:
-        bg_img = bg_img.resize((W, H), Image.LANCZOS)
-        base.alpha_composite(bg_img, (0, 0))
+    packshots: List[Image.Image] = []
+    packshot_paths: List[Path] = []
+    for p_id in canvas.packshot_ids or []:
+        try:
+            p_path = find_uploaded_file(p_id)
+            if p_path is None:
+                raise FileNotFoundError(f"packshot {p_id} not found")
+            with stage("decode"):
+                packshots.append(load_image(p_path))
+            packshot_paths.append(p_path)
+        except Exception as e:
+            print("Packshot error:", e)
+
+    return RenderAssets(
+        background=bg_img,
+        packshots=packshots,
+        background_path=bg_path,
+        packshot_paths=packshot_paths,
+    )
+
+
+def adapt_canvas(canvas: CreativeCanvas, fmt: str) -> CreativeCanvas:
+    """
+    Re-target a canvas to another format: take that format's size and move
+    text blocks proportionally. Font sizes follow the width ratio, since text
+    runs horizontally and the formats share a width.
+    """
+    if fmt == canvas.format:
+        return canvas
+    W, H = format_size(fmt)
+    sx = W / canvas.width
+    sy = H / canvas.height
+    blocks = [
+        tb.copy(update={
+            "x": int(round(tb.x * sx)),
+            "y": int(round(tb.y * sy)),
+            "font_size": max(1, int(round(tb.font_size * sx))),
+        })
+        for tb in canvas.text_blocks or []
+    ]
+    return canvas.copy(update={"format": fmt, "width": W, "height": H, "text_blocks": blocks})
+
+
+def compose_canvas(canvas: CreativeCanvas, assets: RenderAssets) -> Image.Image:
+    W = canvas.width
+    H = canvas.height
+
+    # 1) Create a blank base
+    base = Image.new("RGBA", (W, H), (255, 255, 255, 255))
+
+    # 2) Background
+    if assets.background is not None:
+        with stage("resize"):
+            bg_img = _fit(assets.background, assets.background_path, (W, H))
+        with stage("composite"):
+            base.alpha_composite(bg_img, (0, 0))
 
     draw = ImageDraw.Draw(base)
 
     # 3) Packshots
-    for p_path in canvas.packshot_paths:
+    for i, img in enumerate(assets.packshots):
         try:
-            img = load_image(p_path).convert("RGBA")
             # Auto-scale packshots to fit nicely
-            img = img.resize((int(W * 0.5), int(H * 0.5)), Image.LANCZOS)
-            base.alpha_composite(img, (int(W * 0.25), int(H * 0.4)))
+            x, y, w, h = packshot_rect((W, H))
+            p_path = assets.packshot_paths[i] if i < len(assets.packshot_paths) else None
+            with stage("resize"):
+                fitted = _fit(img, p_path, (w, h))
+            with stage("composite"):
+                base.alpha_composite(fitted, (x, y))
         except Exception as e:
             print("Packshot error:", e)
 
     # 4) Text blocks
-    for block in canvas.text_blocks:
-        font = load_font(block.font_size)
-        draw.text(
-            (block.x, block.y),
-            block.text,
-            fill=block.color,
-            font=font,
-        )
+    with stage("text"):
+        for block in canvas.text_blocks or []:
+            font = load_font(block.font_size)
+            draw.text(
+                (block.x, block.y),
+                block.text,
+                fill=block.color,
+                font=font,
+            )
+
+    return base
+
+
+def _render_to_file(canvas: CreativeCanvas, assets: RenderAssets) -> RenderItem:
+    base = compose_canvas(canvas, assets)
 
-    # 5) Save output
     render_id = uuid.uuid4().hex
     out_path = os.path.join(RENDER_DIR, f"{render_id}_{canvas.format}.png")
-    base.convert("RGB").save(out_path, "PNG")
+    with stage("encode"):
+        size_bytes = save_image(base, Path(out_path))
+
+    with stage("persist"):
+        save_render_record(canvas_id=canvas.id, output_path=out_path, format=canvas.format, size_bytes=size_bytes)
+        log_event("render_created", {"file": out_path})
+
+    return RenderItem(format=canvas.format, path=out_path, size_bytes=size_bytes)
+
 
-    save_render_record(canvas_id=canvas.id, output_path=out_path)
-    log_event("render_created", {"file": out_path})
+def render_canvas_image(canvas: CreativeCanvas, assets: Optional[RenderAssets] = None) -> str:
+    if assets is None:
+        assets = load_render_assets(canvas)
+    return _render_to_file(canvas, assets).path
 
-    return out_path
+
+# Formats of one request are independent; PIL releases the GIL while
+# resizing and encoding, so threads give real parallelism here.
+_fanout_pool = ThreadPoolExecutor(max_workers=3, thread_name_prefix="render-fmt")
+
+
+def render_formats(req: RenderRequest) -> RenderResponse:
+    """
+    Render one canvas into several formats. Source assets are decoded once
+    and every format derives its resizes from the shared decoded images.
+    """
+    canvas = req.canvas
+    formats = list(dict.fromkeys(req.formats or [canvas.format]))
+    targets = [adapt_canvas(canvas, fmt) for fmt in formats]
+
+    assets = load_render_assets(canvas)
+    if len(targets) == 1:
+        creatives = [_render_to_file(targets[0], assets)]
+    else:
+        # each task runs in a copy of this context so its stage timings reach the request
+        futures = [
+            _fanout_pool.submit(contextvars.copy_context().run, _render_to_file, c, assets)
+            for c in targets
+        ]
+        creatives = [f.result() for f in futures]
+
+    with stage("validate"):
+        validation = run_rules(canvas)
+    with stage("persist"):
+        audit_path = write_audit_log(canvas.id, validation.issues, [])
+
+    return RenderResponse(canvas_id=canvas.id, creatives=creatives, audit_log_path=str(audit_path))
 
 # ------------------------------------------------------------------------------
 # Endpoint: Render
 # ------------------------------------------------------------------------------
 
-@app.post("/render")
-async def render_creative(canvas: CanvasSchema):
+def _check_formats(req: RenderRequest) -> None:
+    for fmt in req.formats or [req.canvas.format]:
+        if not (TEMPLATE_DIR / f"{fmt}.json").exists():
+            raise HTTPException(status_code=400, detail=f"Unknown format: {fmt}")
+
+
+@app.post("/render", response_model=RenderResponse)
+async def render_creative(req: RenderRequest, response: Response):
+    _check_formats(req)
     try:
-        path = render_canvas_image(canvas)
-        return {"status": "ok", "path": path}
+        # compositing/encoding is CPU-bound; keep it off the event loop
+        with collect_timings() as timings:
+            result = await run_in_threadpool(render_formats, req)
+        response.headers["Server-Timing"] = timings.server_timing()
+        return result
+    except GenerationTimeout as e:
+        log_event("render_failed", {"error": str(e)})
+        raise HTTPException(status_code=504, detail=f"Render failed: {str(e)}")
     except Exception as e:
         log_event("render_failed", {"error": str(e)})
         raise HTTPException(status_code=500, detail=f"Render failed: {str(e)}")
 
+# ------------------------------------------------------------------------------
+# Endpoint: Batch validation
+# ------------------------------------------------------------------------------
+
+@app.post(
+    "/validate/batch",
+    response_model=BatchValidationResponse,
+    openapi_extra={"requestBody": {"content": {"application/json": {"schema": BatchValidationRequest.schema()}}}},
+)
+async def validate_batch(request: Request):
+    # Catalogs can hold tens of thousands of canvases; the rules only need a
+    # few fields each, so read the raw JSON instead of building a pydantic
+    # model per canvas and text block.
+    try:
+        body = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=422, detail="Invalid batch: body is not valid JSON")
+    if not isinstance(body, dict) or "canvases" not in body:
+        raise HTTPException(status_code=422, detail="Invalid batch: canvases: field required")
+    canvases = body["canvases"]
+    try:
+        check_raw_canvases(canvases)
+        summary = await run_in_threadpool(validate_catalog, canvases)
+    except BatchInputError as e:
+        raise HTTPException(status_code=422, detail=f"Invalid batch: {e}")
+    except OverflowError:
+        raise HTTPException(status_code=422, detail="Invalid batch: a coordinate or font size is out of range")
+    return JSONResponse(summary)
+
+# ------------------------------------------------------------------------------
+# Endpoint: Autofix
+# ------------------------------------------------------------------------------
+
+@app.post("/autofix", response_model=AutoFixResponse)
+async def autofix_canvas(req: AutoFixRequest):
+    if req.strategy not in STRATEGIES:
+        raise HTTPException(status_code=400, detail=f"Unknown autofix strategy: {req.strategy}")
+    options = {"width": req.beam_width} if req.strategy == "beam" else {}
+    canvas, validation, fixes = await run_in_threadpool(
+        autofix, req.canvas, req.strategy, req.time_budget_ms / 1000.0, **options
+    )
+    return AutoFixResponse(canvas=canvas, validation=validation, applied_fixes=fixes)
+
+# ------------------------------------------------------------------------------
+# Endpoints: Canvas history
+# ------------------------------------------------------------------------------
+
+@app.post("/canvases/{canvas_id}/versions", response_model=CanvasVersionInfo, status_code=201)
+async def save_canvas_version(canvas_id: str, canvas: CreativeCanvas):
+    if canvas.id != canvas_id:
+        raise HTTPException(status_code=400, detail="Canvas id does not match the URL")
+    info = await run_in_threadpool(canvas_versions.save, canvas_id, canvas.dict(), canvas.user_id)
+    return CanvasVersionInfo(**info._asdict())
+
+
+@app.get("/canvases/{canvas_id}/versions", response_model=List[CanvasVersionInfo])
+async def list_canvas_versions(canvas_id: str, limit: int = 50, before: Optional[int] = None):
+    limit = max(1, min(limit, 500))
+    infos = await run_in_threadpool(canvas_versions.list_versions, canvas_id, limit, before)
+    return [CanvasVersionInfo(**i._asdict()) for i in infos]
+
+
+@app.get("/canvases/{canvas_id}/versions/{version}", response_model=CanvasVersionResponse)
+async def get_canvas_version(canvas_id: str, version: int):
+    doc = await run_in_threadpool(canvas_versions.get, canvas_id, version)
+    if doc is None:
+        raise HTTPException(status_code=404, detail=f"Canvas {canvas_id} has no version {version}")
+    return CanvasVersionResponse(canvas_id=canvas_id, version=version, canvas=CreativeCanvas(**doc))
+
+# ------------------------------------------------------------------------------
+# Endpoints: Render jobs (submit now, poll for the result)
+# ------------------------------------------------------------------------------
+
+def _get_job_or_404(job_id: str):
+    job = render_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return job
+
+
+@app.post("/jobs/render", status_code=202)
+async def submit_render_job(req: RenderRequest):
+    _check_formats(req)
+    try:
+        job = render_jobs.submit(render_formats, req)
+    except QueueFullError as e:
+        log_event("render_job_rejected", {"reason": str(e)})
+        return JSONResponse(
+            status_code=429,
+            content={"detail": f"Render queue is full: {e}"},
+            headers={"Retry-After": "5"},
+        )
+    log_event("render_job_submitted", {"job_id": job.id})
+    return job.to_dict()
+
+
+@app.get("/jobs/{job_id}")
+async def get_render_job(job_id: str):
+    return _get_job_or_404(job_id).to_dict()
+
+
+@app.get("/jobs/{job_id}/result")
+async def get_render_job_result(job_id: str):
+    job = _get_job_or_404(job_id)
+    status = job.status
+    if status in ("queued", "running"):
+        return JSONResponse(status_code=202, content=job.to_dict())
+    if status == "cancelled":
+        raise HTTPException(status_code=409, detail="Job was cancelled")
+    if status == "failed":
+        raise HTTPException(status_code=500, detail=f"Render failed: {job.future.exception()}")
+    return job.future.result()
+
+
+@app.delete("/jobs/{job_id}")
+async def cancel_render_job(job_id: str):
+    job = _get_job_or_404(job_id)
+    if not render_jobs.cancel(job_id):
+        raise HTTPException(status_code=409, detail=f"Job is {job.status} and cannot be cancelled")
+    log_event("render_job_cancelled", {"job_id": job_id})
+    return job.to_dict()
+
+# ------------------------------------------------------------------------------
+# Metrics (Prometheus text format)
+# ------------------------------------------------------------------------------
+
+_CACHES = {
+    "image": image_cache_stats,
+    "sd_memory": lambda: sd_client.cache_stats()["memory"],
+    "sd_disk": lambda: sd_client.cache_stats()["disk"],
+    "llm_memory": lambda: compliance_client.stats()["memory"],
+    "llm_disk": lambda: compliance_client.stats()["disk"],
+    "font_faces": lambda: font_cache_stats()["faces"],
+    "font_metrics": lambda: font_cache_stats()["metrics"],
+    "aesthetics": lambda: aesthetic_scorer.status()["cache"],
+    "detector": lambda: detector.status()["cache"],
+    "bg_remove": lambda: background_remover.status()["cache"],
+    "asset_index": asset_index.stats,
+    "canvas_versions": lambda: canvas_versions.stats()["documents"],
+}
+
+
+def _queue_depths():
+    return [
+        ({"queue": "render_jobs"}, render_jobs.stats()["outstanding"]),
+        ({"queue": "sd_generation"}, generation_scheduler.stats()["pending"]),
+        ({"queue": "audit_log"}, audit_sink.stats()["queue_depth"]),
+        ({"queue": "db_writes"}, db_writer.stats()["queue_depth"]),
+    ]
+
+
+registry.register_callback("adora_cache_hits_total", "Cache hits.", lambda: cache_samples(_CACHES, "hits"), kind="counter")
+registry.register_callback("adora_cache_misses_total", "Cache misses.", lambda: cache_samples(_CACHES, "misses"), kind="counter")
+registry.register_callback("adora_cache_hit_ratio", "Hits / lookups since start.", lambda: cache_samples(_CACHES, "hit_rate"))
+registry.register_callback("adora_cache_entries", "Entries currently cached.", lambda: cache_samples(_CACHES, "entries"))
+registry.register_callback("adora_queue_depth", "Items waiting in background queues.", _queue_depths)
+registry.register_callback(
+    "adora_audit_records_dropped_total", "Audit records dropped on a full queue.",
+    lambda: [({}, audit_sink.stats()["dropped"])], kind="counter",
+)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
 # ------------------------------------------------------------------------------
 # Health Check
 # ------------------------------------------------------------------------------
 
+def _has_module(name: str) -> bool:
+    import importlib.util
+    try:
+        return importlib.util.find_spec(name) is not None
+    except ModuleNotFoundError:
+        # find_spec raises (rather than returning None) when a parent package is missing
+        return False
+
+
 @app.get("/health")
 async def health_check():
-    import importlib.util
-    
     components = {
-        "optimum_onnx": bool(importlib.util.find_spec("optimum.onnxruntime")),
-        "onnxruntime": bool(importlib.util.find_spec("onnxruntime")),
+        "optimum_onnx": _has_module("optimum.onnxruntime"),
+        "onnxruntime": _has_module("onnxruntime"),
         "sd_client_ai": sd_client is not None,
+        "sd_pipeline": pipeline_manager.status(),
+        "sd_scheduler": generation_scheduler.stats(),
+        "sd_cache": sd_client.cache_stats(),
+        "aesthetics": aesthetic_scorer.status(),
+        "detector": detector.status(),
+        "bg_remove": background_remover.status(),
+        "llm": compliance_client.stats(),
+        "image_cache": image_cache_stats(),
+        "fonts": font_cache_stats(),
+        "contrast_cache": contrast_cache_stats(),
+        "render_jobs": render_jobs.stats(),
+        "audit_log": audit_sink.stats(),
+        "db_writer": db_writer.stats(),
+        "canvas_versions": canvas_versions.stats(),
         "uploads_dir": os.path.exists(UPLOAD_DIR),
         "renders_dir": os.path.exists(RENDER_DIR),
     }
@@ -1,10 +1,33 @@
 # backend/models/aesthetics.py
+import os
+import threading
+import importlib
+import importlib.util
+from typing import Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+from PIL import Image, ImageDraw
+
 from ..schemas import CreativeCanvas
+from ..utils.cache import LRUCache, hash_key
+from ..utils.fonts import get_font
+from ..utils.images import find_uploaded_file, load_image, packshot_rect
 
-def aesthetic_score(canvas: CreativeCanvas) -> float:
+# Small image-quality model (e.g. a MobileNet/NIMA export) taking a batch of
+# RGB thumbnails; unset means the heuristic scorer is used.
+AESTHETIC_MODEL_PATH = os.getenv("AESTHETIC_MODEL_PATH", "")
+AESTHETIC_THUMB_SIZE = int(os.getenv("AESTHETIC_THUMB_SIZE", "224"))
+AESTHETIC_CACHE_SIZE = int(os.getenv("AESTHETIC_CACHE_SIZE", "50000"))  # scores kept
+AESTHETIC_MAX_BATCH = int(os.getenv("AESTHETIC_MAX_BATCH", "64"))
+
+# ImageNet normalisation, which MobileNet-style backbones expect
+_MEAN = np.array([0.485, 0.456, 0.406], dtype=np.float32)
+_STD = np.array([0.229, 0.224, 0.225], dtype=np.float32)
+
+
+def heuristic_score(canvas: CreativeCanvas) -> float:
     """
-    Very simple heuristic aesthetic scorer stub.
-    Replace with a CNN/MobileNet-based scorer later.
+    Very simple heuristic aesthetic scorer, used when no model is configured.
     Returns a float in [0, 1].
     """
     score = 0.5
@@ -17,3 +40,188 @@ def aesthetic_score(canvas: CreativeCanvas) -> float:
         # be defensive — never crash the pipeline for scoring
         pass
     return max(0.0, min(1.0, score))
+
+
+def canvas_key(canvas: CreativeCanvas) -> str:
+    """
+    Canonical hash of what a canvas looks like. Ids and owner are left out,
+    so identical layouts (e.g. autofix revisiting a position) share a score.
+    """
+    return hash_key(canvas.dict(exclude={"id", "user_id"}))
+
+
+def render_thumbnail(canvas: CreativeCanvas, size: Tuple[int, int]) -> Image.Image:
+    """
+    Low-resolution RGB preview laid out like main.compose_canvas. Background
+    and packshots go through load_image's cache at thumbnail size, so only
+    the text is drawn per candidate.
+    """
+    W, H = size
+    sx, sy = W / canvas.width, H / canvas.height
+    base = Image.new("RGBA", (W, H), (255, 255, 255, 255))
+    if canvas.background_image_id:
+        bg_path = find_uploaded_file(canvas.background_image_id)
+        if bg_path is not None:
+            base.alpha_composite(load_image(bg_path, size=(W, H)), (0, 0))
+    for p_id in canvas.packshot_ids or []:
+        p_path = find_uploaded_file(p_id)
+        if p_path is None:
+            continue
+        x, y, w, h = packshot_rect((W, H))
+        base.alpha_composite(load_image(p_path, size=(w, h)), (x, y))
+
+    draw = ImageDraw.Draw(base)
+    scale = min(sx, sy)
+    for tb in canvas.text_blocks or []:
+        font = get_font(max(1, int(round(tb.font_size * scale))))
+        try:
+            draw.text((tb.x * sx, tb.y * sy), tb.text, fill=tb.color, font=font)
+        except ValueError:
+            draw.text((tb.x * sx, tb.y * sy), tb.text, fill="#000000", font=font)
+    return base.convert("RGB")
+
+
+class AestheticScorer:
+    """
+    Aesthetic model kept resident on CPUExecutionProvider. Candidates are
+    rendered as thumbnails and scored in one batched session run; scores are
+    cached by canonical canvas hash. Falls back to heuristic_score when no
+    model is configured or it fails to load.
+    """
+
+    def __init__(
+        self,
+        model_path: str = AESTHETIC_MODEL_PATH,
+        thumb_size: int = AESTHETIC_THUMB_SIZE,
+        cache_size: int = AESTHETIC_CACHE_SIZE,
+        max_batch: int = AESTHETIC_MAX_BATCH,
+        provider: str = "CPUExecutionProvider",
+    ):
+        self.model_path = model_path
+        self.thumb_size = thumb_size
+        self.max_batch = max(1, max_batch)
+        self.provider = provider
+        self._cache = LRUCache(cache_size)  # one unit per score
+        self._session: Any = None
+        self._input_name: Optional[str] = None
+        self._nhwc = False
+        self._state = "unloaded"  # unloaded | ready | failed | unavailable
+        self._error: Optional[str] = None
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.inferences = 0
+
+    def available(self) -> bool:
+        if not self.model_path:
+            return False
+        try:
+            return importlib.util.find_spec("onnxruntime") is not None
+        except Exception:
+            return False
+
+    def _load(self) -> bool:
+        if self._state == "ready":
+            return True
+        with self._lock:
+            if self._state in ("ready", "failed", "unavailable"):
+                return self._state == "ready"
+            if not self.available():
+                self._state = "unavailable"
+                return False
+            try:
+                ort = importlib.import_module("onnxruntime")
+                sess = ort.InferenceSession(self.model_path, providers=[self.provider])
+                inp = sess.get_inputs()[0]
+                shape = list(inp.shape)
+                # channels-last exports have 3 in the last axis, not the second
+                self._nhwc = len(shape) == 4 and shape[-1] == 3 and shape[1] != 3
+                self._input_name = inp.name
+                self._session = sess
+                self._state = "ready"
+            except Exception as e:
+                print("Aesthetic model load failed:", e)
+                self._error = str(e)
+                self._state = "failed"
+        return self._state == "ready"
+
+    def _tensor(self, canvases: Sequence[CreativeCanvas]) -> np.ndarray:
+        size = (self.thumb_size, self.thumb_size)
+        batch = np.stack([np.asarray(render_thumbnail(c, size), dtype=np.float32) for c in canvases])
+        batch = (batch / 255.0 - _MEAN) / _STD
+        if not self._nhwc:
+            batch = batch.transpose(0, 3, 1, 2)
+        return np.ascontiguousarray(batch, dtype=np.float32)
+
+    @staticmethod
+    def _to_scores(out: np.ndarray) -> np.ndarray:
+        out = np.asarray(out, dtype=np.float64).reshape(out.shape[0], -1)
+        if out.shape[1] == 1:
+            return np.clip(out[:, 0], 0.0, 1.0)
+        # NIMA-style distribution over ratings 1..K -> mean rating mapped to [0, 1]
+        probs = out / np.maximum(out.sum(axis=1, keepdims=True), 1e-12)
+        ratings = np.arange(1, out.shape[1] + 1, dtype=np.float64)
+        return (probs @ ratings - 1.0) / (out.shape[1] - 1)
+
+    def _infer(self, canvases: Sequence[CreativeCanvas]) -> List[float]:
+        scores: List[float] = []
+        for start in range(0, len(canvases), self.max_batch):
+            chunk = canvases[start:start + self.max_batch]
+            out = self._session.run(None, {self._input_name: self._tensor(chunk)})[0]
+            scores.extend(float(s) for s in self._to_scores(out))
+            self.batches += 1
+            self.inferences += len(chunk)
+        return scores
+
+    def score_batch(self, canvases: Sequence[CreativeCanvas]) -> List[float]:
+        """Scores in [0, 1] for many canvases; cache misses share one session run."""
+        if not canvases:
+            return []
+        if not self._load():
+            return [heuristic_score(c) for c in canvases]
+
+        keys = [canvas_key(c) for c in canvases]
+        scores: List[Optional[float]] = [self._cache.get(k) for k in keys]
+        # dedupe within the batch too: neighbours often coincide
+        missing = {}
+        for i, (k, s) in enumerate(zip(keys, scores)):
+            if s is None and k not in missing:
+                missing[k] = i
+        if missing:
+            try:
+                fresh = self._infer([canvases[i] for i in missing.values()])
+            except Exception as e:
+                print("Aesthetic scoring failed:", e)
+                return [s if s is not None else heuristic_score(c) for s, c in zip(scores, canvases)]
+            for k, s in zip(missing, fresh):
+                self._cache.put(k, s)
+            by_key = dict(zip(missing, fresh))
+            scores = [s if s is not None else by_key[k] for s, k in zip(scores, keys)]
+        return [float(s) for s in scores]
+
+    def score(self, canvas: CreativeCanvas) -> float:
+        return self.score_batch([canvas])[0]
+
+    def status(self) -> dict:
+        return {
+            "state": self._state,
+            "model_path": self.model_path or None,
+            "error": self._error,
+            "batches": self.batches,
+            "inferences": self.inferences,
+            "cache": self._cache.stats(),
+        }
+
+
+aesthetic_scorer = AestheticScorer()
+
+
+def aesthetic_score(canvas: CreativeCanvas) -> float:
+    """
+    Aesthetic score in [0, 1]: the ONNX model if AESTHETIC_MODEL_PATH is set,
+    otherwise the heuristic. Prefer aesthetic_scores() for many canvases.
+    """
+    return aesthetic_scorer.score(canvas)
+
+
+def aesthetic_scores(canvases: Sequence[CreativeCanvas]) -> List[float]:
+    return aesthetic_scorer.score_batch(canvases)
@@ -1,65 +1,380 @@
 # backend/models/autofix.py
-from typing import List, Tuple
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, NamedTuple, Optional, Tuple
 from copy import deepcopy
 from ..schemas import CreativeCanvas, ValidationResult
-from ..rules.engine import run_rules
-from .aesthetics import aesthetic_score
+from ..rules.contrast import LuminanceIntegral, backdrop_integral, low_contrast
+from ..rules.engine import block_error_count, canvas_error_count, config_for, run_rules
+from .aesthetics import aesthetic_score, aesthetic_scores
 
-def _neighbour_canvases(canvas: CreativeCanvas) -> List[CreativeCanvas]:
-    """Generate simple neighbouring layouts by nudging text blocks down
-    and increasing font size a bit. This is a basic hill-climb neighbourhood.
+
+class Move(NamedTuple):
+    """A candidate edit: shift one text block down by dy and grow its font by dfont."""
+    block: int  # index into canvas.text_blocks
+    block_id: str
+    dy: int = 0
+    dfont: int = 0
+
+
+def _neighbour_moves(canvas: CreativeCanvas) -> List[Move]:
+    """Nudge each text block down and increase its font size a bit.
+    This is a basic hill-climb neighbourhood, as deltas against `canvas`.
     """
-    neighbours: List[CreativeCanvas] = []
-    for tb in canvas.text_blocks or []:
+    moves: List[Move] = []
+    for i, tb in enumerate(canvas.text_blocks or []):
         for dy in (20, 40):
-            c2 = deepcopy(canvas)
-            for tb2 in c2.text_blocks:
-                if tb2.id == tb.id:
-                    tb2.y += dy
-            neighbours.append(c2)
+            moves.append(Move(i, tb.id, dy=dy))
         for dfont in (2, 4):
-            c2 = deepcopy(canvas)
-            for tb2 in c2.text_blocks:
-                if tb2.id == tb.id:
-                    tb2.font_size += dfont
-            neighbours.append(c2)
-    return neighbours
+            moves.append(Move(i, tb.id, dfont=dfont))
+    return moves
+
+
+def apply_move(canvas: CreativeCanvas, move: Move) -> CreativeCanvas:
+    """
+    Materialize a move. Only the edited block is copied; the new canvas
+    shares every other block with `canvas`, so treat both as immutable.
+    """
+    blocks = list(canvas.text_blocks or [])
+    tb = blocks[move.block]
+    blocks[move.block] = tb.copy(update={"y": tb.y + move.dy, "font_size": tb.font_size + move.dfont})
+    return canvas.copy(update={"text_blocks": blocks})
+
+
+def describe_move(move: Move) -> str:
+    if move.dy:
+        return f"Moved text '{move.block_id}' down {move.dy}px"
+    return f"Increased text '{move.block_id}' font by {move.dfont}px"
+
+
+def _neighbour_canvases(canvas: CreativeCanvas) -> List[CreativeCanvas]:
+    """Materialized neighbours of `canvas` (see _neighbour_moves)."""
+    return [apply_move(canvas, m) for m in _neighbour_moves(canvas)]
+
+
+class _RuleState:
+    """
+    Error counts for a base canvas, kept per text block so a candidate move
+    only re-checks the one block it touches. Per-block results are memoized
+    on (y, font_size) across iterations, since the climb keeps revisiting
+    the same positions.
+
+    With a backdrop `integral`, low-contrast warnings are tracked the same
+    way (memoized per block, as they depend on the block's text and colour).
+    """
+
+    def __init__(
+        self,
+        canvas: CreativeCanvas,
+        cfg,
+        memo: Dict[Tuple[int, int], int],
+        integral: Optional[LuminanceIntegral] = None,
+        contrast_memo: Optional[Dict[Tuple[int, int, int], bool]] = None,
+    ):
+        self.canvas = canvas
+        self._cfg = cfg
+        self._memo = memo
+        self._integral = integral
+        self._contrast_memo = contrast_memo if contrast_memo is not None else {}
+        blocks = canvas.text_blocks or []
+        self.block_errors = [self._errors(tb.y, tb.font_size) for tb in blocks]
+        self.total = sum(self.block_errors) + canvas_error_count(canvas, cfg)
+        self.block_warnings = [int(self._low_contrast(i, tb.y, tb.font_size)) for i, tb in enumerate(blocks)]
+        self.warnings = sum(self.block_warnings)
+
+    def _errors(self, y: int, font_size: int) -> int:
+        key = (y, font_size)
+        n = self._memo.get(key)
+        if n is None:
+            n = self._memo[key] = block_error_count(y, font_size, self._cfg)
+        return n
+
+    def _low_contrast(self, block: int, y: int, font_size: int) -> bool:
+        if self._integral is None:
+            return False
+        key = (block, y, font_size)
+        low = self._contrast_memo.get(key)
+        if low is None:
+            tb = self.canvas.text_blocks[block]
+            low = self._contrast_memo[key] = low_contrast(self._integral, tb, self._cfg, y, font_size)
+        return low
+
+    @property
+    def passed(self) -> bool:
+        return self.total == 0
+
+    def shortfall_with(self, move: Optional[Move] = None) -> int:
+        """
+        Pixels still missing to the safe-zone and font limits, summed over
+        blocks. Ranks failing layouts that have the same error count.
+        """
+        cfg = self._cfg
+        total = 0
+        for i, tb in enumerate(self.canvas.text_blocks or []):
+            y, font_size = tb.y, tb.font_size
+            if move is not None and i == move.block:
+                y, font_size = y + move.dy, font_size + move.dfont
+            total += max(0, cfg.top_safe_zone_px - y) + max(0, cfg.min_font_px - font_size)
+        return total
+
+    def errors_with(self, move: Move) -> int:
+        tb = self.canvas.text_blocks[move.block]
+        after = self._errors(tb.y + move.dy, tb.font_size + move.dfont)
+        return self.total - self.block_errors[move.block] + after
+
+    def passes_with(self, move: Move) -> bool:
+        return self.errors_with(move) == 0
+
+    def warnings_with(self, move: Move) -> int:
+        tb = self.canvas.text_blocks[move.block]
+        after = int(self._low_contrast(move.block, tb.y + move.dy, tb.font_size + move.dfont))
+        return self.warnings - self.block_warnings[move.block] + after
+
+
+def _deadline(time_budget_s: Optional[float]) -> Optional[float]:
+    return None if time_budget_s is None else time.monotonic() + max(0.0, time_budget_s)
+
+
+def _expired(deadline: Optional[float]) -> bool:
+    return deadline is not None and time.monotonic() >= deadline
+
 
 def hill_climb_autofix(
-    canvas: CreativeCanvas, max_iters: int = 20
+    canvas: CreativeCanvas, max_iters: int = 20, time_budget_s: Optional[float] = None
 ) -> Tuple[CreativeCanvas, ValidationResult, List[str]]:
     """
     Run a simple hill-climb to try to satisfy rules and improve aesthetics.
+    Candidates are (block, dy, dfont) deltas against the current canvas; rule
+    checks only re-evaluate the changed block, and a candidate is only built
+    as a canvas when it passes; passing candidates are scored as one batch.
+    Stops early (keeping the best canvas so far) once time_budget_s is spent.
     Returns: (best_canvas, validation_result, list_of_fix_descriptions)
     """
+    deadline = _deadline(time_budget_s)
     current = deepcopy(canvas)
-    current_val = run_rules(current)
-    current_score = aesthetic_score(current) if current_val.passed else 0.0
+    cfg = config_for(current)
+    memo: Dict[Tuple[int, int], int] = {}
+    state = _RuleState(current, cfg, memo)
+    current_score = aesthetic_score(current) if state.passed else 0.0
     fixes: List[str] = []
 
     for _ in range(max_iters):
-        neighbours = _neighbour_canvases(current)
-        best_candidate = current
-        best_val = current_val
+        if _expired(deadline):
+            break
+        best_candidate = None
         best_score = current_score
         best_fix_desc = None
 
-        for nc in neighbours:
-            val = run_rules(nc)
-            score = aesthetic_score(nc) if val.passed else 0.0
-            if val.passed and score > best_score:
+        # all passing neighbours of this iteration are scored in one batch
+        candidates = [apply_move(current, m) for m in _neighbour_moves(current) if state.passes_with(m)]
+        for nc, score in zip(candidates, aesthetic_scores(candidates)):
+            if score > best_score:
                 best_candidate = nc
-                best_val = val
                 best_score = score
                 best_fix_desc = "Adjusted text positions/font for better compliance & aesthetics"
 
-        if best_candidate is current:
+        if best_candidate is None:
             break  # no improvement
 
         current = best_candidate
-        current_val = best_val
         current_score = best_score
+        state = _RuleState(current, cfg, memo)
         if best_fix_desc:
             fixes.append(best_fix_desc)
 
-    return current, current_val, fixes
+    # full validation (with messages) only for the canvas we return
+    return current, run_rules(current), fixes
+
+
+# ------------------------------------------------------------------------------
+# Search strategies
+# ------------------------------------------------------------------------------
+
+AutofixResult = Tuple[CreativeCanvas, ValidationResult, List[str]]
+
+
+class AutofixStrategy(ABC):
+    """Base class: turn a canvas into a (hopefully) compliant one within a time budget."""
+    name = "base"
+
+    @abstractmethod
+    def run(self, canvas: CreativeCanvas, time_budget_s: Optional[float] = None) -> AutofixResult:
+        ...
+
+
+class HillClimbStrategy(AutofixStrategy):
+    """The original greedy neighbourhood search (see hill_climb_autofix)."""
+    name = "hill_climb"
+
+    def __init__(self, max_iters: int = 20):
+        self.max_iters = max_iters
+
+    def run(self, canvas: CreativeCanvas, time_budget_s: Optional[float] = None) -> AutofixResult:
+        return hill_climb_autofix(canvas, max_iters=self.max_iters, time_budget_s=time_budget_s)
+
+
+class ConstraintSolveStrategy(AutofixStrategy):
+    """
+    One-shot fix: move each text block just below the top safe zone and raise
+    its font to the preset minimum - the smallest change that satisfies the
+    GuidelineConfig limits. If the text then sits on a backdrop without
+    enough contrast, it is moved further down to the first position that has
+    it (each probe is an O(1) luminance lookup). Canvas-level issues (e.g.
+    too many packshots) can't be fixed by moving text and are reported as-is.
+    Once time_budget_s is spent, the remaining blocks still get the safe-zone
+    and font fixes but no contrast search.
+    """
+    name = "solve"
+    contrast_step_px = 10
+
+    def run(self, canvas: CreativeCanvas, time_budget_s: Optional[float] = None) -> AutofixResult:
+        deadline = _deadline(time_budget_s)
+        cfg = config_for(canvas)
+        integral = backdrop_integral(canvas)
+        blocks = list(canvas.text_blocks or [])
+        fixes: List[str] = []
+        for i, tb in enumerate(blocks):
+            y = max(tb.y, cfg.top_safe_zone_px)
+            font_size = max(tb.font_size, cfg.min_font_px)
+            contrast_y = self._find_contrast_y(integral, tb, cfg, y, font_size, canvas.height, deadline)
+            if (y, font_size) == (tb.y, tb.font_size) and contrast_y is None:
+                continue
+            if y != tb.y:
+                fixes.append(f"Moved text '{tb.id}' below the top safe zone (y {tb.y} -> {y}px)")
+            if font_size != tb.font_size:
+                fixes.append(f"Raised text '{tb.id}' font to the minimum ({tb.font_size} -> {font_size}px)")
+            if contrast_y is not None:
+                fixes.append(f"Moved text '{tb.id}' for contrast (y {y} -> {contrast_y}px)")
+                y = contrast_y
+            blocks[i] = tb.copy(update={"y": y, "font_size": font_size})
+        fixed = canvas.copy(update={"text_blocks": blocks})
+        return fixed, run_rules(fixed), fixes
+
+    def _find_contrast_y(
+        self, integral, tb, cfg, y: int, font_size: int, height: int, deadline: Optional[float] = None
+    ) -> Optional[int]:
+        """First y at or below `y` with enough contrast, if the current one lacks it."""
+        if _expired(deadline) or not low_contrast(integral, tb, cfg, y, font_size):
+            return None
+        for cand in range(y + self.contrast_step_px, height - font_size, self.contrast_step_px):
+            if _expired(deadline):
+                break
+            if not low_contrast(integral, tb, cfg, cand, font_size):
+                return cand
+        return None
+
+
+def _layout_key(canvas: CreativeCanvas) -> Tuple[Tuple[int, int], ...]:
+    return tuple((tb.y, tb.font_size) for tb in canvas.text_blocks or [])
+
+
+class _Node(NamedTuple):
+    """A beam entry: remaining errors, aesthetic score and how we got here."""
+    errors: int
+    shortfall: int
+    warnings: int
+    score: float
+    fixes: List[str]
+    state: "_RuleState"
+
+
+def _rank(node: _Node):
+    return node.errors, node.shortfall, node.warnings, -node.score
+
+
+class BeamSearchStrategy(AutofixStrategy):
+    """
+    Beam search over the same move neighbourhood as the hill-climb. Candidates
+    are ranked by remaining rule errors, then by how far they still are from
+    the limits, then by low-contrast warnings, then by aesthetic score, so
+    the search can walk out of a failing layout (where the hill-climb only
+    sees score 0.0 everywhere). Error counts come from the incremental rule
+    state; only passing candidates are materialized and scored (as one
+    batch), plus the failing ones that make it into the beam.
+    """
+    name = "beam"
+
+    def __init__(self, width: int = 4, max_iters: int = 20):
+        self.width = max(1, width)
+        self.max_iters = max_iters
+
+    def run(self, canvas: CreativeCanvas, time_budget_s: Optional[float] = None) -> AutofixResult:
+        deadline = _deadline(time_budget_s)
+        cfg = config_for(canvas)
+        memo: Dict[Tuple[int, int], int] = {}
+        integral = backdrop_integral(canvas)
+        contrast_memo: Dict[Tuple[int, int, int], bool] = {}
+
+        def state_for(c: CreativeCanvas) -> _RuleState:
+            return _RuleState(c, cfg, memo, integral, contrast_memo)
+
+        start = state_for(deepcopy(canvas))
+        start_score = aesthetic_score(start.canvas) if start.passed else 0.0
+        best = _Node(start.total, start.shortfall_with(), start.warnings, start_score, [], start)
+        beam = [best]
+        seen = {_layout_key(start.canvas)}
+
+        for _ in range(self.max_iters):
+            if _expired(deadline):
+                break
+
+            # ((errors, shortfall, warnings) after move, parent node, move) for every unseen neighbour
+            expanded: List[Tuple[Tuple[int, int, int], _Node, Move]] = []
+            for node in beam:
+                base_key = _layout_key(node.state.canvas)
+                for move in _neighbour_moves(node.state.canvas):
+                    tb = node.state.canvas.text_blocks[move.block]
+                    key = base_key[:move.block] + ((tb.y + move.dy, tb.font_size + move.dfont),) + base_key[move.block + 1:]
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    ranks = (node.state.errors_with(move), node.state.shortfall_with(move), node.state.warnings_with(move))
+                    expanded.append((ranks, node, move))
+            if not expanded:
+                break
+
+            passing = [(n, m) for e, n, m in expanded if e[0] == 0]
+            failing = sorted(((e, n, m) for e, n, m in expanded if e[0] > 0), key=lambda t: t[0])
+            failing = failing[: max(0, self.width - len(passing))]
+
+            passing_canvases = [apply_move(n.state.canvas, m) for n, m in passing]
+            scores = aesthetic_scores(passing_canvases)
+            nodes: List[_Node] = []
+            for (n, m), c, sc in zip(passing, passing_canvases, scores):
+                st = state_for(c)
+                nodes.append(_Node(0, 0, st.warnings, sc, n.fixes + [describe_move(m)], st))
+            nodes += [
+                _Node(*e, 0.0, n.fixes + [describe_move(m)], state_for(apply_move(n.state.canvas, m)))
+                for e, n, m in failing
+            ]
+            nodes.sort(key=_rank)
+            beam = nodes[: self.width]
+
+            if _rank(beam[0]) >= _rank(best):
+                break  # no improvement
+            best = beam[0]
+
+        return best.state.canvas, run_rules(best.state.canvas), best.fixes
+
+
+STRATEGIES = {
+    HillClimbStrategy.name: HillClimbStrategy,
+    ConstraintSolveStrategy.name: ConstraintSolveStrategy,
+    BeamSearchStrategy.name: BeamSearchStrategy,
+}
+
+
+def autofix(
+    canvas: CreativeCanvas,
+    strategy: str = "solve",
+    time_budget_s: Optional[float] = None,
+    **options,
+) -> AutofixResult:
+    """
+    Fix a canvas with the named strategy ("solve", "beam" or "hill_climb").
+    `options` go to the strategy's constructor (e.g. width=8 for beam).
+    """
+    cls = STRATEGIES.get(strategy)
+    if cls is None:
+        raise ValueError(f"Unknown autofix strategy: {strategy}")
+    return cls(**options).run(canvas, time_budget_s=time_budget_s)
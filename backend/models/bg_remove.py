@@ -1,9 +1,195 @@
 # backend/models/bg_remove.py
-from typing import Optional
-from PIL import Image
 import io
+import os
+import threading
 import importlib
 import importlib.util
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence, Union
+from PIL import Image
+
+from ..config import CUTOUT_CACHE_DIR, CUTOUT_CACHE_MAX_BYTES
+from ..utils.cache import DiskCache, file_hash, hash_key
+from ..utils.images import image_hash
+
+# rembg model name (u2net, u2netp, isnet-general-use, silueta, ...)
+REMBG_MODEL = os.getenv("REMBG_MODEL", "u2net")
+# Processes for bulk cutouts; each one loads its own model session
+CUTOUT_WORKERS = int(os.getenv("CUTOUT_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+
+
+class BackgroundRemover:
+    """
+    rembg with one model session for the life of the process. Images are
+    passed to rembg as PIL objects (no PNG round trip) and cutouts are cached
+    on disk by source hash, so a packshot is only ever cut out once.
+    """
+
+    def __init__(self, model_name: str = REMBG_MODEL, cache: Optional[DiskCache] = None):
+        self.model_name = model_name
+        self.cache = cache if cache is not None else DiskCache(CUTOUT_CACHE_DIR, CUTOUT_CACHE_MAX_BYTES, suffix=".png")
+        self._session: Any = None
+        self._remove: Any = None
+        self._state = "unloaded"  # unloaded | ready | failed | unavailable
+        self._error: Optional[str] = None
+        self._lock = threading.Lock()
+        self.removals = 0
+
+    def available(self) -> bool:
+        try:
+            return importlib.util.find_spec("rembg") is not None
+        except Exception:
+            return False
+
+    def load(self) -> bool:
+        if self._state == "ready":
+            return True
+        with self._lock:
+            if self._state in ("ready", "failed", "unavailable"):
+                return self._state == "ready"
+            if not self.available():
+                self._state = "unavailable"
+                return False
+            try:
+                rembg = importlib.import_module("rembg")
+                self._session = rembg.new_session(self.model_name)
+                self._remove = rembg.remove
+                self._state = "ready"
+            except Exception as e:
+                print("rembg load failed:", e)
+                self._error = str(e)
+                self._state = "failed"
+        return self._state == "ready"
+
+    def cache_key(self, source_hash: str) -> str:
+        return hash_key(source_hash, self.model_name)
+
+    def _cached(self, key: str) -> Optional[Image.Image]:
+        raw = self.cache.get(key)
+        if raw is None:
+            return None
+        try:
+            return Image.open(io.BytesIO(raw)).convert("RGBA")
+        except Exception:
+            return None  # corrupt entry; recompute and overwrite
+
+    def _store(self, key: str, cutout: Image.Image) -> Optional[Path]:
+        buf = io.BytesIO()
+        # low compression: this is a cache, write speed matters more than bytes
+        cutout.save(buf, format="PNG", compress_level=1)
+        return self.cache.put(key, buf.getvalue())
+
+    def _cut(self, image: Image.Image) -> Image.Image:
+        # PIL in, PIL out; rembg only encodes when given bytes
+        out = self._remove(image, session=self._session)
+        self.removals += 1
+        return out.convert("RGBA")
+
+    def remove(self, image: Image.Image, source_hash: Optional[str] = None) -> Image.Image:
+        """
+        Cut out `image`. `source_hash` identifies the source for the disk
+        cache (the pixel hash is used if omitted). Returns the image converted
+        to RGBA if rembg is unavailable or fails.
+        """
+        if not self.load():
+            return image.convert("RGBA")
+        key = self.cache_key(source_hash or image_hash(image))
+        cutout = self._cached(key)
+        if cutout is not None:
+            return cutout
+        try:
+            cutout = self._cut(image)
+        except Exception as e:
+            print("Background removal failed:", e)
+            return image.convert("RGBA")
+        try:
+            self._store(key, cutout)
+        except Exception:
+            pass
+        return cutout
+
+    def remove_file(self, path: Union[str, Path]) -> Image.Image:
+        """Cut out an image file, cached by the file's content hash."""
+        path = Path(path)
+        with Image.open(path) as im:
+            image = im.convert("RGBA")
+        return self.remove(image, source_hash=file_hash(path))
+
+    def remove_paths(
+        self, paths: Sequence[Union[str, Path]], workers: int = CUTOUT_WORKERS
+    ) -> Dict[Path, Path]:
+        """
+        Bulk mode: cut out many files across a process pool (one model session
+        per worker) and return {source path: cached cutout PNG}. Sources that
+        are already cached are not sent to the pool.
+        """
+        out: Dict[Path, Path] = {}
+        todo = []
+        for p in map(Path, paths):
+            try:
+                key = self.cache_key(file_hash(p))
+            except OSError:
+                continue
+            cached = self.cache.path_for(key)
+            if cached.exists():
+                out[p] = cached
+            else:
+                todo.append((str(p), key))
+        if not todo:
+            return out
+        if not self.available():
+            print("rembg not installed; skipping", len(todo), "files")
+            return out
+
+        with ProcessPoolExecutor(
+            max_workers=max(1, workers),
+            initializer=_init_worker,
+            initargs=(self.model_name, str(self.cache.root), self.cache.max_bytes),
+        ) as pool:
+            futures = {pool.submit(_cut_file, src, key): src for src, key in todo}
+            for fut in as_completed(futures):
+                try:
+                    dest = fut.result()
+                except Exception as e:
+                    print("Cutout failed for", futures[fut], e)
+                    continue
+                if dest is not None:
+                    out[Path(futures[fut])] = Path(dest)
+        return out
+
+    def status(self) -> dict:
+        return {
+            "state": self._state,
+            "model": self.model_name,
+            "error": self._error,
+            "removals": self.removals,
+            "cache": self.cache.stats(),
+        }
+
+
+# Per-process remover for remove_paths workers
+_worker_remover: Optional[BackgroundRemover] = None
+
+
+def _init_worker(model_name: str, cache_root: str, cache_max_bytes: int) -> None:
+    global _worker_remover
+    _worker_remover = BackgroundRemover(model_name, DiskCache(Path(cache_root), cache_max_bytes, suffix=".png"))
+    _worker_remover.load()
+
+
+def _cut_file(src: str, key: str) -> Optional[str]:
+    remover = _worker_remover
+    if remover is None or not remover.load():
+        return None
+    with Image.open(src) as im:
+        image = im.convert("RGBA")
+    dest = remover._store(key, remover._cut(image))
+    return str(dest) if dest is not None else None
+
+
+background_remover = BackgroundRemover()
+
 
 def remove_background(image: Image.Image) -> Optional[Image.Image]:
     """
@@ -11,17 +197,7 @@ def remove_background(image: Image.Image) -> Optional[Image.Image]:
     Returns an RGBA PIL image. On failure returns the original image converted to RGBA.
     """
     try:
-        # Lazy import to avoid static import-time errors if rembg isn't installed.
-        if importlib.util.find_spec("rembg") is None:
-            return image.convert("RGBA")
-        rembg = importlib.import_module("rembg")
-        remove = getattr(rembg, "remove", None)
-        if remove is None:
-            return image.convert("RGBA")
-        buf = io.BytesIO()
-        image.save(buf, format="PNG")
-        out = remove(buf.getvalue())
-        return Image.open(io.BytesIO(out)).convert("RGBA")
+        return background_remover.remove(image)
     except Exception:
         # graceful fallback: return RGBA-converted original
         try:
@@ -1,48 +1,238 @@
 # backend/models/detection.py
-from typing import List, Dict
-from PIL import Image
+import os
+import threading
 import importlib
 import importlib.util
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Union
+from PIL import Image
+import numpy as np
 
-def detect_person_and_objects(image: Image.Image) -> List[Dict]:
+from ..utils.cache import LRUCache, file_hash
+from ..utils.images import image_hash
+
+# .pt weights or an ONNX export (faster on CPU); ultralytics loads either
+YOLO_MODEL_PATH = os.getenv("YOLO_MODEL_PATH", "yolov8n.pt")
+YOLO_CONF = float(os.getenv("YOLO_CONF", "0.25"))
+YOLO_IMGSZ = int(os.getenv("YOLO_IMGSZ", "640"))
+YOLO_BATCH = int(os.getenv("YOLO_BATCH", "16"))
+# Cached detection results (entries, not bytes); results are tiny
+DETECTION_CACHE_SIZE = int(os.getenv("DETECTION_CACHE_SIZE", "10000"))
+
+
+class Detections(NamedTuple):
+    """Detections for one image as parallel arrays (row i is one box)."""
+    boxes: np.ndarray  # (N, 4) float32, xyxy in source pixels
+    scores: np.ndarray  # (N,) float32
+    classes: np.ndarray  # (N,) int32
+    names: Dict[int, str]
+
+    def __len__(self) -> int:
+        return int(self.scores.shape[0])
+
+    def class_mask(self, label: str) -> np.ndarray:
+        ids = [i for i, n in self.names.items() if n == label]
+        return np.isin(self.classes, ids)
+
+    def has(self, label: str) -> bool:
+        return bool(self.class_mask(label).any())
+
+    def to_dicts(self) -> List[Dict]:
+        """Per-box {label, conf, box} dicts (the old detect_person_and_objects format)."""
+        return [
+            {"label": self.names.get(int(c), str(int(c))), "conf": float(s), "box": b.tolist()}
+            for b, s, c in zip(self.boxes, self.scores, self.classes)
+        ]
+
+
+def _empty(names: Optional[Dict[int, str]] = None) -> Detections:
+    return Detections(
+        boxes=np.zeros((0, 4), dtype=np.float32),
+        scores=np.zeros((0,), dtype=np.float32),
+        classes=np.zeros((0,), dtype=np.int32),
+        names=names or {},
+    )
+
+
+def _numpy(t: Any) -> np.ndarray:
+    # ultralytics returns torch tensors for .pt models, numpy for some exports
+    if hasattr(t, "cpu"):
+        t = t.cpu()
+    if hasattr(t, "numpy"):
+        return t.numpy()
+    return np.asarray(t)
+
+
+class DetectorService:
     """
-    Run YOLOv8 detection if ultralytics is installed and a model can be loaded.
-    Returns list of {label, conf, box}. If not available, returns empty list.
+    Process-wide YOLO detector. The model is loaded once (lazily) and images
+    are run through it in batches; results are cached by content hash, since
+    uploads never change once stored.
     """
-    # Try to import ultralytics/YOLO lazily
-    try:
-        if importlib.util.find_spec("ultralytics") is None:
-            return []
-        ultralytics = importlib.import_module("ultralytics")
-        YOLO = getattr(ultralytics, "YOLO", None)
-        if YOLO is None:
-            return []
-        # try to create/load a light model; if local weights missing, creation may raise
+
+    def __init__(
+        self,
+        model_path: str = YOLO_MODEL_PATH,
+        conf: float = YOLO_CONF,
+        imgsz: int = YOLO_IMGSZ,
+        batch_size: int = YOLO_BATCH,
+        cache_size: int = DETECTION_CACHE_SIZE,
+    ):
+        self.model_path = model_path
+        self.conf = conf
+        self.imgsz = imgsz
+        self.batch_size = max(1, batch_size)
+        self._cache = LRUCache(cache_size)  # one unit per image
+        self._model: Any = None
+        self._names: Dict[int, str] = {}
+        self._state = "unloaded"  # unloaded | ready | failed | unavailable
+        self._error: Optional[str] = None
+        self._load_lock = threading.Lock()
+        # ultralytics predictors keep per-call state; serialize inference
+        self._run_lock = threading.Lock()
+        self.batches = 0
+        self.images = 0
+
+    def available(self) -> bool:
         try:
-            model = YOLO("yolov8n.pt")
+            return importlib.util.find_spec("ultralytics") is not None
         except Exception:
-            # if local weight not present, try default ctor (may download)
+            return False
+
+    def load(self) -> bool:
+        if self._state == "ready":
+            return True
+        with self._load_lock:
+            if self._state in ("ready", "failed", "unavailable"):
+                return self._state == "ready"
+            if not self.available():
+                self._state = "unavailable"
+                return False
+            try:
+                YOLO = getattr(importlib.import_module("ultralytics"), "YOLO")
+                # ONNX exports need the task spelled out; .pt weights carry it
+                task = "detect" if str(self.model_path).endswith(".onnx") else None
+                self._model = YOLO(self.model_path, task=task) if task else YOLO(self.model_path)
+                self._names = dict(getattr(self._model, "names", {}) or {})
+                self._state = "ready"
+            except Exception as e:
+                print("Detector load failed:", e)
+                self._error = str(e)
+                self._state = "failed"
+        return self._state == "ready"
+
+    def _cache_key(self, content_hash: str):
+        return content_hash, self.model_path, self.conf, self.imgsz
+
+    def _predict(self, images: Sequence[Image.Image]) -> List[Detections]:
+        out: List[Detections] = []
+        for start in range(0, len(images), self.batch_size):
+            chunk = [im.convert("RGB") for im in images[start:start + self.batch_size]]
+            with self._run_lock:
+                results = self._model.predict(chunk, conf=self.conf, imgsz=self.imgsz, verbose=False)
+            self.batches += 1
+            self.images += len(chunk)
+            for r in results:
+                names = dict(getattr(r, "names", None) or self._names)
+                boxes = getattr(r, "boxes", None)
+                if boxes is None or len(boxes) == 0:
+                    out.append(_empty(names))
+                    continue
+                out.append(Detections(
+                    boxes=_numpy(boxes.xyxy).astype(np.float32).reshape(-1, 4),
+                    scores=_numpy(boxes.conf).astype(np.float32).reshape(-1),
+                    classes=_numpy(boxes.cls).astype(np.int32).reshape(-1),
+                    names=names,
+                ))
+        return out
+
+    def detect_batch(
+        self, images: Sequence[Image.Image], hashes: Optional[Sequence[str]] = None
+    ) -> List[Detections]:
+        """
+        Detect objects in many images with batched inference. `hashes` are
+        content hashes to cache under (computed from the pixels if omitted).
+        Returns empty Detections for every image if no model is available.
+        """
+        if not images:
+            return []
+        if not self.load():
+            return [_empty() for _ in images]
+        if hashes is None:
+            hashes = [image_hash(im) for im in images]
+
+        results: List[Optional[Detections]] = [self._cache.get(self._cache_key(h)) for h in hashes]
+        todo = [i for i, r in enumerate(results) if r is None]
+        if todo:
+            try:
+                fresh = self._predict([images[i] for i in todo])
+            except Exception as e:
+                print("Detection failed:", e)
+                fresh = [_empty(self._names) for _ in todo]
+            else:
+                for i, det in zip(todo, fresh):
+                    self._cache.put(self._cache_key(hashes[i]), det)
+            for i, det in zip(todo, fresh):
+                results[i] = det
+        return results  # type: ignore[return-value]
+
+    def detect(self, image: Image.Image) -> Detections:
+        return self.detect_batch([image])[0]
+
+    def detect_paths(self, paths: Sequence[Union[str, Path]]) -> Dict[Path, Detections]:
+        """
+        Detect objects in image files, e.g. a whole upload directory. Files are
+        hashed first and only cache misses are decoded, one batch at a time,
+        so memory stays bounded by the batch size.
+        """
+        out: Dict[Path, Detections] = {}
+        pending: List[tuple] = []  # (path, hash) still needing inference
+        for p in map(Path, paths):
             try:
-                model = YOLO()
-            except Exception:
-                return []
-        results = model(image)
-        out = []
-        for r in results:
-            boxes = getattr(r, "boxes", []) or []
-            for box in boxes:
-                cls = int(getattr(box, "cls", 0))
-                # r.names may be dict-like; fallback to string
-                label = r.names.get(cls, str(cls)) if hasattr(r, "names") else str(cls)
-                conf = float(getattr(box, "conf", 0.0))
-                coords = []
-                if hasattr(box, "xyxy"):
-                    xyxy = box.xyxy[0]
-                    try:
-                        coords = xyxy.tolist()
-                    except Exception:
-                        coords = [0, 0, 0, 0]
-                out.append({"label": label, "conf": conf, "box": coords})
+                h = file_hash(p)
+            except OSError:
+                continue
+            cached = self._cache.get(self._cache_key(h))
+            if cached is not None:
+                out[p] = cached
+            else:
+                pending.append((p, h))
+
+        for start in range(0, len(pending), self.batch_size):
+            chunk = pending[start:start + self.batch_size]
+            images, hashes, chunk_paths = [], [], []
+            for p, h in chunk:
+                try:
+                    with Image.open(p) as im:
+                        images.append(im.convert("RGB"))
+                except Exception:
+                    continue
+                hashes.append(h)
+                chunk_paths.append(p)
+            for p, det in zip(chunk_paths, self.detect_batch(images, hashes)):
+                out[p] = det
         return out
+
+    def status(self) -> dict:
+        return {
+            "state": self._state,
+            "model_path": self.model_path,
+            "error": self._error,
+            "batches": self.batches,
+            "images": self.images,
+            "cache": self._cache.stats(),
+        }
+
+
+detector = DetectorService()
+
+
+def detect_person_and_objects(image: Image.Image) -> List[Dict]:
+    """
+    Run YOLOv8 detection if ultralytics is installed and a model can be loaded.
+    Returns list of {label, conf, box}. If not available, returns empty list.
+    """
+    try:
+        return detector.detect(image).to_dicts()
     except Exception:
         return []
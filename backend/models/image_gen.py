@@ -1,41 +1,266 @@
 # backend/models/image_gen.py
 import os
 import io
+import time
+import queue
+import threading
 import importlib
 import importlib.util
-from typing import Optional, Tuple
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from PIL import Image
 import requests
 import base64
 
+from .sd_scheduler import GenerationScheduler, GenerationTimeout
+
 ONNX_MODEL_PATH = os.getenv("ONNX_MODEL_PATH", "")
 FASTSD_CLI_URL = os.getenv("FASTSD_CLI_URL", "")
 DEFAULT_SIZE = (768, 512)
 
-def _use_optimum_onnx(prompt: str, size: Tuple[int,int]) -> Optional[Image.Image]:
-    if not ONNX_MODEL_PATH:
-        return None
-    if importlib.util.find_spec("optimum.onnxruntime") is None:
+SD_STEPS = int(os.getenv("SD_STEPS", "22"))
+SD_GUIDANCE = float(os.getenv("SD_GUIDANCE", "7.5"))
+# Number of independent pipelines (ORT sessions) kept resident. Each one holds
+# a full copy of the model weights, so keep this small on CPU hosts.
+SD_POOL_SIZE = int(os.getenv("SD_POOL_SIZE", "1"))
+SD_WARMUP_STEPS = int(os.getenv("SD_WARMUP_STEPS", "1"))
+# Fixed seed makes generations reproducible, so a cached background is exactly
+# what a fresh generation would give. Unset, each generation is random, but
+# sd_client still caches by prompt: a repeated prompt returns the first image
+# generated for it until that entry is evicted.
+SD_SEED: Optional[int] = int(os.environ["SD_SEED"]) if os.getenv("SD_SEED") else None
+# Micro-batching of concurrent requests in front of the pipeline (see sd_scheduler)
+SD_BATCH_WINDOW_MS = float(os.getenv("SD_BATCH_WINDOW_MS", "50"))
+SD_MAX_BATCH = int(os.getenv("SD_MAX_BATCH", "4"))
+# Longest a caller waits for its (batched) generation before the render fails
+SD_GENERATE_TIMEOUT_S = float(os.getenv("SD_GENERATE_TIMEOUT_S", "300"))
+# More concurrent jobs than pooled pipelines would only queue on the pool
+SD_MAX_CONCURRENT = int(os.getenv("SD_MAX_CONCURRENT", str(SD_POOL_SIZE)))
+
+
+class PipelineManager:
+    """
+    Process-wide owner of the ONNX Stable Diffusion pipeline(s).
+
+    The pipeline is loaded once (lazily on first use, or eagerly via load()
+    at startup) and then handed out to one thread at a time from a small
+    pool, since a single ORT session should not run concurrent inferences.
+    """
+
+    def __init__(self, model_path: str, pool_size: int = 1, provider: str = "CPUExecutionProvider"):
+        self.model_path = model_path
+        self.pool_size = max(1, pool_size)
+        self.provider = provider
+        self._load_lock = threading.Lock()
+        self._pool: "queue.Queue[Any]" = queue.Queue()
+        # reset() bumps the generation; pipelines borrowed before it are dropped
+        # on release instead of going back into the reloaded pool
+        self._generation = 0
+        self._pipe_generation: Dict[int, int] = {}
+        self._release_lock = threading.Lock()
+        self._state = "unloaded"  # unloaded | loading | ready | failed | unavailable
+        self._warm = False
+        self._error: Optional[str] = None
+        self._load_seconds: Optional[float] = None
+        self._warmup_seconds: Optional[float] = None
+        self._inferences = 0
+
+    @property
+    def ready(self) -> bool:
+        return self._state == "ready"
+
+    def available(self) -> bool:
+        """True if a model path is configured and optimum/onnxruntime is importable."""
+        if not self.model_path:
+            return False
+        try:
+            return importlib.util.find_spec("optimum.onnxruntime") is not None
+        except Exception:
+            return False
+
+    def load(self, warmup: bool = True) -> bool:
+        """
+        Load the pipeline pool if not loaded yet. Safe to call from many threads;
+        only the first caller pays the load cost. A failed load is not retried
+        automatically (see reset()).
+        """
+        if self._state == "ready":
+            return True
+        with self._load_lock:
+            if self._state == "ready":
+                return True
+            if self._state in ("failed", "unavailable"):
+                return False
+            if not self.available():
+                self._state = "unavailable"
+                return False
+
+            self._state = "loading"
+            t0 = time.perf_counter()
+            try:
+                from optimum.onnxruntime import ORTStableDiffusionPipeline
+                pipes = [
+                    ORTStableDiffusionPipeline.from_pretrained(self.model_path, provider=self.provider)
+                    for _ in range(self.pool_size)
+                ]
+            except Exception as e:
+                self._state = "failed"
+                self._error = str(e)
+                return False
+
+            with self._release_lock:
+                for pipe in pipes:
+                    self._pipe_generation[id(pipe)] = self._generation
+                    self._pool.put(pipe)
+            self._load_seconds = time.perf_counter() - t0
+            self._state = "ready"
+
+        if warmup:
+            self.warmup()
+        return True
+
+    def warmup(self) -> None:
+        """Run a tiny inference on every pooled pipeline so ORT allocates its arenas up front."""
+        if not self.ready or self._warm:
+            return
+        t0 = time.perf_counter()
+        try:
+            for _ in range(self.pool_size):
+                # take each pipeline once; sequential acquire cycles the queue
+                pipe = self._pool.get()
+                try:
+                    pipe("warmup", num_inference_steps=max(1, SD_WARMUP_STEPS), guidance_scale=SD_GUIDANCE)
+                finally:
+                    self._release(pipe)
+            self._warm = True
+            self._warmup_seconds = time.perf_counter() - t0
+        except Exception as e:
+            # warm-up failure is not fatal; real requests will still try
+            self._error = f"warmup failed: {e}"
+
+    def reset(self) -> None:
+        """Drop loaded pipelines and clear a sticky failure so the next call reloads."""
+        with self._load_lock, self._release_lock:
+            self._generation += 1
+            self._pipe_generation.clear()
+            while not self._pool.empty():
+                try:
+                    self._pool.get_nowait()
+                except queue.Empty:
+                    break
+            self._state = "unloaded"
+            self._warm = False
+            self._error = None
+
+    @contextmanager
+    def acquire(self) -> Iterator[Any]:
+        """Borrow a pipeline for exclusive use by the calling thread."""
+        pipe = self._pool.get()
+        try:
+            yield pipe
+        finally:
+            self._release(pipe)
+
+    def _release(self, pipe: Any) -> None:
+        with self._release_lock:
+            if self._pipe_generation.get(id(pipe)) == self._generation:
+                self._pool.put(pipe)
+
+    def run(
+        self,
+        prompt: str,
+        num_inference_steps: int = SD_STEPS,
+        guidance_scale: float = SD_GUIDANCE,
+        seed: Optional[int] = None,
+    ) -> Optional[Image.Image]:
+        images = self.run_batch([prompt], num_inference_steps, guidance_scale, seed)
+        return images[0] if images else None
+
+    def run_batch(
+        self,
+        prompts: List[str],
+        num_inference_steps: int = SD_STEPS,
+        guidance_scale: float = SD_GUIDANCE,
+        seed: Optional[int] = None,
+    ) -> List[Optional[Image.Image]]:
+        """Generate one image per prompt in a single pipeline call."""
+        if not prompts or not self.load():
+            return []
+        kwargs: Dict[str, Any] = {}
+        if seed is not None:
+            import numpy as np
+            # ORT pipelines take a numpy RandomState as their generator
+            kwargs["generator"] = np.random.RandomState(seed)
+        with self.acquire() as pipe:
+            out = pipe(
+                prompts if len(prompts) > 1 else prompts[0],
+                num_inference_steps=num_inference_steps,
+                guidance_scale=guidance_scale,
+                num_images_per_prompt=1,
+                **kwargs,
+            )
+        self._inferences += 1
+        return list(out.images)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "state": self._state,
+            "warm": self._warm,
+            "model_path": self.model_path or None,
+            "pool_size": self.pool_size,
+            "generation": self._generation,
+            "idle": self._pool.qsize(),
+            "load_seconds": self._load_seconds,
+            "warmup_seconds": self._warmup_seconds,
+            "inferences": self._inferences,
+            "error": self._error,
+        }
+
+
+pipeline_manager = PipelineManager(ONNX_MODEL_PATH, pool_size=SD_POOL_SIZE)
+
+generation_scheduler = GenerationScheduler(
+    pipeline_manager.run_batch,
+    window_s=SD_BATCH_WINDOW_MS / 1000.0,
+    max_batch=SD_MAX_BATCH,
+    max_concurrent=SD_MAX_CONCURRENT,
+)
+
+
+def model_id() -> str:
+    """Identifier of the backend that would serve generate_image(); part of cache keys."""
+    if pipeline_manager.available():
+        return f"onnx:{ONNX_MODEL_PATH}"
+    if FASTSD_CLI_URL:
+        return f"fastsd:{FASTSD_CLI_URL}"
+    return "none"
+
+
+def _use_optimum_onnx(prompt: str, size: Tuple[int,int], seed: Optional[int] = None) -> Optional[Image.Image]:
+    if not pipeline_manager.available():
         return None
     try:
-        from optimum.onnxruntime import ORTStableDiffusionPipeline
-        pipe = ORTStableDiffusionPipeline.from_pretrained(
-            ONNX_MODEL_PATH, provider="CPUExecutionProvider"
+        img = generation_scheduler.generate(
+            prompt, SD_STEPS, SD_GUIDANCE, seed=seed, timeout=SD_GENERATE_TIMEOUT_S
         )
-        out = pipe(prompt, num_inference_steps=22, guidance_scale=7.5)
-        img = out.images[0]
+        if img is None:
+            return None
         if img.size != size:
             img = img.resize(size, Image.LANCZOS)
         return img.convert("RGBA")
+    except GenerationTimeout:
+        raise  # a hung pipeline is a render error, not a missing background
     except Exception:
         return None
 
 
-def _use_fastsd_service(prompt: str, size: Tuple[int,int]) -> Optional[Image.Image]:
+def _use_fastsd_service(prompt: str, size: Tuple[int,int], seed: Optional[int] = None) -> Optional[Image.Image]:
     if not FASTSD_CLI_URL:
         return None
     try:
         payload = {"prompt": prompt, "width": size[0], "height": size[1]}
+        if seed is not None:
+            payload["seed"] = seed
         r = requests.post(FASTSD_CLI_URL, json=payload, timeout=180)
 
         if not r.ok:
@@ -60,12 +285,12 @@ def _use_fastsd_service(prompt: str, size: Tuple[int,int]) -> Optional[Image.Ima
         return None
 
 
-def generate_image(prompt: str, size: Tuple[int,int]=DEFAULT_SIZE) -> Optional[Image.Image]:
-    img = _use_optimum_onnx(prompt, size)
+def generate_image(prompt: str, size: Tuple[int,int]=DEFAULT_SIZE, seed: Optional[int] = SD_SEED) -> Optional[Image.Image]:
+    img = _use_optimum_onnx(prompt, size, seed=seed)
     if img is not None:
         return img
 
-    img = _use_fastsd_service(prompt, size)
+    img = _use_fastsd_service(prompt, size, seed=seed)
     if img is not None:
         return img
 
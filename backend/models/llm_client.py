@@ -1,27 +1,33 @@
 # backend/models/llm_client.py
 import os
+import json
+import asyncio
+import threading
 import requests
-from typing import List
+from requests.adapters import HTTPAdapter
+from typing import Any, Dict, List, Optional, Sequence
+
+from ..config import LLM_CACHE_DIR, LLM_CACHE_MAX_BYTES
+from ..rules.phrases import PhraseMatcher, matcher_for
+from ..rules.presets import DEFAULT_CONFIGS
+from ..utils.cache import DiskCache, LRUCache, hash_key
 
 OLLAMA_URL = os.getenv("OLLAMA_URL", "http://localhost:11434/api/generate")
 OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "llama3")
 USE_OLLAMA = bool(os.getenv("USE_OLLAMA", "0") in ("1", "true", "True"))
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "30"))
+# Requests in flight at once (HTTP pool size and async semaphore)
+LLM_MAX_CONCURRENT = int(os.getenv("LLM_MAX_CONCURRENT", "4"))
+# Canvases per batched prompt in check_batch
+LLM_BATCH_SIZE = int(os.getenv("LLM_BATCH_SIZE", "16"))
+LLM_MEMORY_CACHE_SIZE = int(os.getenv("LLM_MEMORY_CACHE_SIZE", "10000"))  # answers kept
 
-def semantic_banned_check(texts: List[str]) -> List[str]:
-    """
-    Ask an LLM (via Ollama) if any text violates soft 'banned' semantics.
-    Returns list of human-readable warnings. Uses a stub (keywords) if Ollama not enabled.
-    """
-    joined = "\n".join([t for t in texts if t])
-    if not USE_OLLAMA:
-        banned_keywords = ["eco-friendly", "win", "guarantee", "carbon neutral", "free", "prize"]
-        found = [kw for kw in banned_keywords if kw.lower() in joined.lower()]
-        if not found:
-            return []
-        return [f"Found potentially banned phrases: {', '.join(found)}"]
-    prompt = f"""You are a compliance checker for retail ads.
+# Bump when the prompts below change so cached answers are not reused
+PROMPT_VERSION = "2"
+
+CHECK_PROMPT = """You are a compliance checker for retail ads.
 Text:
-{joined}
+{text}
 
 Return a short bullet list of any phrases that look like:
 - competitions or 'win'
@@ -29,21 +35,246 @@ Return a short bullet list of any phrases that look like:
 - sustainability or eco claims
 
 Return 'OK' if nothing problematic."""
-    try:
-        resp = requests.post(OLLAMA_URL, json={
-            "model": OLLAMA_MODEL,
-            "prompt": prompt,
-            "stream": False,
-        }, timeout=30)
-        data = resp.json()
-        content = data.get("response", "").strip()
-        if content.upper().startswith("OK"):
-            return []
-        return [line.strip(" -") for line in content.splitlines() if line.strip()]
-    except Exception:
-        # On any communication error, fallback to simple keyword scan
-        banned_keywords = ["eco-friendly", "win", "guarantee", "carbon neutral", "free", "prize"]
-        found = [kw for kw in banned_keywords if kw.lower() in joined.lower()]
-        if not found:
+
+BATCH_PROMPT = """You are a compliance checker for retail ads.
+Each item below is the text of one ad, keyed by id.
+
+{items}
+
+For every item, list any phrases that look like:
+- competitions or 'win'
+- guarantees
+- sustainability or eco claims
+
+Answer with JSON only, in this shape:
+{{"results": [{{"id": 0, "issues": ["short description", ...]}}, ...]}}
+Use an empty "issues" list for items with nothing problematic."""
+
+
+def keyword_check(texts: List[str], matcher: Optional[PhraseMatcher] = None) -> List[str]:
+    """Offline fallback: flag the preset's banned phrases (whole words) in the texts."""
+    matcher = matcher or matcher_for(DEFAULT_CONFIGS["story"])
+    found = matcher.find_all(t for t in texts if t)
+    if not found:
+        return []
+    return [f"Found potentially banned phrases: {', '.join(found)}"]
+
+
+def normalize_text(texts: List[str]) -> str:
+    # case and spacing don't change what the model is asked to judge
+    return "\n".join(" ".join(t.lower().split()) for t in texts if t and t.strip())
+
+
+def _parse_bullets(content: str) -> List[str]:
+    content = content.strip()
+    if content.upper().startswith("OK"):
+        return []
+    return [line.strip(" -") for line in content.splitlines() if line.strip()]
+
+
+class ComplianceClient:
+    """
+    LLM compliance checks over Ollama's generate API, with:
+      - one pooled requests.Session (keep-alive connections),
+      - answers cached in memory and on disk by (normalized text, model,
+        PROMPT_VERSION), so re-validating the same headline is free,
+      - an asyncio variant bounded by a semaphore,
+      - check_batch(): many canvases per prompt with per-item JSON output.
+    The URL is a constructor argument, so tests can point it at a stub server.
+    """
+
+    def __init__(
+        self,
+        url: str = OLLAMA_URL,
+        model: str = OLLAMA_MODEL,
+        timeout: float = LLM_TIMEOUT,
+        max_concurrent: int = LLM_MAX_CONCURRENT,
+        batch_size: int = LLM_BATCH_SIZE,
+        disk_cache: Optional[DiskCache] = None,
+        memory_cache_size: int = LLM_MEMORY_CACHE_SIZE,
+    ):
+        self.url = url
+        self.model = model
+        self.timeout = timeout
+        self.max_concurrent = max(1, max_concurrent)
+        self.batch_size = max(1, batch_size)
+        self._memory = LRUCache(memory_cache_size)  # one unit per answer
+        self._disk = disk_cache if disk_cache is not None else DiskCache(LLM_CACHE_DIR, LLM_CACHE_MAX_BYTES, suffix=".json")
+        self._session: Optional[requests.Session] = None
+        self._session_lock = threading.Lock()
+        self._semaphores: Dict[int, asyncio.Semaphore] = {}
+        self.requests = 0
+        self.failures = 0
+
+    # -- transport ---------------------------------------------------------
+
+    @property
+    def session(self) -> requests.Session:
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    s = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_concurrent)
+                    s.mount("http://", adapter)
+                    s.mount("https://", adapter)
+                    self._session = s
+        return self._session
+
+    def _generate(self, prompt: str, json_output: bool = False) -> str:
+        payload: Dict[str, Any] = {"model": self.model, "prompt": prompt, "stream": False}
+        if json_output:
+            payload["format"] = "json"
+        self.requests += 1
+        resp = self.session.post(self.url, json=payload, timeout=self.timeout)
+        resp.raise_for_status()
+        return resp.json().get("response", "")
+
+    # -- cache -------------------------------------------------------------
+
+    def cache_key(self, texts: List[str]) -> str:
+        return hash_key(normalize_text(texts), self.model, PROMPT_VERSION)
+
+    def _cached(self, key: str) -> Optional[List[str]]:
+        hit = self._memory.get(key)
+        if hit is not None:
+            return list(hit)
+        raw = self._disk.get(key)
+        if raw is None:
+            return None
+        try:
+            issues = [str(i) for i in json.loads(raw)]
+        except Exception:
+            return None
+        self._memory.put(key, tuple(issues))
+        return issues
+
+    def _store(self, key: str, issues: List[str]) -> None:
+        self._memory.put(key, tuple(issues))
+        self._disk.put(key, json.dumps(issues).encode("utf-8"))
+
+    # -- checks ------------------------------------------------------------
+
+    def check(self, texts: List[str]) -> List[str]:
+        """
+        Warnings for one canvas's texts. Falls back to keyword_check (not
+        cached) if the LLM can't be reached or answers garbage.
+        """
+        if not normalize_text(texts):
             return []
-        return [f"Found potentially banned phrases: {', '.join(found)}"]
+        key = self.cache_key(texts)
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+        joined = "\n".join([t for t in texts if t])
+        try:
+            issues = _parse_bullets(self._generate(CHECK_PROMPT.format(text=joined)))
+        except Exception:
+            self.failures += 1
+            return keyword_check(texts)
+        self._store(key, issues)
+        return issues
+
+    def _check_chunk(self, chunk: List[List[str]]) -> List[Optional[List[str]]]:
+        items = "\n".join(
+            f"[{i}] " + " / ".join(t for t in texts if t) for i, texts in enumerate(chunk)
+        )
+        try:
+            data = json.loads(self._generate(BATCH_PROMPT.format(items=items), json_output=True))
+            results = data.get("results", []) if isinstance(data, dict) else data
+        except Exception:
+            self.failures += 1
+            return [None] * len(chunk)
+        out: List[Optional[List[str]]] = [None] * len(chunk)
+        for entry in results if isinstance(results, list) else []:
+            try:
+                i = int(entry["id"])
+                issues = entry.get("issues") or []
+            except (KeyError, TypeError, ValueError, AttributeError):
+                continue
+            if 0 <= i < len(chunk) and isinstance(issues, list):
+                out[i] = [str(x) for x in issues]
+        return out
+
+    def check_batch(self, items: Sequence[List[str]]) -> List[List[str]]:
+        """
+        Warnings for many canvases. Cache hits and duplicate texts are
+        answered locally; the rest go to the model batch_size items per
+        prompt. Items the model skips or garbles get keyword_check.
+        """
+        results: List[Optional[List[str]]] = [None] * len(items)
+        pending: Dict[str, List[int]] = {}
+        for i, texts in enumerate(items):
+            if not normalize_text(texts):
+                results[i] = []
+                continue
+            key = self.cache_key(texts)
+            cached = self._cached(key)
+            if cached is not None:
+                results[i] = cached
+            else:
+                pending.setdefault(key, []).append(i)
+
+        keys = list(pending)
+        for start in range(0, len(keys), self.batch_size):
+            chunk_keys = keys[start:start + self.batch_size]
+            answers = self._check_chunk([list(items[pending[k][0]]) for k in chunk_keys])
+            for k, issues in zip(chunk_keys, answers):
+                if issues is None:
+                    issues = keyword_check(list(items[pending[k][0]]))
+                else:
+                    self._store(k, issues)
+                for i in pending[k]:
+                    results[i] = list(issues)
+        return [r if r is not None else [] for r in results]
+
+    # -- async -------------------------------------------------------------
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        # one per event loop; a semaphore can't be shared across loops
+        loop_id = id(asyncio.get_running_loop())
+        sem = self._semaphores.get(loop_id)
+        if sem is None:
+            sem = self._semaphores[loop_id] = asyncio.Semaphore(self.max_concurrent)
+        return sem
+
+    async def acheck(self, texts: List[str]) -> List[str]:
+        """check() for async callers: runs in a thread, at most max_concurrent at once."""
+        key = self.cache_key(texts)
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+        async with self._semaphore():
+            return await asyncio.to_thread(self.check, texts)
+
+    async def acheck_many(self, items: Sequence[List[str]]) -> List[List[str]]:
+        """acheck() for many canvases; identical texts (same cache key) are sent once."""
+        keys = [self.cache_key(list(t)) for t in items]
+        unique: Dict[str, List[str]] = {}
+        for key, texts in zip(keys, items):
+            unique.setdefault(key, list(texts))
+        answers = await asyncio.gather(*(self.acheck(t) for t in unique.values()))
+        by_key = dict(zip(unique, answers))
+        return [list(by_key[k]) for k in keys]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "model": self.model,
+            "requests": self.requests,
+            "failures": self.failures,
+            "memory": self._memory.stats(),
+            "disk": self._disk.stats(),
+        }
+
+
+compliance_client = ComplianceClient()
+
+
+def semantic_banned_check(texts: List[str]) -> List[str]:
+    """
+    Ask an LLM (via Ollama) if any text violates soft 'banned' semantics.
+    Returns list of human-readable warnings. Uses a stub (keywords) if Ollama not enabled.
+    """
+    if not USE_OLLAMA:
+        return keyword_check(texts)
+    return compliance_client.check(texts)
@@ -1,12 +1,143 @@
 # backend/models/ocr.py
-from typing import List
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, NamedTuple, Optional, Sequence, Tuple
 from PIL import Image
 import pytesseract
 
+from ..schemas import CreativeCanvas
+from ..utils.cache import LRUCache, hash_key
+from ..utils.fonts import text_box_at
+from ..utils.images import image_hash
+
+# Concurrent tesseract processes; each region is its own subprocess
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", str(os.cpu_count() or 2)))
+OCR_CACHE_SIZE = int(os.getenv("OCR_CACHE_SIZE", "10000"))  # regions kept
+OCR_LANG = os.getenv("OCR_LANG", "eng")
+# Pixels added around each region so glyph edges aren't clipped
+OCR_PADDING = int(os.getenv("OCR_PADDING", "6"))
+# Tesseract reads small text poorly; crops shorter than this are upscaled
+OCR_MIN_HEIGHT = int(os.getenv("OCR_MIN_HEIGHT", "40"))
+
+Box = Tuple[int, int, int, int]  # (left, top, right, bottom)
+
+
+class OCRRegion(NamedTuple):
+    id: str
+    box: Box
+    text: str
+    confidence: float  # mean word confidence 0-100; -1 if nothing was read
+
+
+def text_block_regions(canvas: CreativeCanvas) -> List[Tuple[str, Box]]:
+    """(block id, box) for every text block, measured like it is drawn."""
+    return [
+        (tb.id, text_box_at(tb.text, tb.x, tb.y, tb.font_size))
+        for tb in canvas.text_blocks or []
+        if tb.text
+    ]
+
+
+class OCREngine:
+    """
+    Tesseract over known text regions instead of the whole creative. Region
+    crops run concurrently on a bounded thread pool (tesseract is a
+    subprocess, so threads are enough) and results are cached by the crop's
+    pixel hash, so re-verifying an unchanged block costs nothing.
+    """
+
+    def __init__(self, workers: int = OCR_WORKERS, cache_size: int = OCR_CACHE_SIZE, lang: str = OCR_LANG):
+        self.workers = max(1, workers)
+        self.lang = lang
+        self._cache = LRUCache(cache_size)  # one unit per region
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="ocr")
+        self.calls = 0
+
+    def _prepare(self, image: Image.Image, box: Box) -> Optional[Image.Image]:
+        left, top, right, bottom = box
+        left, top = max(0, left - OCR_PADDING), max(0, top - OCR_PADDING)
+        right, bottom = min(image.width, right + OCR_PADDING), min(image.height, bottom + OCR_PADDING)
+        if right <= left or bottom <= top:
+            return None
+        crop = image.crop((left, top, right, bottom)).convert("L")
+        if crop.height < OCR_MIN_HEIGHT:
+            scale = OCR_MIN_HEIGHT / crop.height
+            crop = crop.resize((max(1, int(crop.width * scale)), OCR_MIN_HEIGHT), Image.Resampling.BICUBIC)
+        return crop
+
+    def _read(self, crop: Image.Image, psm: int) -> Tuple[str, float]:
+        self.calls += 1
+        data = pytesseract.image_to_data(
+            crop, lang=self.lang, config=f"--psm {psm}", output_type=pytesseract.Output.DICT
+        )
+        words, confs = [], []
+        for word, conf in zip(data.get("text", []), data.get("conf", [])):
+            conf = float(conf)
+            if conf < 0 or not str(word).strip():
+                continue  # layout rows, not words
+            words.append(str(word).strip())
+            confs.append(conf)
+        return " ".join(words), (sum(confs) / len(confs) if confs else -1.0)
+
+    def _read_cached(self, crop: Image.Image, psm: int) -> Tuple[str, float]:
+        key = hash_key(image_hash(crop), self.lang, psm)
+        hit = self._cache.get(key)
+        if hit is not None:
+            return hit
+        try:
+            result = self._read(crop, psm)
+        except Exception as e:
+            print("OCR failed:", e)
+            return "", -1.0
+        self._cache.put(key, result)
+        return result
+
+    def read_regions(self, image: Image.Image, regions: Sequence[Tuple[str, Box]], psm: int = 7) -> List[OCRRegion]:
+        """
+        OCR each (id, box) region of `image`. psm 7 treats a region as one text
+        line; use 6 for multi-line blocks. Results keep the order of `regions`.
+        """
+        crops = [self._prepare(image, box) for _, box in regions]
+        reads = self._pool.map(
+            lambda c: self._read_cached(c, psm) if c is not None else ("", -1.0), crops
+        )
+        return [
+            OCRRegion(id=rid, box=tuple(box), text=text, confidence=conf)
+            for (rid, box), (text, conf) in zip(regions, reads)
+        ]
+
+    def read_text_blocks(self, image: Image.Image, canvas: CreativeCanvas) -> List[OCRRegion]:
+        """OCR a rendered creative at the canvas's text block positions."""
+        regions = text_block_regions(canvas)
+        multiline = {tb.id for tb in canvas.text_blocks or [] if "\n" in tb.text}
+        single = [r for r in regions if r[0] not in multiline]
+        multi = [r for r in regions if r[0] in multiline]
+        by_id = {r.id: r for r in self.read_regions(image, single, psm=7)}
+        by_id.update({r.id: r for r in self.read_regions(image, multi, psm=6)})
+        return [by_id[rid] for rid, _ in regions]
+
+    def read_full(self, image: Image.Image) -> str:
+        """Whole-image OCR (automatic page segmentation), cached like regions."""
+        key = hash_key(image_hash(image), self.lang, "full")
+        hit = self._cache.get(key)
+        if hit is not None:
+            return hit
+        self.calls += 1
+        text = pytesseract.image_to_string(image, lang=self.lang)
+        self._cache.put(key, text)
+        return text
+
+    def stats(self) -> dict:
+        return {"workers": self.workers, "calls": self.calls, "cache": self._cache.stats()}
+
+
+ocr_engine = OCREngine()
+
+
 def extract_text(image: Image.Image) -> List[str]:
     """Simple OCR wrapper returning lines of text (non-empty)."""
     try:
-        text = pytesseract.image_to_string(image)
+        text = ocr_engine.read_full(image)
         lines = [l.strip() for l in text.splitlines() if l.strip()]
         return lines
     except Exception:
@@ -1,10 +1,87 @@
 # backend/models/sd_client.py
-from typing import Optional, Tuple
+import io
+from typing import Any, Dict, Optional, Tuple
 from PIL import Image
+
+from ..config import SD_CACHE_DIR, SD_CACHE_MAX_BYTES, SD_CACHE_MEMORY_BYTES
+from ..utils.cache import DiskCache, LRUCache, hash_key
+from . import image_gen
 from .image_gen import generate_image
+from .sd_scheduler import GenerationTimeout
+
+# Two tiers in front of the generator: decoded images in memory, PNGs on disk.
+_memory_cache = LRUCache(
+    SD_CACHE_MEMORY_BYTES,
+    sizeof=lambda im: im.width * im.height * len(im.getbands()),
+)
+_disk_cache = DiskCache(SD_CACHE_DIR, SD_CACHE_MAX_BYTES, suffix=".png")
+
+
+def normalize_prompt(prompt: str) -> str:
+    # CLIP's tokenizer lowercases and splits on whitespace, so these prompts
+    # are indistinguishable to the model.
+    return " ".join((prompt or "").lower().split())
+
+
+def background_cache_key(prompt: str, size: Tuple[int, int], seed: Optional[int] = None) -> str:
+    return hash_key(
+        normalize_prompt(prompt),
+        [int(size[0]), int(size[1])],
+        image_gen.model_id(),
+        image_gen.SD_STEPS,
+        image_gen.SD_GUIDANCE,
+        seed,
+    )
+
 
 def generate_background(prompt: str, size: Tuple[int,int]=(1080,1920)) -> Optional[Image.Image]:
+    """
+    Return an AI background for (prompt, size), generating it only on a cache miss.
+    The returned image is shared with the cache; callers must not mutate it in place.
+    """
+    seed = image_gen.SD_SEED
+    try:
+        key = background_cache_key(prompt, size, seed)
+    except Exception:
+        key = None
+
+    if key is not None:
+        img = _memory_cache.get(key)
+        if img is not None:
+            return img
+        raw = _disk_cache.get(key)
+        if raw is not None:
+            try:
+                img = Image.open(io.BytesIO(raw)).convert("RGBA")
+                _memory_cache.put(key, img)
+                return img
+            except Exception:
+                pass  # corrupt entry; regenerate and overwrite below
+
     try:
-        return generate_image(prompt, size)
+        img = generate_image(prompt, size, seed=seed)
+    except GenerationTimeout:
+        raise
     except Exception:
         return None
+    if img is None or key is None:
+        return img
+
+    _memory_cache.put(key, img)
+    try:
+        buf = io.BytesIO()
+        # low compression: this is a cache, write speed matters more than bytes
+        img.save(buf, format="PNG", compress_level=1)
+        _disk_cache.put(key, buf.getvalue())
+    except Exception:
+        pass
+    return img
+
+
+def cache_stats() -> Dict[str, Any]:
+    return {"memory": _memory_cache.stats(), "disk": _disk_cache.stats()}
+
+
+def clear_cache() -> None:
+    _memory_cache.clear()
+    _disk_cache.clear()
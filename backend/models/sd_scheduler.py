@@ -0,0 +1,193 @@
+# backend/models/sd_scheduler.py
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from PIL import Image
+
+# runner(prompts, num_inference_steps, guidance_scale, seed) -> one image (or None) per prompt
+BatchRunner = Callable[[List[str], int, float, Optional[int]], List[Optional[Image.Image]]]
+
+# (prompt, steps, guidance, seed) - everything that changes the pipeline output.
+# Output size is not part of it: the pipeline renders at its native resolution
+# and callers resize afterwards, so different sizes can share a batch.
+RequestKey = Tuple[str, int, float, Optional[int]]
+
+
+class GenerationTimeout(RuntimeError):
+    """A generation didn't finish in time (worker stuck or batch hung)."""
+
+
+class GenerationScheduler:
+    """
+    Coalesces concurrent Stable Diffusion requests into batched pipeline calls.
+
+    Requests are collected for `window_s` after the first one arrives.
+    Identical requests (same prompt/steps/guidance/seed) share one Future,
+    whether they are still pending or already running. Pending requests with
+    the same steps/guidance are then sent to the runner as one list-of-prompts
+    call of at most `max_batch` prompts, with at most `max_concurrent` calls
+    running at once. Requests are only taken off the pending list when a
+    runner slot is free, so whatever piles up during a long generation is
+    merged into full batches rather than queued one by one.
+
+    Seeded requests are never batched with other prompts: a shared generator
+    would make the output depend on what else landed in the batch.
+    """
+
+    def __init__(
+        self,
+        runner: BatchRunner,
+        window_s: float = 0.05,
+        max_batch: int = 4,
+        max_concurrent: int = 1,
+    ):
+        self.runner = runner
+        self.window_s = max(0.0, window_s)
+        self.max_batch = max(1, max_batch)
+        self.max_concurrent = max(1, max_concurrent)
+        self._cond = threading.Condition()
+        self._pending: List[RequestKey] = []
+        self._first_pending_at = 0.0
+        self._slots = threading.Semaphore(self.max_concurrent)
+        self._futures: Dict[RequestKey, Future] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._thread: Optional[threading.Thread] = None
+        self.submitted = 0
+        self.deduplicated = 0
+        self.timeouts = 0
+        self.batches = 0
+        self.batched_prompts = 0
+        self.largest_batch = 0
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrent, thread_name_prefix="sd-batch")
+        self._thread = threading.Thread(target=self._dispatch_loop, name="sd-scheduler", daemon=True)
+        self._thread.start()
+
+    def submit(
+        self,
+        prompt: str,
+        num_inference_steps: int,
+        guidance_scale: float,
+        seed: Optional[int] = None,
+    ) -> "Future[Optional[Image.Image]]":
+        key: RequestKey = (prompt, int(num_inference_steps), float(guidance_scale), seed)
+        with self._cond:
+            self.submitted += 1
+            fut = self._futures.get(key)
+            if fut is not None:
+                self.deduplicated += 1
+                return fut
+            fut = Future()
+            self._futures[key] = fut
+            if not self._pending:
+                self._first_pending_at = time.monotonic()
+            self._pending.append(key)
+            self._ensure_started()
+            self._cond.notify()
+            return fut
+
+    def generate(
+        self,
+        prompt: str,
+        num_inference_steps: int,
+        guidance_scale: float,
+        seed: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ) -> Optional[Image.Image]:
+        """Submit and wait; raises GenerationTimeout if no result within `timeout` seconds."""
+        fut = self.submit(prompt, num_inference_steps, guidance_scale, seed)
+        try:
+            return fut.result(timeout=timeout)
+        except FutureTimeout:
+            self.timeouts += 1
+            raise GenerationTimeout(f"image generation took longer than {timeout:.0f}s") from None
+
+    def _dispatch_loop(self) -> None:
+        while True:
+            # wait for a free runner first; until then requests stay pending
+            # and keep coalescing
+            self._slots.acquire()
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                # Give concurrent callers a short window (from the oldest
+                # pending request) to join, unless we already have a full batch.
+                deadline = self._first_pending_at + self.window_s
+                while len(self._pending) < self.max_batch:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch = self._take_batch()
+                if self._pending:
+                    # the rest has waited its window already
+                    self._first_pending_at = time.monotonic() - self.window_s
+            try:
+                self._executor.submit(self._run_batch, batch)
+            except Exception:
+                self._slots.release()
+                raise
+
+    def _take_batch(self) -> List[RequestKey]:
+        """Remove the next batch from _pending: the oldest request plus compatible ones."""
+        first = self._pending[0]
+        if first[3] is not None:
+            batch = [first]
+        else:
+            batch = [
+                k for k in self._pending
+                if k[3] is None and (k[1], k[2]) == (first[1], first[2])
+            ][:self.max_batch]
+        taken = set(batch)
+        self._pending = [k for k in self._pending if k not in taken]
+        return batch
+
+    def _run_batch(self, batch: List[RequestKey]) -> None:
+        try:
+            self._execute(batch)
+        finally:
+            self._slots.release()
+
+    def _execute(self, batch: List[RequestKey]) -> None:
+        _, steps, guidance, seed = batch[0]
+        prompts = [k[0] for k in batch]
+        self.batches += 1
+        self.batched_prompts += len(batch)
+        self.largest_batch = max(self.largest_batch, len(batch))
+        try:
+            images = list(self.runner(prompts, steps, guidance, seed))
+            error = None
+        except Exception as e:
+            images, error = [], e
+
+        with self._cond:
+            futures = [self._futures.pop(k, None) for k in batch]
+        for i, fut in enumerate(futures):
+            if fut is None or fut.cancelled():
+                continue
+            if error is not None:
+                fut.set_exception(error)
+            else:
+                fut.set_result(images[i] if i < len(images) else None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            pending = len(self._pending)
+            in_flight = len(self._futures)
+        return {
+            "window_ms": self.window_s * 1000.0,
+            "max_batch": self.max_batch,
+            "max_concurrent": self.max_concurrent,
+            "pending": pending,
+            "in_flight": in_flight,
+            "submitted": self.submitted,
+            "deduplicated": self.deduplicated,
+            "timeouts": self.timeouts,
+            "batches": self.batches,
+            "avg_batch": (self.batched_prompts / self.batches) if self.batches else 0.0,
+            "largest_batch": self.largest_batch,
+        }
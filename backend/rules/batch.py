@@ -0,0 +1,205 @@
+# backend/rules/batch.py
+import math
+from typing import Any, Dict, List, Sequence, Tuple
+import numpy as np
+
+from ..schemas import CreativeCanvas, ValidationIssue, ValidationResult
+from .phrases import matcher_for
+from .presets import DEFAULT_CONFIGS
+
+# (canvas index, code, message); every batch rule is an error
+Violation = Tuple[int, str, str]
+
+
+def _get(obj: Any, name: str, default: Any = None) -> Any:
+    # accept CreativeCanvas/TextBlock models or the equivalent plain JSON dicts,
+    # so large catalogs can skip building pydantic models for every canvas
+    if isinstance(obj, dict):
+        value = obj.get(name, default)
+    else:
+        value = getattr(obj, name, default)
+    return default if value is None else value
+
+
+class BatchInputError(ValueError):
+    """A raw canvas in a batch is malformed; the message names its index and field."""
+
+
+# coordinates/font sizes are packed into int64 arrays
+_INT_LIMIT = 2 ** 53
+
+
+def _check_number(obj: Dict[str, Any], name: str, where: str) -> None:
+    if name not in obj:
+        return  # the model default applies
+    value = obj[name]
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise BatchInputError(f"{where}: expected a number")
+    if not math.isfinite(value) or abs(value) > _INT_LIMIT:
+        raise BatchInputError(f"{where}: out of range")
+
+
+def _check_list(value: Any, where: str) -> List[Any]:
+    if value is None:
+        return []
+    if not isinstance(value, list):
+        raise BatchInputError(f"{where}: expected a list")
+    return value
+
+
+def check_raw_canvases(canvases: Any) -> None:
+    """
+    Type-check raw canvas dicts for the fields the batch rules read, the way
+    CreativeCanvas/TextBlock would, without building the models. Raises
+    BatchInputError on the first problem.
+    """
+    if not isinstance(canvases, list):
+        raise BatchInputError("canvases: expected a list")
+    for ci, c in enumerate(canvases):
+        where = f"canvases[{ci}]"
+        if not isinstance(c, dict):
+            raise BatchInputError(f"{where}: expected an object")
+        if not isinstance(c.get("id"), str):
+            raise BatchInputError(f"{where}.id: expected a string")
+        if c.get("format") is not None and not isinstance(c["format"], str):
+            raise BatchInputError(f"{where}.format: expected a string")
+        for pi, pid in enumerate(_check_list(c.get("packshot_ids"), f"{where}.packshot_ids")):
+            if not isinstance(pid, str):
+                raise BatchInputError(f"{where}.packshot_ids[{pi}]: expected a string")
+        for bi, tb in enumerate(_check_list(c.get("text_blocks"), f"{where}.text_blocks")):
+            bwhere = f"{where}.text_blocks[{bi}]"
+            if not isinstance(tb, dict):
+                raise BatchInputError(f"{bwhere}: expected an object")
+            if not isinstance(tb.get("text"), str):
+                raise BatchInputError(f"{bwhere}.text: expected a string")
+            _check_number(tb, "y", f"{bwhere}.y")
+            _check_number(tb, "font_size", f"{bwhere}.font_size")
+
+
+def _config_table(formats: List[str]):
+    """Per-canvas preset limits as arrays, resolved the same way run_rules does."""
+    cfg_index: Dict[str, int] = {}
+    cfgs = []
+    idx = np.empty(len(formats), dtype=np.int64)
+    for i, fmt in enumerate(formats):
+        j = cfg_index.get(fmt)
+        if j is None:
+            j = cfg_index[fmt] = len(cfgs)
+            cfgs.append(DEFAULT_CONFIGS.get(fmt, DEFAULT_CONFIGS["story"]))
+        idx[i] = j
+    top_zone = np.array([c.top_safe_zone_px for c in cfgs], dtype=np.int64)[idx]
+    min_font = np.array([c.min_font_px for c in cfgs], dtype=np.int64)[idx]
+    max_ps = np.array([c.max_packshots for c in cfgs], dtype=np.int64)[idx]
+    return top_zone, min_font, max_ps
+
+
+def find_violations(canvases: Sequence[Any]) -> List[Violation]:
+    """
+    Evaluate the safe-zone, font-size and packshot-count rules for many
+    canvases at once. Text-block geometry and font sizes are packed into
+    flat arrays and each rule is a single column-wise comparison against the
+    canvas's preset; only the violations are turned back into Python objects.
+
+    Returned in run_rules order: per canvas, safe-zone issues, then font
+    sizes, then packshots (each in text-block order).
+    """
+    n = len(canvases)
+    if n == 0:
+        return []
+
+    formats = [_get(c, "format", "story") for c in canvases]
+    top_zone, min_font, max_ps = _config_table(formats)
+
+    block_lists = [_get(c, "text_blocks", []) for c in canvases]
+    counts = np.fromiter((len(b) for b in block_lists), dtype=np.int64, count=n)
+    num_ps = np.fromiter((len(_get(c, "packshot_ids", [])) for c in canvases), dtype=np.int64, count=n)
+
+    # one row per text block; owner maps each row back to its canvas
+    blocks = [tb for b in block_lists for tb in b]
+    owner = np.repeat(np.arange(n, dtype=np.int64), counts)
+    blk_y = np.fromiter((_get(tb, "y", 0) for tb in blocks), dtype=np.int64, count=len(blocks))
+    blk_font = np.fromiter((_get(tb, "font_size", 20) for tb in blocks), dtype=np.int64, count=len(blocks))
+
+    safe_zone_hits = np.flatnonzero(blk_y < top_zone[owner])
+    font_hits = np.flatnonzero(blk_font < min_font[owner])
+    packshot_hits = np.flatnonzero(num_ps > max_ps)
+
+    # (canvas, rule order, block) sort key keeps run_rules' issue order
+    found: List[Tuple[int, int, int, str, str]] = []
+    for b in safe_zone_hits.tolist():
+        ci = int(owner[b])
+        text = _get(blocks[b], "text", "")
+        found.append((ci, 0, b, "SAFE_ZONE_TOP",
+                      f"Text '{text[:15]}...' is in top safe zone (<{int(top_zone[ci])}px)."))
+    for b in font_hits.tolist():
+        ci = int(owner[b])
+        text = _get(blocks[b], "text", "")
+        found.append((ci, 1, b, "FONT_TOO_SMALL",
+                      f"Text '{text[:15]}...' font {int(blk_font[b])}px < {int(min_font[ci])}px."))
+    for ci in packshot_hits.tolist():
+        found.append((ci, 2, 0, "TOO_MANY_PACKSHOTS",
+                      f"{int(num_ps[ci])} packshots > allowed {int(max_ps[ci])}."))
+    found.sort(key=lambda v: v[:3])
+    return [(ci, code, msg) for ci, _, _, code, msg in found]
+
+
+def find_phrase_warnings(canvases: Sequence[Any]) -> List[Violation]:
+    """BANNED_PHRASE warnings for many canvases: one regex pass per text block."""
+    found: List[Violation] = []
+    for ci, c in enumerate(canvases):
+        matcher = matcher_for(DEFAULT_CONFIGS.get(_get(c, "format", "story"), DEFAULT_CONFIGS["story"]))
+        for tb in _get(c, "text_blocks", []):
+            text = _get(tb, "text", "")
+            phrases = matcher.find(text)
+            if phrases:
+                found.append((ci, "BANNED_PHRASE",
+                              f"Text '{text[:15]}...' contains potentially banned phrases: {', '.join(phrases)}."))
+    return found
+
+
+def run_rules_batch(canvases: Sequence[CreativeCanvas]) -> List[ValidationResult]:
+    """
+    Validate many canvases at once; same results as [run_rules(c) for c in canvases],
+    minus the LOW_CONTRAST warnings (those need each canvas's images).
+    """
+    issues: List[List[ValidationIssue]] = [[] for _ in canvases]
+    for ci, code, msg in find_violations(canvases):
+        issues[ci].append(ValidationIssue(code=code, message=msg, severity="error"))
+    for ci, code, msg in find_phrase_warnings(canvases):
+        issues[ci].append(ValidationIssue(code=code, message=msg, severity="warning"))
+    return [
+        ValidationResult(
+            canvas_id=_get(c, "id", ""),
+            issues=issues[i],
+            passed=not any(x.severity == "error" for x in issues[i]),
+        )
+        for i, c in enumerate(canvases)
+    ]
+
+
+def validate_catalog(canvases: Sequence[Any]) -> Dict[str, Any]:
+    """
+    Catalog-sized validation summary: counts plus plain-dict results for the
+    canvases with any issue (errors, or BANNED_PHRASE warnings on canvases
+    that still pass), with the same issues run_rules reports minus
+    LOW_CONTRAST. Accepts models or raw canvas dicts (see check_raw_canvases).
+    """
+    flagged: Dict[int, List[Dict[str, str]]] = {}
+    for ci, code, msg in find_violations(canvases):
+        flagged.setdefault(ci, []).append({"code": code, "message": msg, "severity": "error"})
+    failed = len(flagged)
+    for ci, code, msg in find_phrase_warnings(canvases):
+        flagged.setdefault(ci, []).append({"code": code, "message": msg, "severity": "warning"})
+    return {
+        "total": len(canvases),
+        "passed": len(canvases) - failed,
+        "failed": failed,
+        "results": [
+            {
+                "canvas_id": _get(canvases[ci], "id", ""),
+                "issues": issues,
+                "passed": not any(x["severity"] == "error" for x in issues),
+            }
+            for ci, issues in sorted(flagged.items())
+        ],
+    }
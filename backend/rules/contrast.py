@@ -0,0 +1,223 @@
+# backend/rules/contrast.py
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+from PIL import Image, ImageColor
+
+from ..db import asset_index
+from ..schemas import CreativeCanvas, TextBlock, ValidationIssue
+from ..utils.fonts import text_box_at
+from ..utils.images import cached_derived, find_uploaded_file, load_image, packshot_rect
+
+Box = Tuple[int, int, int, int]  # (left, top, right, bottom), right/bottom exclusive
+
+
+def _linearize(channel: np.ndarray) -> np.ndarray:
+    """sRGB channel values in [0, 1] -> linear light (WCAG 2.x definition)."""
+    return np.where(channel <= 0.03928, channel / 12.92, ((channel + 0.055) / 1.055) ** 2.4)
+
+
+def luminance_map(img: Image.Image) -> np.ndarray:
+    """Per-pixel WCAG relative luminance of an image, as float64 in [0, 1]."""
+    rgb = np.asarray(img.convert("RGB"), dtype=np.float64) / 255.0
+    lin = _linearize(rgb)
+    return lin[..., 0] * 0.2126 + lin[..., 1] * 0.7152 + lin[..., 2] * 0.0722
+
+
+@lru_cache(maxsize=1024)
+def color_luminance(color: str) -> float:
+    """Relative luminance of a CSS/hex colour such as '#1a1a1a'."""
+    r, g, b = ImageColor.getrgb(color)[:3]
+    lin = _linearize(np.array([r, g, b], dtype=np.float64) / 255.0)
+    return float(lin[0] * 0.2126 + lin[1] * 0.7152 + lin[2] * 0.0722)
+
+
+def contrast_ratio(l1: float, l2: float) -> float:
+    """WCAG contrast ratio between two relative luminances (1.0 - 21.0)."""
+    hi, lo = max(l1, l2), min(l1, l2)
+    return (hi + 0.05) / (lo + 0.05)
+
+
+class LuminanceIntegral:
+    """
+    Summed-area table over a luminance map. Built once per backdrop; after
+    that the mean luminance of any rectangle is four lookups, whatever its size.
+    """
+
+    def __init__(self, lum: np.ndarray):
+        h, w = lum.shape
+        self.width = w
+        self.height = h
+        # zero row/column in front so box sums need no edge cases
+        self._sat = np.zeros((h + 1, w + 1), dtype=np.float64)
+        np.cumsum(np.cumsum(lum, axis=0), axis=1, out=self._sat[1:, 1:])
+
+    @classmethod
+    def from_image(cls, img: Image.Image) -> "LuminanceIntegral":
+        return cls(luminance_map(img))
+
+    @property
+    def nbytes(self) -> int:
+        # 8 bytes/pixel: ~16 MB for a 1080x1920 story
+        return self._sat.nbytes
+
+    def mean(self, box: Box) -> Optional[float]:
+        """Mean luminance inside `box`, clipped to the image; None if nothing is left."""
+        left, top, right, bottom = box
+        left, top = max(0, int(left)), max(0, int(top))
+        right, bottom = min(self.width, int(right)), min(self.height, int(bottom))
+        if right <= left or bottom <= top:
+            return None
+        s = self._sat
+        total = s[bottom, right] - s[top, right] - s[bottom, left] + s[top, left]
+        return float(total) / ((right - left) * (bottom - top))
+
+
+def _asset(file_id: str) -> Optional[Tuple[tuple, Path]]:
+    """
+    (cache identity, path) of an uploaded asset. The identity is the content
+    hash from the asset index, so re-uploads of the same file share a table;
+    unindexed files fall back to path + mtime.
+    """
+    info = asset_index.lookup(file_id)
+    path = info.path if info is not None else find_uploaded_file(file_id)
+    if path is None:
+        return None
+    if info is not None and info.sha256:
+        return ("sha256", info.sha256), path
+    try:
+        return ("file", str(path), path.stat().st_mtime_ns), path
+    except OSError:
+        return None
+
+
+def _backdrop(canvas: CreativeCanvas):
+    """
+    (key, background path, packshot paths) for everything under the text.
+    The key is canvas size plus the identity of each asset. None when the
+    backdrop can't be known without rendering, i.e. an AI background that
+    hasn't been uploaded.
+    """
+    bg = _asset(canvas.background_image_id) if canvas.background_image_id else None
+    if bg is None and canvas.extra and "background_prompt" in canvas.extra:
+        return None
+    packshots = [a for a in (_asset(p_id) for p_id in canvas.packshot_ids or []) if a is not None]
+    key = (
+        canvas.width,
+        canvas.height,
+        bg[0] if bg else None,
+        tuple(ident for ident, _ in packshots),
+    )
+    return key, bg[1] if bg else None, [path for _, path in packshots]
+
+
+def _compose_backdrop(size: Tuple[int, int], bg: Optional[Path], packshots: List[Path]) -> Image.Image:
+    # same layering as main.compose_canvas, minus the text
+    W, H = size
+    base = Image.new("RGBA", (W, H), (255, 255, 255, 255))
+    if bg is not None:
+        base.alpha_composite(load_image(bg, size=(W, H)), (0, 0))
+    for path in packshots:
+        x, y, w, h = packshot_rect((W, H))
+        base.alpha_composite(load_image(path, size=(w, h)), (x, y))
+    return base
+
+
+_builds = 0
+
+
+def backdrop_integral(canvas: CreativeCanvas) -> Optional[LuminanceIntegral]:
+    """
+    Luminance integral of the canvas's composed background + packshots,
+    kept in the image cache keyed by the backdrop's content, so validation,
+    autofix and re-renders of the same backdrop build it once.
+    Returns None if the backdrop is unknown or fails to load.
+    """
+    try:
+        backdrop = _backdrop(canvas)
+    except Exception:
+        return None
+    if backdrop is None:
+        return None
+    key, bg, packshots = backdrop
+
+    def build() -> LuminanceIntegral:
+        global _builds
+        _builds += 1
+        return LuminanceIntegral.from_image(_compose_backdrop(key[:2], bg, packshots))
+
+    try:
+        return cached_derived(("luminance_integral",) + key, build)
+    except Exception:
+        return None
+
+
+def text_contrast(
+    integral: LuminanceIntegral,
+    tb: TextBlock,
+    y: Optional[int] = None,
+    font_size: Optional[int] = None,
+) -> Optional[float]:
+    """
+    Contrast ratio of `tb` against the backdrop under its bounding box, with
+    y/font_size optionally overridden (for candidate positions in autofix).
+    """
+    y = tb.y if y is None else y
+    font_size = tb.font_size if font_size is None else font_size
+    if not tb.text:
+        return None
+    left, top, right, bottom = text_box_at(tb.text, tb.x, y, font_size)
+    bg_lum = integral.mean((left, top, right, bottom))
+    if bg_lum is None:
+        return None
+    try:
+        fg_lum = color_luminance(tb.color)
+    except ValueError:
+        return None
+    return contrast_ratio(fg_lum, bg_lum)
+
+
+def low_contrast(
+    integral: Optional[LuminanceIntegral],
+    tb: TextBlock,
+    cfg,
+    y: Optional[int] = None,
+    font_size: Optional[int] = None,
+) -> bool:
+    if integral is None:
+        return False
+    ratio = text_contrast(integral, tb, y, font_size)
+    return ratio is not None and ratio < cfg.min_contrast_ratio
+
+
+def check_contrast(canvas: CreativeCanvas, cfg) -> List[ValidationIssue]:
+    """
+    Compare each text colour with the mean luminance of the backdrop under the
+    text. Reported as warnings: the mean hides busy backgrounds, and AI
+    backgrounds are not checked until they are uploaded.
+    """
+    issues: List[ValidationIssue] = []
+    blocks = canvas.text_blocks or []
+    if not blocks:
+        return issues
+    integral = backdrop_integral(canvas)
+    if integral is None:
+        return issues
+    for tb in blocks:
+        ratio = text_contrast(integral, tb)
+        if ratio is not None and ratio < cfg.min_contrast_ratio:
+            issues.append(
+                ValidationIssue(
+                    code="LOW_CONTRAST",
+                    message=f"Text '{tb.text[:15]}...' contrast {ratio:.2f}:1 < {cfg.min_contrast_ratio}:1.",
+                    severity="warning",
+                )
+            )
+    return issues
+
+
+def contrast_cache_stats() -> dict:
+    """Tables built so far; the tables themselves live in the image cache."""
+    return {"builds": _builds}
@@ -1,9 +1,28 @@
 # backend/rules/engine.py
 from typing import List
 from ..schemas import CreativeCanvas, ValidationIssue, ValidationResult
+from .contrast import check_contrast
+from .phrases import matcher_for
 from .presets import DEFAULT_CONFIGS
 
 
+def _in_top_safe_zone(y: int, cfg) -> bool:
+    return y < cfg.top_safe_zone_px
+
+
+def _font_too_small(font_size: int, cfg) -> bool:
+    return font_size < cfg.min_font_px
+
+
+def block_error_count(y: int, font_size: int, cfg) -> int:
+    """
+    Number of error-level per-block rules a text block at (y, font_size)
+    breaks. Blocks are checked independently of each other, so callers can
+    re-check only the block they changed.
+    """
+    return int(_in_top_safe_zone(y, cfg)) + int(_font_too_small(font_size, cfg))
+
+
 def _check_safe_zone(canvas: CreativeCanvas, cfg) -> List[ValidationIssue]:
     """
     Ensure text is not inside the top safe zone.
@@ -11,7 +30,7 @@ def _check_safe_zone(canvas: CreativeCanvas, cfg) -> List[ValidationIssue]:
     issues: List[ValidationIssue] = []
     top_zone = cfg.top_safe_zone_px
     for tb in canvas.text_blocks or []:
-        if tb.y < top_zone:
+        if _in_top_safe_zone(tb.y, cfg):
             issues.append(
                 ValidationIssue(
                     code="SAFE_ZONE_TOP",
@@ -29,7 +48,7 @@ def _check_font_sizes(canvas: CreativeCanvas, cfg) -> List[ValidationIssue]:
     issues: List[ValidationIssue] = []
     min_font = cfg.min_font_px
     for tb in canvas.text_blocks or []:
-        if tb.font_size < min_font:
+        if _font_too_small(tb.font_size, cfg):
             issues.append(
                 ValidationIssue(
                     code="FONT_TOO_SMALL",
@@ -58,17 +77,49 @@ def _check_packshot_count(canvas: CreativeCanvas, cfg) -> List[ValidationIssue]:
     return issues
 
 
+def check_banned_phrases(canvas: CreativeCanvas, cfg) -> List[ValidationIssue]:
+    """
+    Flag claims from the preset's banned_phrases list. Warnings only: the
+    list is deliberately broad and a human (or the LLM check) decides.
+    """
+    issues: List[ValidationIssue] = []
+    matcher = matcher_for(cfg)
+    for tb in canvas.text_blocks or []:
+        found = matcher.find(tb.text)
+        if found:
+            issues.append(
+                ValidationIssue(
+                    code="BANNED_PHRASE",
+                    message=f"Text '{tb.text[:15]}...' contains potentially banned phrases: {', '.join(found)}.",
+                    severity="warning",
+                )
+            )
+    return issues
+
+
+def canvas_error_count(canvas: CreativeCanvas, cfg) -> int:
+    """Number of error-level rules broken at canvas level (not per text block)."""
+    return sum(1 for i in _check_packshot_count(canvas, cfg) if i.severity == "error")
+
+
+def config_for(canvas: CreativeCanvas):
+    """Guideline preset for the canvas's format (story if unknown)."""
+    return DEFAULT_CONFIGS.get(canvas.format, DEFAULT_CONFIGS["story"])
+
+
 def run_rules(canvas: CreativeCanvas) -> ValidationResult:
     """
     Run all rule checks for a given canvas using the correct preset.
     Returns a ValidationResult with aggregated issues and 'passed' flag.
     """
-    cfg = DEFAULT_CONFIGS.get(canvas.format, DEFAULT_CONFIGS["story"])
+    cfg = config_for(canvas)
 
     issues: List[ValidationIssue] = []
     issues.extend(_check_safe_zone(canvas, cfg))
     issues.extend(_check_font_sizes(canvas, cfg))
     issues.extend(_check_packshot_count(canvas, cfg))
+    issues.extend(check_contrast(canvas, cfg))
+    issues.extend(check_banned_phrases(canvas, cfg))
 
     passed = not any(i.severity == "error" for i in issues)
     return ValidationResult(canvas_id=canvas.id, issues=issues, passed=passed)
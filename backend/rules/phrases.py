@@ -0,0 +1,94 @@
+# backend/rules/phrases.py
+import re
+from functools import lru_cache
+from typing import Iterable, List, Sequence, Tuple
+
+_VOWELS = "aeiou"
+
+
+def _inflections(word: str) -> List[str]:
+    """
+    The word plus the regular inflections valid for its ending: wins/winning/
+    winner (final consonant doubled only for short words like "win"),
+    guarantees/guaranteed, offers/offered. Nothing that merely starts with the
+    word, so "win" does not match "wind", "wines" or "window".
+    """
+    w = word.lower()
+    if not w[-1].isalpha():
+        return [w]
+    if w.endswith("e"):
+        suffixes = ["s", "d", "r", "rs", "ing"]
+    elif w.endswith("y") and len(w) > 1 and w[-2] not in _VOWELS:
+        return [w, w + "ing", w[:-1] + "ies", w[:-1] + "ied"]
+    elif w.endswith(("s", "x", "z", "ch", "sh")):
+        suffixes = ["es", "ed", "ing", "er", "ers"]
+    else:
+        suffixes = ["s"]
+        one_syllable = len(re.findall(f"[{_VOWELS}]+", w)) == 1
+        if one_syllable and re.search(rf"(?:^|[^{_VOWELS}])[{_VOWELS}][^{_VOWELS}wxy]$", w):
+            suffixes += [w[-1] + x for x in ("ing", "ed", "er", "ers")]
+        else:
+            suffixes += ["ing", "ed", "er", "ers"]
+    return [w] + [w + x for x in suffixes]
+
+
+def _word_pattern(word: str) -> str:
+    forms = sorted(_inflections(word), key=len, reverse=True)
+    return "(?:" + "|".join(re.escape(f) for f in forms) + ")"
+
+
+def _phrase_pattern(phrase: str) -> str:
+    # "eco-friendly" also matches "eco friendly" and "eco  friendly"
+    words = [w for w in re.split(r"[\s\-]+", phrase.strip().lower()) if w]
+    return r"[\s\-]+".join(_word_pattern(w) for w in words)
+
+
+class PhraseMatcher:
+    """
+    All phrases compiled into one case-insensitive alternation with word
+    boundaries, so a text is scanned once whatever the number of phrases.
+    Longer phrases are tried first, so "carbon neutral" wins over "carbon".
+    """
+
+    def __init__(self, phrases: Iterable[str]):
+        unique = sorted({p.strip().lower() for p in phrases if p and p.strip()}, key=lambda p: (-len(p), p))
+        self.phrases: Tuple[str, ...] = tuple(unique)
+        if not unique:
+            self._regex = None
+            return
+        alternation = "|".join(f"(?P<p{i}>{_phrase_pattern(p)})" for i, p in enumerate(unique))
+        self._regex = re.compile(rf"\b(?:{alternation})\b", re.IGNORECASE)
+
+    def find(self, text: str) -> List[str]:
+        """Distinct configured phrases found in `text`, in order of first appearance."""
+        if self._regex is None or not text:
+            return []
+        found: List[str] = []
+        for m in self._regex.finditer(text):
+            phrase = self.phrases[int(m.lastgroup[1:])]
+            if phrase not in found:
+                found.append(phrase)
+        return found
+
+    def scan(self, texts: Sequence[str]) -> List[List[str]]:
+        """find() for many texts."""
+        return [self.find(t) for t in texts]
+
+    def find_all(self, texts: Iterable[str]) -> List[str]:
+        """Distinct phrases found across several texts (e.g. one canvas's blocks)."""
+        found: List[str] = []
+        for t in texts:
+            for phrase in self.find(t):
+                if phrase not in found:
+                    found.append(phrase)
+        return found
+
+
+@lru_cache(maxsize=32)
+def _matcher(phrases: Tuple[str, ...]) -> PhraseMatcher:
+    return PhraseMatcher(phrases)
+
+
+def matcher_for(cfg) -> PhraseMatcher:
+    """Compiled matcher for a GuidelineConfig's banned_phrases (built once per list)."""
+    return _matcher(tuple(cfg.banned_phrases))
@@ -1,5 +1,16 @@
 # backend/rules/presets.py
 from dataclasses import dataclass
+from typing import Tuple
+
+# Claims that need legal sign-off (competitions, guarantees, green claims)
+DEFAULT_BANNED_PHRASES: Tuple[str, ...] = (
+    "eco-friendly",
+    "win",
+    "guarantee",
+    "carbon neutral",
+    "free",
+    "prize",
+)
 
 
 @dataclass
@@ -13,6 +24,7 @@ class GuidelineConfig:
     min_font_px: int = 20
     min_contrast_ratio: float = 4.5
     max_packshots: int = 1
+    banned_phrases: Tuple[str, ...] = DEFAULT_BANNED_PHRASES
 
 
 TESCO_STORY = GuidelineConfig(
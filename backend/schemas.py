@@ -45,8 +45,23 @@ class ValidationResult(BaseModel):
     passed: bool = False
 
 
+class BatchValidationRequest(BaseModel):
+    canvases: List[CreativeCanvas]
+
+
+class BatchValidationResponse(BaseModel):
+    total: int
+    passed: int
+    failed: int
+    results: List[ValidationResult] = []  # canvases with errors or warnings only
+
+
 class AutoFixRequest(BaseModel):
     canvas: CreativeCanvas
+    strategy: str = "solve"  # "solve", "beam" or "hill_climb"
+    # bounded so no request can ask for an unbounded search
+    beam_width: int = Field(4, ge=1, le=16)
+    time_budget_ms: int = Field(500, ge=1, le=5000)
 
 
 class AutoFixResponse(BaseModel):
@@ -70,3 +85,18 @@ class RenderResponse(BaseModel):
     canvas_id: str
     creatives: List[RenderItem]
     audit_log_path: str
+
+
+class CanvasVersionInfo(BaseModel):
+    canvas_id: str
+    version: int
+    kind: str  # "snapshot" or "delta"
+    size_bytes: int
+    user_id: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+
+class CanvasVersionResponse(BaseModel):
+    canvas_id: str
+    version: int
+    canvas: CreativeCanvas
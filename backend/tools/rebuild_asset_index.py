@@ -0,0 +1,34 @@
+# tools/rebuild_asset_index.py
+"""
+Index every PNG/JPEG/WebP in an upload directory into the asset index (one-shot,
+for directories populated before the index existed). Safe to re-run.
+
+Usage:
+  python -m backend.tools.rebuild_asset_index --dir ./data/uploads
+"""
+
+import argparse
+from pathlib import Path
+
+from backend.config import UPLOAD_DIR
+from backend.db import asset_index
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dir", type=str, default=str(UPLOAD_DIR))
+    parser.add_argument("--asset_type", type=str, default=None)
+    args = parser.parse_args()
+
+    directory = Path(args.dir)
+    if not directory.is_dir():
+        print("❌ Not a directory:", directory)
+        return
+
+    print(f"🔧 Indexing {directory} ...")
+    count = asset_index.rebuild(directory, asset_type=args.asset_type)
+    print(f"✅ Indexed {count} files.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+# tools/scan_people.py
+"""
+Scan an upload directory for images that contain people (e.g. packshots that
+need a model-release check). Images go through the detector in batches and
+results are cached per file content, so re-runs only process new files.
+
+Usage:
+  python -m backend.tools.scan_people --dir ./data/uploads --label person
+"""
+
+import argparse
+from pathlib import Path
+
+from backend.config import UPLOAD_DIR
+from backend.models.detection import detector
+
+IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg", ".webp"}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dir", type=str, default=str(UPLOAD_DIR))
+    parser.add_argument("--label", type=str, default="person")
+    parser.add_argument("--batch", type=int, default=None)
+    args = parser.parse_args()
+
+    directory = Path(args.dir)
+    if not directory.is_dir():
+        print("❌ Not a directory:", directory)
+        return
+    if args.batch:
+        detector.batch_size = max(1, args.batch)
+    if not detector.load():
+        print("❌ Detector unavailable:", detector.status()["error"] or "ultralytics not installed")
+        return
+
+    paths = sorted(p for p in directory.iterdir() if p.suffix.lower() in IMAGE_SUFFIXES)
+    print(f"🔍 Scanning {len(paths)} images in {directory} ...")
+    results = detector.detect_paths(paths)
+
+    hits = [p for p, det in results.items() if det.has(args.label)]
+    for p in hits:
+        print(p.name)
+    print(f"✅ {len(hits)} of {len(results)} images contain '{args.label}'.")
+
+
+if __name__ == "__main__":
+    main()
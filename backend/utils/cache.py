@@ -0,0 +1,212 @@
+# backend/utils/cache.py
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+def hash_key(*parts: Any) -> str:
+    """
+    Build a stable hex digest from arbitrary JSON-serialisable parts.
+    Used as a content address for on-disk cache entries.
+    """
+    raw = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def file_hash(path: Path, chunk_size: int = 1 << 20) -> str:
+    """sha256 of a file's bytes, read in chunks."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class LRUCache:
+    """
+    Thread-safe in-memory LRU cache bounded by a byte budget.
+
+    `sizeof` returns the cost of a value in bytes; entries are evicted from
+    the least recently used end until the total fits in `max_bytes`.
+    A value larger than the whole budget is simply not cached.
+    """
+
+    def __init__(self, max_bytes: int, sizeof: Callable[[Any], int] = lambda v: 1):
+        self.max_bytes = max(0, int(max_bytes))
+        self._sizeof = sizeof
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._sizes: Dict[Hashable, int] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, value: Any) -> None:
+        size = int(self._sizeof(value))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._data:
+                self._bytes -= self._sizes.pop(key)
+                del self._data[key]
+            self._data[key] = value
+            self._sizes[key] = size
+            self._bytes += size
+            while self._bytes > self.max_bytes and self._data:
+                old_key, _ = self._data.popitem(last=False)
+                self._bytes -= self._sizes.pop(old_key)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._sizes.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": (self.hits / total) if total else 0.0,
+        }
+
+
+class DiskCache:
+    """
+    Content-addressed file cache bounded by a byte budget.
+
+    Entries live at <root>/<key[:2]>/<key><suffix>. Reads bump the file mtime
+    so eviction (oldest mtime first) approximates LRU across restarts.
+    """
+
+    def __init__(self, root: Path, max_bytes: int, suffix: str = ""):
+        self.root = Path(root)
+        self.max_bytes = max(0, int(max_bytes))
+        self.suffix = suffix
+        self._lock = threading.Lock()
+        self._bytes: Optional[int] = None  # computed lazily on first write
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def path_for(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}{self.suffix}"
+
+    def get(self, key: str) -> Optional[bytes]:
+        p = self.path_for(key)
+        try:
+            data = p.read_bytes()
+        except OSError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        try:
+            os.utime(p, None)
+        except OSError:
+            pass
+        return data
+
+    def put(self, key: str, data: bytes) -> Optional[Path]:
+        if len(data) > self.max_bytes:
+            return None
+        p = self.path_for(key)
+        with self._lock:
+            try:
+                p.parent.mkdir(parents=True, exist_ok=True)
+                try:
+                    old_size = p.stat().st_size  # overwriting: don't count the old bytes twice
+                except OSError:
+                    old_size = 0
+                # pid too: bulk jobs write from several processes
+                tmp = p.with_name(f".{p.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+                tmp.write_bytes(data)
+                os.replace(tmp, p)
+            except OSError:
+                return None
+            if self._bytes is None:
+                self._bytes = self._scan_bytes()
+            else:
+                self._bytes += len(data) - old_size
+            if self._bytes > self.max_bytes:
+                self._evict()
+        return p
+
+    def _entries(self):
+        if not self.root.exists():
+            return []
+        return [f for f in self.root.glob(f"*/*{self.suffix}") if f.is_file()]
+
+    def _scan_bytes(self) -> int:
+        total = 0
+        for f in self._entries():
+            try:
+                total += f.stat().st_size
+            except OSError:
+                pass
+        return total
+
+    def _evict(self) -> None:
+        # Trim to 90% of the budget so we don't rescan on every subsequent put.
+        target = int(self.max_bytes * 0.9)
+        files = []
+        for f in self._entries():
+            try:
+                st = f.stat()
+            except OSError:
+                continue
+            files.append((st.st_mtime, st.st_size, f))
+        files.sort()
+        total = sum(size for _, size, _ in files)
+        for _, size, f in files:
+            if total <= target:
+                break
+            try:
+                f.unlink()
+            except OSError:
+                continue
+            total -= size
+            self.evictions += 1
+        self._bytes = total
+
+    def clear(self) -> None:
+        with self._lock:
+            for f in self._entries():
+                try:
+                    f.unlink()
+                except OSError:
+                    pass
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "root": str(self.root),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": (self.hits / total) if total else 0.0,
+        }
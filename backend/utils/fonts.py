@@ -0,0 +1,117 @@
+# backend/utils/fonts.py
+import os
+import threading
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+from PIL import Image, ImageDraw, ImageFont
+
+DEFAULT_FONT_FAMILY = os.getenv("FONT_FAMILY", "arial")
+# Explicit TTF/OTF file to use for the default family (skips resolution)
+FONT_PATH = os.getenv("FONT_PATH", "")
+
+# Tried in order when a family's own file can't be found. PIL resolves bare
+# file names against the platform's font directories.
+_FALLBACK_FILES = (
+    "DejaVuSans.ttf",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "/usr/share/fonts/dejavu/DejaVuSans.ttf",
+    "/Library/Fonts/Arial.ttf",
+    "C:/Windows/Fonts/arial.ttf",
+)
+
+_resolved: Dict[str, Optional[str]] = {}
+_resolve_lock = threading.Lock()
+
+# scratch surface for multiline measurement; ImageDraw needs an image
+_measure_draw = ImageDraw.Draw(Image.new("L", (1, 1)))
+
+
+def _candidates(family: str):
+    if FONT_PATH and family == DEFAULT_FONT_FAMILY:
+        yield FONT_PATH
+    if os.path.splitext(family)[1]:
+        yield family
+    else:
+        yield f"{family}.ttf"
+        yield f"{family}.otf"
+    yield from _FALLBACK_FILES
+
+
+def resolve_font_file(family: str = DEFAULT_FONT_FAMILY) -> Optional[str]:
+    """
+    Find a loadable font file for `family`, once per process.
+    Returns None when nothing loads; callers then get PIL's built-in font.
+    """
+    if family in _resolved:
+        return _resolved[family]
+    with _resolve_lock:
+        if family not in _resolved:
+            found = None
+            for cand in _candidates(family):
+                try:
+                    ImageFont.truetype(cand, 10)
+                except (OSError, ValueError):
+                    continue
+                found = cand
+                break
+            _resolved[family] = found
+    return _resolved[family]
+
+
+def get_font(size: int, family: str = DEFAULT_FONT_FAMILY):
+    """
+    Cached FreeType face for (family, size). Falls back to PIL's default font
+    if no TrueType file could be resolved.
+    """
+    # always call the cached loader positionally so keyword/default call
+    # styles share one cache entry
+    return _load_font(family, int(size))
+
+
+@lru_cache(maxsize=256)
+def _load_font(family: str, size: int):
+    path = resolve_font_file(family)
+    if path is not None:
+        try:
+            return ImageFont.truetype(path, size)
+        except (OSError, ValueError):
+            pass
+    try:
+        # Pillow >= 10.1 can scale the built-in font
+        return ImageFont.load_default(size)
+    except TypeError:
+        return ImageFont.load_default()
+
+
+def text_bbox(text: str, size: int, family: str = DEFAULT_FONT_FAMILY) -> Tuple[int, int, int, int]:
+    """
+    Bounding box (left, top, right, bottom) of `text` drawn at the origin,
+    matching what ImageDraw.text() would cover. Memoized per (text, size, family).
+    """
+    return _text_bbox(text, int(size), family)
+
+
+@lru_cache(maxsize=8192)
+def _text_bbox(text: str, size: int, family: str) -> Tuple[int, int, int, int]:
+    font = get_font(size, family)
+    if "\n" in text:
+        return tuple(int(v) for v in _measure_draw.multiline_textbbox((0, 0), text, font=font))
+    return tuple(int(v) for v in font.getbbox(text))
+
+
+def text_box_at(
+    text: str, x: int, y: int, size: int, family: str = DEFAULT_FONT_FAMILY
+) -> Tuple[int, int, int, int]:
+    """Bounding box of `text` drawn with its anchor at (x, y)."""
+    left, top, right, bottom = text_bbox(text, size, family)
+    return x + left, y + top, x + right, y + bottom
+
+
+def font_cache_stats() -> dict:
+    faces = _load_font.cache_info()
+    metrics = _text_bbox.cache_info()
+    return {
+        "resolved": dict(_resolved),
+        "faces": {"hits": faces.hits, "misses": faces.misses, "entries": faces.currsize},
+        "metrics": {"hits": metrics.hits, "misses": metrics.misses, "entries": metrics.currsize},
+    }
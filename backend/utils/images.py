@@ -1,18 +1,98 @@
 # backend/utils/images.py
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Tuple, Optional
+from typing import Any, Callable, List, Tuple, Optional
 from PIL import Image
+import hashlib
 import io
 import math
 
-from ..config import MAX_FILE_SIZE_BYTES, UPLOAD_DIR
+from ..config import IMAGE_CACHE_BYTES, MAX_FILE_SIZE_BYTES, UPLOAD_DIR
+from ..db import asset_index
+from .cache import LRUCache
 
 
-def load_image(path: Path) -> Image.Image:
+def _image_nbytes(img) -> int:
+    if not isinstance(img, Image.Image):
+        return int(img.nbytes)  # derived arrays, see cached_derived()
+    return img.width * img.height * len(img.getbands())
+
+
+# (path, mtime_ns, size, mode) -> decoded image; size None means "as decoded".
+# Values derived from images (cached_derived) share the same byte budget.
+_image_cache = LRUCache(IMAGE_CACHE_BYTES, sizeof=_image_nbytes)
+
+
+def load_image(
+    path: Path,
+    size: Optional[Tuple[int, int]] = None,
+    mode: str = "RGBA",
+) -> Image.Image:
     """
-    Load an image file and convert to RGBA (suitable for compositing).
+    Load an image file and convert to `mode` (RGBA by default, suitable for
+    compositing), optionally resized to `size` with Lanczos.
+
+    Decoded and resized results are cached per process, keyed on the file's
+    mtime so an overwritten file is re-read. The returned image is shared with
+    the cache: treat it as read-only (PIL operations that return a new image,
+    like resize/convert/alpha_composite onto another base, are fine).
     """
-    return Image.open(path).convert("RGBA")
+    p = Path(path)
+    try:
+        mtime = p.stat().st_mtime_ns
+    except OSError:
+        # let PIL raise its usual error for a missing/unreadable file
+        return _resize_and_convert(Image.open(p), size, mode)
+
+    key = (str(p.resolve()), mtime, tuple(size) if size else None, mode)
+    img = _image_cache.get(key)
+    if img is not None:
+        return img
+
+    if size is not None:
+        # derive from the cached full decode so N target sizes cost one decode
+        img = resize_to_fit(load_image(p, None, mode), tuple(size))
+    else:
+        img = _resize_and_convert(Image.open(p), None, mode)
+    _image_cache.put(key, img)
+    return img
+
+
+def _resize_and_convert(img: Image.Image, size: Optional[Tuple[int, int]], mode: str) -> Image.Image:
+    img = img.convert(mode)
+    if size is not None and img.size != tuple(size):
+        img = resize_to_fit(img, tuple(size))
+    return img
+
+
+def cached_derived(key: tuple, build: Callable[[], Any]) -> Any:
+    """
+    Get-or-build a value computed from images (e.g. a luminance table) in the
+    image cache, so decoded pixels and what's derived from them are evicted
+    under one budget. The value needs an `nbytes` attribute; like cached
+    images it is shared, so treat it as read-only.
+    """
+    key = ("derived",) + tuple(key)
+    value = _image_cache.get(key)
+    if value is None:
+        value = build()
+        _image_cache.put(key, value)
+    return value
+
+
+def image_cache_stats() -> dict:
+    return _image_cache.stats()
+
+
+def clear_image_cache() -> None:
+    _image_cache.clear()
+
+
+def image_hash(image: Image.Image) -> str:
+    """Content hash of decoded pixels (mode and size included)."""
+    h = hashlib.sha256(f"{image.mode}:{image.size}".encode())
+    h.update(image.tobytes())
+    return h.hexdigest()
 
 
 def resize_to_fit(img: Image.Image, size: Tuple[int, int]) -> Image.Image:
@@ -22,16 +102,56 @@ def resize_to_fit(img: Image.Image, size: Tuple[int, int]) -> Image.Image:
     return img.resize(size, Image.LANCZOS)
 
 
+# Where packshots sit on every canvas: (x, y, w, h) as fractions of the canvas
+PACKSHOT_BOX = (0.25, 0.4, 0.5, 0.5)
+
+
+def packshot_rect(size: Tuple[int, int]) -> Tuple[int, int, int, int]:
+    """
+    Pixel rectangle (x, y, w, h) a packshot occupies on a canvas of `size`.
+    """
+    W, H = size
+    fx, fy, fw, fh = PACKSHOT_BOX
+    return int(W * fx), int(H * fy), int(W * fw), int(H * fh)
+
+
+def save_image(img: Image.Image, dest: Path, fmt: str = "PNG") -> int:
+    """
+    Save a composed creative (flattened to RGB) and return its size in bytes.
+    """
+    dest = Path(dest)
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    img.convert("RGB").save(dest, fmt)
+    return dest.stat().st_size
+
+
 def find_uploaded_file(file_id: str, base_dir: Optional[Path] = None) -> Optional[Path]:
     """
-    Try to find an uploaded file in UPLOAD_DIR with the given id (without ext).
-    Looks for common extensions (.png, .jpg, .jpeg, .webp).
+    Resolve an uploaded file id (without ext) to its path.
+
+    Uses the asset index (in-process cache, then SQLite) for UPLOAD_DIR.
+    Files that aren't indexed yet are found by checking the common extensions
+    (.png, .jpg, .jpeg, .webp) and are indexed on the way out; there is no
+    directory scan. Run `python -m backend.tools.rebuild_asset_index` to index
+    an existing upload directory with other file names.
     Returns Path or None.
     """
-    base_dir = base_dir or Path(UPLOAD_DIR)
     if not file_id:
         return None
 
+    use_index = base_dir is None or Path(base_dir) == Path(UPLOAD_DIR)
+    base_dir = Path(base_dir or UPLOAD_DIR)
+
+    if use_index:
+        try:
+            path = asset_index.resolve(file_id)
+        except Exception:
+            # index unavailable (e.g. DB locked/corrupt): fall back to probing
+            path = None
+            use_index = False
+        if path is not None:
+            return path
+
     candidates = [
         f"{file_id}.png",
         f"{file_id}.jpg",
@@ -41,79 +161,228 @@ def find_uploaded_file(file_id: str, base_dir: Optional[Path] = None) -> Optiona
     for fn in candidates:
         p = base_dir / fn
         if p.exists():
+            if use_index:
+                try:
+                    asset_index.register(file_id, p)
+                except Exception:
+                    pass
             return p
 
-    # Fallback: any file that starts with file_id
-    for p in base_dir.glob(f"{file_id}*"):
-        if p.is_file():
-            return p
+    return None
+
+
+# (format, quality or None, (w, h), bytes) for every encode performed
+EncodeAttempt = Tuple[str, Optional[int], Tuple[int, int], int]
+
+
+@dataclass
+class EncodeResult:
+    data: bytes
+    format: str
+    quality: Optional[int]
+    size: Tuple[int, int]
+    attempts: List[EncodeAttempt] = field(default_factory=list)
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.data)
+
 
+def _format_for(dest: Path) -> str:
+    suffix = dest.suffix.lower()
+    if suffix in (".jpg", ".jpeg"):
+        return "JPEG"
+    if suffix == ".webp":
+        return "WEBP"
+    return "PNG"
+
+
+def _encode(img: Image.Image, fmt: str, quality: Optional[int], attempts: List[EncodeAttempt]) -> bytes:
+    buf = io.BytesIO()
+    if fmt == "JPEG":
+        img.convert("RGB").save(buf, format="JPEG", quality=quality, optimize=True)
+    elif fmt == "WEBP":
+        img.save(buf, format="WEBP", quality=quality, method=4)
+    else:
+        img.save(buf, format="PNG")
+    data = buf.getvalue()
+    attempts.append((fmt, quality, img.size, len(data)))
+    return data
+
+
+def _predict_png_bytes(img: Image.Image, attempts: List[EncodeAttempt]) -> int:
+    """
+    Estimate the full-size PNG size from a 1/4-scale probe. Far cheaper than a
+    wasted full encode when the image is photographic and can't fit anyway.
+    """
+    w, h = img.size
+    tw, th = max(1, w // 4), max(1, h // 4)
+    probe = _encode(img.resize((tw, th), Image.BILINEAR), "PNG", None, attempts)
+    return int(len(probe) * (w * h) / float(tw * th))
+
+
+# Typical encoded size at each quality relative to quality 95 (30, 35, ..., 95),
+# the log-mean over flat graphics, photo-like backgrounds and noisy texture.
+# Real images deviate, so the first guess is checked and then refined between
+# measured points.
+_QUALITY_STEPS = tuple(range(30, 96, 5))
+_RELATIVE_SIZE = {
+    "JPEG": (0.174, 0.201, 0.224, 0.259, 0.281, 0.31, 0.341, 0.371, 0.41, 0.453, 0.519, 0.609, 0.753, 1.0),
+    "WEBP": (0.18, 0.185, 0.215, 0.242, 0.265, 0.302, 0.334, 0.363, 0.408, 0.43, 0.537, 0.643, 0.804, 1.0),
+}
+
+
+def _relative_size(fmt: str, quality: int) -> float:
+    """Expected size at `quality` relative to quality 95 (log-linear between steps)."""
+    table = _RELATIVE_SIZE[fmt]
+    pos = (min(max(quality, _QUALITY_STEPS[0]), _QUALITY_STEPS[-1]) - _QUALITY_STEPS[0]) / 5.0
+    i = min(int(pos), len(table) - 2)
+    frac = pos - i
+    return math.exp(math.log(table[i]) * (1 - frac) + math.log(table[i + 1]) * frac)
+
+
+# (quality, bytes) of an encode at the current scale
+QualityPoint = Tuple[int, int]
+
+
+def _size_model(fmt: str, p1: QualityPoint, p2: Optional[QualityPoint]) -> Callable[[int], float]:
+    """
+    Predicted bytes at a quality, modelled as C * relative_size(q) ** b through
+    the measured points p1 and p2: b stretches the typical curve to this image
+    (b = 1 with a single point).
+    """
+    r1 = _relative_size(fmt, p1[0])
+    b = 1.0
+    if p2 is not None and p2[0] != p1[0] and p1[1] > 0 and p2[1] > 0:
+        r2 = _relative_size(fmt, p2[0])
+        if r1 != r2:
+            b = min(5.0, max(0.2, math.log(p1[1] / p2[1]) / math.log(r1 / r2)))
+    return lambda q: p1[1] * (_relative_size(fmt, q) / r1) ** b
+
+
+def _highest_fitting(model: Callable[[int], float], target: float, lo_q: int, hi_q: int) -> Optional[int]:
+    """Highest quality in [lo_q, hi_q] the model expects to fit in target bytes."""
+    for q in range(hi_q, lo_q - 1, -1):
+        if model(q) <= target:
+            return q
     return None
 
 
+def encode_with_size_limit(
+    img: Image.Image,
+    fmt: str = "JPEG",
+    max_bytes: int = MAX_FILE_SIZE_BYTES,
+    min_quality: int = 30,
+    max_quality: int = 95,
+    max_attempts: int = 12,
+    max_refinements: int = 2,
+) -> EncodeResult:
+    """
+    Encode img as fmt (JPEG, WEBP or PNG) trying to keep it <= max_bytes.
+
+    Strategy:
+      1. Lossy formats: encode at max_quality. If too big, predict the
+         quality that fits from that attempt's size and a typical
+         size-vs-quality curve; if no quality >= min_quality is predicted to
+         fit, first downscale by the predicted factor.
+      2. Encode at the prediction. If it's too big, refit the curve through
+         the two measurements and predict again. Once an encode fits but is
+         more than 10% under budget, refine at most `max_refinements` times
+         between the fitting and the too-big encode.
+      3. PNG: a quarter-scale probe predicts the full size; PNG is only
+         encoded if it looks like it will fit, otherwise fall back to JPEG.
+      4. If all else fails, return the last attempt even if still too large.
+
+    Usually 2-4 encodes. Every encode is recorded in EncodeResult.attempts.
+    """
+    fmt = fmt.upper()
+    attempts: List[EncodeAttempt] = []
+    work = img
+
+    if fmt == "PNG":
+        if _predict_png_bytes(work, attempts) <= max_bytes * 1.1:
+            data = _encode(work, "PNG", None, attempts)
+            if len(data) <= max_bytes:
+                return EncodeResult(data, "PNG", None, work.size, attempts)
+        fmt = "JPEG"
+
+    if fmt == "JPEG" and work.mode not in ("RGB", "L"):
+        # convert once up front instead of on every attempt
+        work = work.convert("RGB")
+
+    def result(data: bytes, q: int) -> EncodeResult:
+        return EncodeResult(data, fmt, q, work.size, attempts)
+
+    data = _encode(work, fmt, max_quality, attempts)
+    if len(data) <= max_bytes:
+        return result(data, max_quality)
+
+    target = max_bytes * 0.95  # aim mid-way into the accepted 90-100% band
+    hi: QualityPoint = (max_quality, len(data))  # lowest quality known to be too big
+    prev_hi: Optional[QualityPoint] = None
+    lo: Optional[QualityPoint] = None  # highest quality known to fit
+    best_data = None
+    refinements = 0
+    q = max_quality
+
+    while len(attempts) < max_attempts:
+        if lo is None:
+            model = _size_model(fmt, hi, prev_hi)
+            q = _highest_fitting(model, target, min_quality, hi[0] - 1)
+            if q is None:
+                # even min_quality won't fit: shrink so that it (roughly) does;
+                # bytes scale ~linearly with pixel count at fixed quality
+                w, h = work.size
+                scale = min(0.95, math.sqrt(target / max(1.0, model(min_quality))))
+                new_w, new_h = max(1, math.floor(w * scale)), max(1, math.floor(h * scale))
+                if (new_w, new_h) == (w, h):
+                    # We can't shrink further; return what we have.
+                    return result(data, hi[0])
+                work = work.resize((new_w, new_h), Image.LANCZOS)
+                # earlier measurements, predicted for the new size
+                ratio = (new_w * new_h) / float(w * h)
+                hi = (hi[0], max(1, int(hi[1] * ratio)))
+                prev_hi = (prev_hi[0], max(1, int(prev_hi[1] * ratio))) if prev_hi else None
+                q = _highest_fitting(_size_model(fmt, hi, prev_hi), target, min_quality, hi[0] - 1) or min_quality
+        else:
+            # close enough: within 10% of the budget, or nothing left between
+            if lo[1] >= max_bytes * 0.9 or hi[0] - lo[0] <= 1 or refinements >= max_refinements:
+                break
+            refinements += 1
+            model = _size_model(fmt, lo, hi)
+            q = _highest_fitting(model, target, lo[0] + 1, hi[0] - 1) or lo[0] + 1
+
+        data = _encode(work, fmt, q, attempts)
+        if len(data) <= max_bytes:
+            lo, best_data = (q, len(data)), data
+        else:
+            prev_hi, hi = hi, (q, len(data))
+
+    if best_data is None:
+        return result(data, q)
+    return result(best_data, lo[0])
+
+
 def save_with_size_limit(
     img: Image.Image,
     dest: Path,
     max_bytes: int = MAX_FILE_SIZE_BYTES,
+    report: Optional[List[EncodeAttempt]] = None,
 ) -> int:
     """
     Save image to dest trying to keep file size <= max_bytes.
-
-    Strategy:
-      1. If dest is JPEG, try reducing quality from 95 down to 30.
-      2. If still too large, downscale by 10% increments and retry.
-      3. For PNG, try PNG once, then convert to JPEG and apply same logic.
-      4. If all else fails, save the last attempt even if still too large.
+    The format follows the suffix (.jpg/.jpeg, .webp, otherwise PNG); see
+    encode_with_size_limit for the strategy. PNG destinations may receive
+    JPEG data when PNG can't fit. If `report` is given, the attempts made
+    are appended to it.
 
     Returns the final size in bytes.
     """
+    dest = Path(dest)
     dest.parent.mkdir(parents=True, exist_ok=True)
-    fmt = "JPEG" if dest.suffix.lower() in [".jpg", ".jpeg"] else "PNG"
-
-    # local image copy so we don't mutate caller's object
-    attempt_img = img.copy()
-    quality = 95
-
-    while True:
-        buf = io.BytesIO()
-
-        if fmt == "JPEG":
-            attempt_img.convert("RGB").save(
-                buf,
-                format="JPEG",
-                quality=quality,
-                optimize=True,
-            )
-        else:
-            # PNG attempt
-            attempt_img.save(buf, format="PNG", optimize=True)
-
-        size = buf.tell()
-
-        # success or we've hit our limits
-        if size <= max_bytes or (fmt == "JPEG" and quality <= 30):
-            with open(dest, "wb") as f:
-                f.write(buf.getvalue())
-            return size
-
-        # If we are on JPEG and can still reduce quality, do so
-        if fmt == "JPEG" and quality > 30:
-            quality -= 10
-            continue
-
-        # If still too big and we were PNG, switch to JPEG and try again
-        if fmt != "JPEG":
-            fmt = "JPEG"
-            quality = 90
-            continue
-
-        # Last resort: downscale the image by 10% and try again
-        w, h = attempt_img.size
-        new_w = max(1, math.floor(w * 0.9))
-        new_h = max(1, math.floor(h * 0.9))
-        if (new_w, new_h) == (w, h):
-            # We can't shrink further; save what we have and exit.
-            with open(dest, "wb") as f:
-                f.write(buf.getvalue())
-            return size
-        attempt_img = attempt_img.resize((new_w, new_h), Image.LANCZOS)
+    res = encode_with_size_limit(img, _format_for(dest), max_bytes)
+    with open(dest, "wb") as f:
+        f.write(res.data)
+    if report is not None:
+        report.extend(res.attempts)
+    return res.nbytes
@@ -0,0 +1,105 @@
+# backend/utils/jsonpatch.py
+"""
+Minimal JSON Patch (RFC 6902) for canvas history: make_patch produces
+add/remove/replace operations between two JSON documents and apply_patch
+replays them. Only what canvas deltas need; no move/copy/test.
+"""
+from typing import Any, Dict, List
+
+Patch = List[Dict[str, Any]]
+
+
+def _escape(token: str) -> str:
+    return token.replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def _diff(a: Any, b: Any, path: str, ops: Patch) -> None:
+    if type(a) is not type(b):
+        ops.append({"op": "replace", "path": path, "value": b})
+        return
+    if isinstance(a, dict):
+        for key in a:
+            if key not in b:
+                ops.append({"op": "remove", "path": f"{path}/{_escape(str(key))}"})
+        for key, value in b.items():
+            child = f"{path}/{_escape(str(key))}"
+            if key not in a:
+                ops.append({"op": "add", "path": child, "value": value})
+            else:
+                _diff(a[key], value, child, ops)
+        return
+    if isinstance(a, list):
+        common = min(len(a), len(b))
+        for i in range(common):
+            _diff(a[i], b[i], f"{path}/{i}", ops)
+        # remove from the end so earlier indexes stay valid
+        for i in range(len(a) - 1, common - 1, -1):
+            ops.append({"op": "remove", "path": f"{path}/{i}"})
+        for i in range(common, len(b)):
+            ops.append({"op": "add", "path": f"{path}/{i}", "value": b[i]})
+        return
+    if a != b:
+        ops.append({"op": "replace", "path": path, "value": b})
+
+
+def make_patch(a: Any, b: Any) -> Patch:
+    """Operations that turn document `a` into document `b`."""
+    ops: Patch = []
+    _diff(a, b, "", ops)
+    return ops
+
+
+def _copy_container(value: Any) -> Any:
+    if isinstance(value, dict):
+        return dict(value)
+    if isinstance(value, list):
+        return list(value)
+    return value
+
+
+def apply_patch(doc: Any, patch: Patch) -> Any:
+    """
+    Apply `patch` to `doc` and return the result. `doc` is not modified:
+    containers along each patched path are copied, everything else is shared.
+    """
+    for op in patch:
+        tokens = [_unescape(t) for t in op["path"].split("/")[1:]]
+        if not tokens:
+            if op["op"] == "remove":
+                doc = None
+            else:
+                doc = op["value"]
+            continue
+
+        root = _copy_container(doc)
+        parent = root
+        for token in tokens[:-1]:
+            key = int(token) if isinstance(parent, list) else token
+            parent[key] = _copy_container(parent[key])
+            parent = parent[key]
+
+        last = tokens[-1]
+        kind = op["op"]
+        if isinstance(parent, list):
+            idx = len(parent) if last == "-" else int(last)
+            if kind == "add":
+                parent.insert(idx, op["value"])
+            elif kind == "remove":
+                del parent[idx]
+            elif kind == "replace":
+                parent[idx] = op["value"]
+            else:
+                raise ValueError(f"Unsupported patch op: {kind}")
+        else:
+            if kind in ("add", "replace"):
+                parent[last] = op["value"]
+            elif kind == "remove":
+                del parent[last]
+            else:
+                raise ValueError(f"Unsupported patch op: {kind}")
+        doc = root
+    return doc
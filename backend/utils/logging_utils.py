@@ -1,10 +1,24 @@
 # backend/utils/logging_utils.py
-import csv
+import atexit
 import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime
 from pathlib import Path
-from typing import List, Any, Dict
+from typing import List, Any, Dict, Iterator, Optional, Tuple
 
-from ..config import AUDIT_LOG_DIR
+from ..config import (
+    AUDIT_BLOCK_TIMEOUT,
+    AUDIT_FSYNC,
+    AUDIT_FSYNC_INTERVAL,
+    AUDIT_LOG_DIR,
+    AUDIT_ON_FULL,
+    AUDIT_QUEUE_MAX,
+    AUDIT_SEGMENT_MAX_BYTES,
+    AUDIT_SEGMENT_MAX_SECONDS,
+)
 from ..schemas import ValidationIssue
 
 
@@ -39,24 +53,267 @@ def _normalize_issue(i: Any) -> Dict:
         return {"code": "UNKNOWN", "message": str(i), "severity": "warning"}
 
 
+class _Flush:
+    """Queue marker: set once every record queued before it is written."""
+
+    def __init__(self):
+        self.done = threading.Event()
+
+
+_STOP = object()
+
+
+class AuditSink:
+    """
+    Append-only JSON Lines log. Callers enqueue records and return at once;
+    a background thread appends them in batches to segment files
+    (<prefix>-<start time>-<pid>-<seq>.jsonl). The segment is chosen when a
+    record is enqueued - a new one once the current one reaches max_bytes or
+    max_age_s - so emit() can say which file the record will end up in.
+
+    The queue is bounded. When it's full, records are dropped (on_full="drop")
+    or the caller waits up to block_timeout_s first ("block"); both are
+    counted in stats(). fsync is "always" (per batch), "interval" or "never".
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        prefix: str = "audit",
+        max_bytes: int = AUDIT_SEGMENT_MAX_BYTES,
+        max_age_s: float = AUDIT_SEGMENT_MAX_SECONDS,
+        queue_max: int = AUDIT_QUEUE_MAX,
+        on_full: str = AUDIT_ON_FULL,
+        block_timeout_s: float = AUDIT_BLOCK_TIMEOUT,
+        fsync: str = AUDIT_FSYNC,
+        fsync_interval_s: float = AUDIT_FSYNC_INTERVAL,
+        batch_size: int = 512,
+    ):
+        self.directory = Path(directory)
+        self.prefix = prefix
+        self.max_bytes = max(1, max_bytes)
+        self.max_age_s = max_age_s
+        self.on_full = on_full if on_full in ("drop", "block") else "drop"
+        self.block_timeout_s = block_timeout_s
+        self.fsync = fsync if fsync in ("always", "interval", "never") else "interval"
+        self.fsync_interval_s = fsync_interval_s
+        self.batch_size = max(1, batch_size)
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max(1, queue_max))
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        # producer side: segment being assigned to, and its size so far
+        self._assign_lock = threading.Lock()
+        self._path: Optional[Path] = None
+        self._opened_at = 0.0
+        self._bytes = 0
+        self._seq = 0
+        # writer side: the open file
+        self._file = None
+        self._file_path: Optional[Path] = None
+        self._last_fsync = 0.0
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.blocked = 0
+        self.rotations = 0
+        self.fsyncs = 0
+        self.errors = 0
+
+    # -- producer side -----------------------------------------------------
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name=f"{self.prefix}-sink", daemon=True)
+                self._thread.start()
+
+    def _new_segment_path(self) -> Path:
+        self._seq += 1
+        stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S")
+        # pid keeps segments of several server workers apart
+        return self.directory / f"{self.prefix}-{stamp}-{os.getpid()}-{self._seq:04d}.jsonl"
+
+    def emit(self, record: Dict[str, Any]) -> Optional[Path]:
+        """
+        Queue a record for writing. Returns the segment file it will be
+        appended to, or None if it was dropped.
+        """
+        self._ensure_thread()
+        line = (json.dumps(record, default=str, separators=(",", ":")) + "\n").encode("utf-8")
+        # only the segment choice needs the lock; a blocking put below must not
+        # hold up other producers
+        with self._assign_lock:
+            path = self._path
+            too_big = self._bytes >= self.max_bytes
+            too_old = self.max_age_s > 0 and time.monotonic() - self._opened_at >= self.max_age_s
+            if path is None or too_big or too_old:
+                if path is not None:
+                    self.rotations += 1
+                path = self._new_segment_path()
+                self._path, self._bytes, self._opened_at = path, 0, time.monotonic()
+            self._bytes += len(line)
+        try:
+            self._queue.put_nowait((path, line))
+        except queue.Full:
+            queued = False
+            if self.on_full == "block":
+                self.blocked += 1
+                try:
+                    self._queue.put((path, line), timeout=self.block_timeout_s)
+                    queued = True
+                except queue.Full:
+                    pass
+            if not queued:
+                with self._assign_lock:
+                    self.dropped += 1
+                    if self._path == path:
+                        self._bytes -= len(line)
+                return None
+        self.enqueued += 1
+        return path
+
+    def flush(self, timeout: Optional[float] = 5.0) -> bool:
+        """Wait until everything queued so far is written (and fsynced unless fsync="never")."""
+        if self._thread is None:
+            return True
+        marker = _Flush()
+        try:
+            self._queue.put(marker, timeout=timeout)
+        except queue.Full:
+            return False
+        return marker.done.wait(timeout)
+
+    def close(self, timeout: Optional[float] = 5.0) -> None:
+        """Write out the queue, close the segment and stop the writer thread."""
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            return
+        thread.join(timeout)
+
+    def current_path(self) -> Path:
+        """Segment new records are assigned to (the directory before the first record)."""
+        return self._path or self.directory
+
+    # -- writer thread -----------------------------------------------------
+
+    def _open_segment(self, path: Path) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._file = open(path, "ab")
+        self._file_path = path
+
+    def _close_segment(self) -> None:
+        if self._file is None:
+            return
+        try:
+            self._file.flush()
+            if self.fsync != "never":
+                os.fsync(self._file.fileno())
+                self.fsyncs += 1
+        finally:
+            self._file.close()
+            self._file = None
+            self._file_path = None
+
+    def _sync(self, force: bool = False) -> None:
+        self._file.flush()
+        if self.fsync == "never":
+            return
+        now = time.monotonic()
+        if force or self.fsync == "always" or now - self._last_fsync >= self.fsync_interval_s:
+            os.fsync(self._file.fileno())
+            self._last_fsync = now
+            self.fsyncs += 1
+
+    def _write_batch(self, records: List[Tuple[Path, bytes]]) -> None:
+        for path, line in records:
+            if path != self._file_path:
+                self._close_segment()
+                self._open_segment(path)
+            self._file.write(line)
+        self.written += len(records)
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            batch = [item]
+            # drain whatever else is waiting, so one flush covers many records
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            records: List[Tuple[Path, bytes]] = []
+            markers: List[_Flush] = []
+            stop = False
+            for it in batch:
+                if it is _STOP:
+                    stop = True
+                elif isinstance(it, _Flush):
+                    markers.append(it)
+                else:
+                    records.append(it)
+            try:
+                if records:
+                    self._write_batch(records)
+                if self._file is not None:
+                    self._sync(force=bool(markers))
+            except Exception as e:
+                self.errors += 1
+                print("Audit log write failed:", e)
+            for m in markers:
+                m.done.set()
+            if stop:
+                try:
+                    self._close_segment()
+                except Exception:
+                    self.errors += 1
+                return
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "segment": str(self._path) if self._path else None,
+            "segment_bytes": self._bytes,
+            "queue_depth": self._queue.qsize(),
+            "queue_max": self._queue.maxsize,
+            "on_full": self.on_full,
+            "fsync": self.fsync,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "blocked": self.blocked,
+            "rotations": self.rotations,
+            "fsyncs": self.fsyncs,
+            "errors": self.errors,
+        }
+
+
+audit_sink = AuditSink(AUDIT_LOG_DIR, prefix="audit")
+atexit.register(audit_sink.close)
+
+
+def _now() -> str:
+    return datetime.utcnow().isoformat()
+
+
 def write_audit_log(
     canvas_id: str,
     issues: List[Any],
     fixes: List[str],
 ) -> Path:
     """
-    Write audit information (issues + applied fixes) for a canvas.
-
-    - JSON file with full structured data
-    - CSV file with a flat list of issues
+    Append audit information (issues + applied fixes) for a canvas to the
+    audit log. Every call adds a record, so a canvas's full history is kept.
 
-    Returns the path to the JSON log file.
+    Returns the segment file the record will be appended to (once the
+    background writer gets to it), or the log directory if it was dropped.
     """
-    AUDIT_LOG_DIR.mkdir(parents=True, exist_ok=True)
-
-    json_path = AUDIT_LOG_DIR / f"{canvas_id}_audit.json"
-    csv_path = AUDIT_LOG_DIR / f"{canvas_id}_audit.csv"
-
     # Normalize all issues to plain dicts
     normalized_issues = []
     for it in issues or []:
@@ -70,34 +327,48 @@ def write_audit_log(
                 normalized_issues.append({"code": "NORMALIZE_ERROR", "message": "<unserializable>", "severity": "warning"})
 
     data = {
+        "type": "audit",
         "canvas_id": canvas_id,
         "issues": normalized_issues,
         "applied_fixes": fixes,
-        "generated_at": None,
+        "generated_at": _now(),
     }
 
+    # Don't let audit logging break the main pipeline
     try:
-        from datetime import datetime
-        data["generated_at"] = datetime.utcnow().isoformat()
+        path = audit_sink.emit(data)
     except Exception:
-        pass
+        path = None
+    return path or audit_sink.directory
 
-    # JSON log
-    try:
-        with open(json_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2)
-    except Exception:
-        # Don't let audit logging break the main pipeline
-        pass
 
-    # CSV log
+def log_event(event: str, data: Optional[Dict[str, Any]] = None) -> None:
+    """Record an operational event (upload, render, job...) in the same log."""
     try:
-        with open(csv_path, "w", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            writer.writerow(["code", "message", "severity"])
-            for i in normalized_issues:
-                writer.writerow([i.get("code", ""), i.get("message", ""), i.get("severity", "")])
+        audit_sink.emit({"type": "event", "event": event, "data": data or {}, "generated_at": _now()})
     except Exception:
         pass
 
-    return json_path
+
+def iter_audit_records(directory: Optional[Path] = None) -> Iterator[Dict[str, Any]]:
+    """All records in the segment files, oldest segment first."""
+    directory = Path(directory or AUDIT_LOG_DIR)
+    segments = sorted(directory.glob("*.jsonl"), key=lambda p: (p.stat().st_mtime, p.name))
+    for seg in segments:
+        with open(seg, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue  # torn last line of a crashed writer
+
+
+def canvas_audit_history(canvas_id: str, directory: Optional[Path] = None) -> List[Dict[str, Any]]:
+    """Every audit record written for a canvas, oldest first (scans all segments)."""
+    return [
+        r for r in iter_audit_records(directory)
+        if r.get("type") == "audit" and r.get("canvas_id") == canvas_id
+    ]
@@ -0,0 +1,209 @@
+# backend/utils/metrics.py
+"""
+In-process metrics in Prometheus text format (no client library needed):
+  - Histogram: latency distributions with labels (render stages, endpoints),
+  - callback gauges/counters: values read from existing stats() at scrape time
+    (cache hits, queue depths), so hot paths don't pay for them,
+  - stage(): times a block into the stage histogram and into the current
+    request's StageTimings (a contextvar), which becomes a Server-Timing header.
+"""
+
+import contextlib
+import contextvars
+import math
+import threading
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# seconds; render stages range from sub-millisecond text draws to SD generations
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+LabelValues = Tuple[str, ...]
+Sample = Tuple[Dict[str, str], float]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class Histogram:
+    """Cumulative-bucket histogram, one series per label combination."""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[LabelValues, List[float]] = {}  # bucket counts..., sum, count
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0.0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._series.items())
+        for key, series in items:
+            cumulative = 0.0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                le = _labels(self.labelnames, key, f'le="{_number(bound)}"')
+                lines.append(f"{self.name}_bucket{le} {_number(cumulative)}")
+            le = _labels(self.labelnames, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{le} {_number(series[-1])}")
+            base = _labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{base} {_number(series[-2])}")
+            lines.append(f"{self.name}_count{base} {_number(series[-1])}")
+        return lines
+
+
+class CallbackMetric:
+    """A gauge or counter whose samples come from a function at scrape time."""
+
+    def __init__(self, name: str, help: str, kind: str, fn: Callable[[], Iterable[Sample]]):
+        self.name = name
+        self.help = help
+        self.kind = kind
+        self.fn = fn
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        try:
+            samples = list(self.fn())
+        except Exception:
+            return []  # a broken collector shouldn't break the whole scrape
+        for labels, value in samples:
+            if value is None:
+                continue
+            names = sorted(labels)
+            lines.append(f"{self.name}{_labels(names, [labels[n] for n in names])} {_number(value)}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = Histogram(name, help, labelnames, buckets)
+            return metric
+
+    def register_callback(self, name: str, help: str, fn: Callable[[], Iterable[Sample]], kind: str = "gauge") -> None:
+        with self._lock:
+            self._metrics[name] = CallbackMetric(name, help, kind, fn)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for m in metrics:
+            lines.extend(m.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+STAGE_SECONDS = registry.histogram(
+    "adora_render_stage_seconds",
+    "Time spent in each render stage (decode, generate, resize, composite, text, encode, persist, validate).",
+    ["stage"],
+)
+REQUEST_SECONDS = registry.histogram(
+    "adora_http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ["method", "route", "status"],
+)
+
+
+class StageTimings:
+    """Per-request stage totals. Formats rendered in parallel add up, so totals can exceed wall time."""
+
+    def __init__(self):
+        self._totals: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.started = time.perf_counter()
+
+    def add(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self._totals[name] = self._totals.get(name, 0.0) + seconds
+
+    def totals(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._totals)
+
+    def server_timing(self) -> str:
+        """Server-Timing header value, durations in milliseconds plus the total wall time."""
+        parts = [f"{name};dur={sec * 1000:.1f}" for name, sec in self.totals().items()]
+        parts.append(f"total;dur={(time.perf_counter() - self.started) * 1000:.1f}")
+        return ", ".join(parts)
+
+
+_current: contextvars.ContextVar[Optional[StageTimings]] = contextvars.ContextVar("stage_timings", default=None)
+
+
+@contextlib.contextmanager
+def collect_timings() -> Iterator[StageTimings]:
+    """Collect the stage() timings of this context (and threads it hands its context to)."""
+    timings = StageTimings()
+    token = _current.set(timings)
+    try:
+        yield timings
+    finally:
+        _current.reset(token)
+
+
+@contextlib.contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time a block into adora_render_stage_seconds and the current request's timings."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - t0
+        STAGE_SECONDS.observe(elapsed, stage=name)
+        timings = _current.get()
+        if timings is not None:
+            timings.add(name, elapsed)
+
+
+def cache_samples(caches: Dict[str, Callable[[], dict]], field: str) -> List[Sample]:
+    """One sample per cache from its stats() dict (LRUCache/DiskCache/lru_cache shaped)."""
+    samples: List[Sample] = []
+    for name, get_stats in caches.items():
+        try:
+            value = get_stats().get(field)
+        except Exception:
+            continue
+        if value is not None:
+            samples.append(({"cache": name}, float(value)))
+    return samples
@@ -0,0 +1,131 @@
+# backend/utils/uploads.py
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from PIL import Image
+from starlette.concurrency import run_in_threadpool
+
+from ..config import MAX_FILE_SIZE_BYTES, UPLOAD_DIR
+
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(64 * 1024)))
+
+# Image formats we accept, by what PIL detects in the bytes (never the
+# client-supplied extension), with the extension we store them under.
+ALLOWED_FORMATS = {
+    "PNG": (".png", "image/png"),
+    "JPEG": (".jpg", "image/jpeg"),
+    "WEBP": (".webp", "image/webp"),
+}
+
+
+class UploadError(Exception):
+    """Base class for rejected uploads; `status_code` is the HTTP status to return."""
+    status_code = 400
+
+
+class UploadTooLarge(UploadError):
+    status_code = 413
+
+
+class UnsupportedUpload(UploadError):
+    status_code = 415
+
+
+@dataclass
+class StoredUpload:
+    file_id: str  # sha256 of the content; also the stored file's stem
+    path: Path
+    sha256: str
+    size_bytes: int
+    mime_type: str
+    width: int
+    height: int
+    deduplicated: bool  # True if identical content was already stored
+
+
+def _inspect_image(path: Path):
+    try:
+        with Image.open(path) as im:
+            fmt, size = im.format, im.size
+            im.verify()
+    except Exception as e:
+        raise UnsupportedUpload(f"Not a readable image: {e}")
+    if fmt not in ALLOWED_FORMATS:
+        raise UnsupportedUpload(f"Unsupported image format: {fmt}")
+    return fmt, size
+
+
+def _commit_upload(tmp_path: Path, digest: str, upload_dir: Path):
+    """Sniff the temp file and move it to its content address (blocking)."""
+    fmt, (width, height) = _inspect_image(tmp_path)
+    ext, mime = ALLOWED_FORMATS[fmt]
+    dest = upload_dir / f"{digest}{ext}"
+    if dest.exists():
+        tmp_path.unlink()
+        return dest, mime, width, height, True
+    os.replace(tmp_path, dest)
+    return dest, mime, width, height, False
+
+
+async def store_upload(
+    file,
+    max_bytes: int = MAX_FILE_SIZE_BYTES,
+    upload_dir: Optional[Path] = None,
+) -> StoredUpload:
+    """
+    Stream an UploadFile to disk in chunks, hashing as we go, and store it
+    content-addressed as <sha256><ext> in upload_dir. Identical content is
+    stored once. File I/O runs in the threadpool, off the event loop.
+
+    Raises UploadTooLarge as soon as more than max_bytes have been read, and
+    UnsupportedUpload if the bytes are not a PNG/JPEG/WebP image.
+    """
+    upload_dir = Path(upload_dir or UPLOAD_DIR)
+    upload_dir.mkdir(parents=True, exist_ok=True)
+
+    declared = getattr(file, "size", None)
+    if declared is not None and declared > max_bytes:
+        raise UploadTooLarge(f"File is {declared} bytes; limit is {max_bytes}")
+
+    # temp file in the destination dir so the final move is an atomic rename
+    fd, tmp_name = tempfile.mkstemp(dir=upload_dir, prefix=".upload-", suffix=".part")
+    tmp_path = Path(tmp_name)
+    hasher = hashlib.sha256()
+    total = 0
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = await file.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                total += len(chunk)
+                if total > max_bytes:
+                    raise UploadTooLarge(f"File exceeds the {max_bytes} byte limit")
+                hasher.update(chunk)
+                await run_in_threadpool(out.write, chunk)
+        if total == 0:
+            raise UnsupportedUpload("Empty upload")
+
+        digest = hasher.hexdigest()
+        dest, mime, width, height, dedup = await run_in_threadpool(_commit_upload, tmp_path, digest, upload_dir)
+    except BaseException:
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+        raise
+
+    return StoredUpload(
+        file_id=digest,
+        path=dest,
+        sha256=digest,
+        size_bytes=total,
+        mime_type=mime,
+        width=width,
+        height=height,
+        deduplicated=dedup,
+    )
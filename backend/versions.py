@@ -0,0 +1,209 @@
+# backend/versions.py
+import json
+import threading
+import zlib
+from datetime import datetime
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from sqlalchemy.exc import IntegrityError
+
+from .config import CANVAS_SNAPSHOT_EVERY, CANVAS_VERSION_CACHE_SIZE
+from .db import CanvasVersion, SessionLocal, init_db
+from .utils.cache import LRUCache
+from .utils.jsonpatch import apply_patch, make_patch
+
+
+class VersionInfo(NamedTuple):
+    canvas_id: str
+    version: int
+    kind: str  # "snapshot" | "delta"
+    size_bytes: int
+    user_id: Optional[str]
+    created_at: Optional[datetime]
+
+
+def _dumps(obj: Any) -> str:
+    return json.dumps(obj, default=str, separators=(",", ":"), sort_keys=True)
+
+
+class CanvasVersionStore:
+    """
+    Canvas history in the canvas_versions table. Every `snapshot_every`-th
+    version is a full snapshot; the rest are JSON Patch deltas against the
+    previous version, so an edit costs roughly the size of what changed.
+    Rebuilding a version reads one snapshot plus at most snapshot_every - 1
+    deltas. Rebuilt documents are cached, since versions never change.
+    """
+
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        snapshot_every: int = CANVAS_SNAPSHOT_EVERY,
+        cache_size: int = CANVAS_VERSION_CACHE_SIZE,
+    ):
+        self._session_factory = session_factory
+        self.snapshot_every = max(1, snapshot_every)
+        self._docs = LRUCache(cache_size)  # (canvas_id, version) -> document
+        # saves of one canvas must not interleave; stripe locks by canvas id
+        self._locks = [threading.Lock() for _ in range(64)]
+        self._ready = False
+        self._ready_lock = threading.Lock()
+
+    def _ensure_table(self) -> None:
+        if self._ready:
+            return
+        with self._ready_lock:
+            if not self._ready:
+                init_db()
+                self._ready = True
+
+    def _lock_for(self, canvas_id: str) -> threading.Lock:
+        return self._locks[zlib.crc32(canvas_id.encode("utf-8")) % len(self._locks)]
+
+    @staticmethod
+    def _info(row) -> VersionInfo:
+        return VersionInfo(row.canvas_id, row.version, row.kind, row.size_bytes or 0, row.user_id, row.created_at)
+
+    def latest_version(self, canvas_id: str) -> Optional[int]:
+        self._ensure_table()
+        session = self._session_factory()
+        try:
+            row = (
+                session.query(CanvasVersion.version)
+                .filter(CanvasVersion.canvas_id == canvas_id)
+                .order_by(CanvasVersion.version.desc())
+                .first()
+            )
+            return row[0] if row is not None else None
+        finally:
+            session.close()
+
+    def save(self, canvas_id: str, doc: Dict[str, Any], user_id: Optional[str] = None) -> VersionInfo:
+        """
+        Store `doc` as the next version of `canvas_id`. Saving a document equal
+        to the latest version is a no-op that returns the latest version.
+        """
+        self._ensure_table()
+        doc = json.loads(_dumps(doc))  # normalise (e.g. datetimes) so cache == reconstruction
+        with self._lock_for(canvas_id):
+            for attempt in range(3):
+                latest = self.latest_version(canvas_id)
+                prev = self.get(canvas_id, latest) if latest is not None else None
+                if prev is not None and prev == doc:
+                    return self.list_versions(canvas_id, limit=1)[0]
+
+                version = (latest or 0) + 1
+                full = _dumps(doc)
+                kind, payload = "snapshot", full
+                if prev is not None and (version - 1) % self.snapshot_every != 0:
+                    delta = _dumps(make_patch(prev, doc))
+                    if len(delta) < len(full):
+                        kind, payload = "delta", delta
+
+                session = self._session_factory()
+                try:
+                    row = CanvasVersion(
+                        canvas_id=canvas_id,
+                        version=version,
+                        user_id=user_id,
+                        kind=kind,
+                        data=payload,
+                        size_bytes=len(payload),
+                    )
+                    session.add(row)
+                    session.commit()
+                    info = self._info(row)
+                except IntegrityError:
+                    # another process saved this version number first; rebase
+                    session.rollback()
+                    continue
+                finally:
+                    session.close()
+                self._docs.put((canvas_id, version), doc)
+                return info
+        raise RuntimeError(f"Could not save a new version of canvas {canvas_id}")
+
+    def list_versions(
+        self, canvas_id: str, limit: int = 50, before: Optional[int] = None
+    ) -> List[VersionInfo]:
+        """Version metadata, newest first. Never reads the stored documents."""
+        self._ensure_table()
+        session = self._session_factory()
+        try:
+            q = session.query(
+                CanvasVersion.canvas_id,
+                CanvasVersion.version,
+                CanvasVersion.kind,
+                CanvasVersion.size_bytes,
+                CanvasVersion.user_id,
+                CanvasVersion.created_at,
+            ).filter(CanvasVersion.canvas_id == canvas_id)
+            if before is not None:
+                q = q.filter(CanvasVersion.version < before)
+            rows = q.order_by(CanvasVersion.version.desc()).limit(max(1, limit)).all()
+            return [self._info(r) for r in rows]
+        finally:
+            session.close()
+
+    def get(self, canvas_id: str, version: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Rebuild a version (the latest if None); None if it doesn't exist."""
+        if version is None:
+            version = self.latest_version(canvas_id)
+            if version is None:
+                return None
+        cached = self._docs.get((canvas_id, version))
+        if cached is not None:
+            return cached
+
+        self._ensure_table()
+        session = self._session_factory()
+        try:
+            snap = (
+                session.query(CanvasVersion.version, CanvasVersion.data)
+                .filter(
+                    CanvasVersion.canvas_id == canvas_id,
+                    CanvasVersion.version <= version,
+                    CanvasVersion.kind == "snapshot",
+                )
+                .order_by(CanvasVersion.version.desc())
+                .first()
+            )
+            if snap is None:
+                return None
+
+            # start from the newest cached version after the snapshot, if any
+            base_version, doc = snap.version, None
+            for v in range(version - 1, snap.version, -1):
+                hit = self._docs.get((canvas_id, v))
+                if hit is not None:
+                    base_version, doc = v, hit
+                    break
+            if doc is None:
+                doc = json.loads(snap.data)
+                self._docs.put((canvas_id, snap.version), doc)
+
+            deltas = (
+                session.query(CanvasVersion.version, CanvasVersion.kind, CanvasVersion.data)
+                .filter(
+                    CanvasVersion.canvas_id == canvas_id,
+                    CanvasVersion.version > base_version,
+                    CanvasVersion.version <= version,
+                )
+                .order_by(CanvasVersion.version)
+                .all()
+            )
+        finally:
+            session.close()
+
+        if len(deltas) != version - base_version:
+            return None  # gap in the history (version never written)
+        for row in deltas:
+            doc = json.loads(row.data) if row.kind == "snapshot" else apply_patch(doc, json.loads(row.data))
+            self._docs.put((canvas_id, row.version), doc)
+        return doc
+
+    def stats(self) -> Dict[str, Any]:
+        return {"snapshot_every": self.snapshot_every, "documents": self._docs.stats()}
+
+
+canvas_versions = CanvasVersionStore()
@@ -0,0 +1,9 @@
+# tests/conftest.py
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# backend.config reads DATA_DIR at import; keep test data out of ./data
+os.environ.setdefault("DATA_DIR", tempfile.mkdtemp(prefix="adora-tests-"))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,51 @@
+# tests/test_audit_log.py
+import json
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from backend.utils.logging_utils import AuditSink
+
+
+def test_emit_returns_the_segment_the_record_lands_in():
+    with tempfile.TemporaryDirectory() as tmp:
+        # tiny segments: every couple of records starts a new file
+        sink = AuditSink(Path(tmp), prefix="t", max_bytes=120, fsync="never")
+        paths = [sink.emit({"i": i, "pad": "x" * 40}) for i in range(10)]
+        assert sink.flush(5.0)
+        sink.close()
+
+        assert sink.rotations > 0
+        assert len(set(paths)) > 1
+        for i, path in enumerate(paths):
+            assert path.is_file()
+            lines = [json.loads(l) for l in path.read_text().splitlines()]
+            assert {"i": i, "pad": "x" * 40} in lines
+
+
+def test_current_path_is_directory_before_first_record():
+    with tempfile.TemporaryDirectory() as tmp:
+        sink = AuditSink(Path(tmp), prefix="t")
+        assert sink.current_path() == Path(tmp)
+
+
+def test_blocked_producers_wait_in_parallel_not_behind_each_other():
+    with tempfile.TemporaryDirectory() as tmp:
+        sink = AuditSink(Path(tmp), prefix="t", queue_max=1, on_full="block", block_timeout_s=0.5)
+        sink._ensure_thread = lambda: None  # no writer: the queue stays full
+        assert sink.emit({"i": 0}) is not None
+
+        results = []
+        threads = [threading.Thread(target=lambda i=i: results.append(sink.emit({"i": i}))) for i in (1, 2)]
+        t0 = time.monotonic()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.monotonic() - t0
+
+        assert results == [None, None]
+        assert sink.blocked == 2 and sink.dropped == 2
+        assert elapsed < 0.9  # one block_timeout_s, not two back to back
+        assert sink.stats()["segment_bytes"] == len('{"i":0}\n')
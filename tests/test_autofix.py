@@ -0,0 +1,41 @@
+# tests/test_autofix.py
+import pytest
+from pydantic import ValidationError
+
+from backend.benchmarks.synthetic import make_canvas
+from backend.models.autofix import AutofixStrategy, ConstraintSolveStrategy
+from backend.schemas import AutoFixRequest
+
+
+def _request(**fields):
+    return AutoFixRequest(canvas=make_canvas("story", seed=1, n_blocks=2), **fields)
+
+
+@pytest.mark.parametrize("fields", [
+    {"beam_width": 10_000},
+    {"beam_width": 0},
+    {"time_budget_ms": None},
+    {"time_budget_ms": 0},
+    {"time_budget_ms": 600_000},
+])
+def test_autofix_request_rejects_unbounded_searches(fields):
+    with pytest.raises(ValidationError):
+        _request(**fields)
+
+
+def test_autofix_request_defaults_are_bounded():
+    req = _request()
+    assert req.beam_width == 4
+    assert req.time_budget_ms == 500
+
+
+def test_strategy_base_is_abstract():
+    with pytest.raises(TypeError):
+        AutofixStrategy()
+
+
+def test_solve_applies_limit_fixes_even_with_the_budget_spent():
+    canvas = make_canvas("story", seed=3, n_blocks=4, compliant=False)
+    fixed, validation, fixes = ConstraintSolveStrategy().run(canvas, time_budget_s=0)
+    assert fixes
+    assert not any(i.code in ("SAFE_ZONE_TOP", "FONT_TOO_SMALL") for i in validation.issues)
@@ -0,0 +1,18 @@
+# tests/test_cache.py
+import tempfile
+from pathlib import Path
+
+from backend.utils.cache import DiskCache
+
+
+def test_overwriting_a_key_does_not_double_count_bytes():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = DiskCache(Path(tmp), max_bytes=10_000)
+        cache.put("aa01", b"x" * 100)
+        cache.put("bb02", b"y" * 50)
+        for _ in range(200):
+            cache.put("aa01", b"z" * 300)
+
+        assert cache.stats()["bytes"] == 350
+        assert cache.evictions == 0
+        assert cache.get("bb02") == b"y" * 50
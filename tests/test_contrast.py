@@ -0,0 +1,47 @@
+# tests/test_contrast.py
+import hashlib
+import shutil
+
+from backend.benchmarks.synthetic import make_canvas, write_assets
+from backend.config import UPLOAD_DIR
+from backend.db import asset_index
+from backend.models.autofix import autofix
+from backend.rules import contrast
+from backend.rules.engine import run_rules
+from backend.utils.images import clear_image_cache
+
+
+def _builds():
+    return contrast.contrast_cache_stats()["builds"]
+
+
+def test_backdrop_table_is_built_once_across_validation_and_autofix():
+    assets = write_assets(UPLOAD_DIR, seed=11)
+    canvas = make_canvas("story", seed=2, background_id=assets["backgrounds"][0], packshot_ids=assets["packshots"])
+    clear_image_cache()
+    before = _builds()
+
+    run_rules(canvas)
+    run_rules(canvas)
+    autofix(canvas, "solve")
+    autofix(canvas, "beam")
+    run_rules(canvas)
+
+    assert _builds() == before + 1
+
+
+def test_same_content_under_another_id_shares_the_table():
+    assets = write_assets(UPLOAD_DIR, seed=12, n_packshots=0)
+    src = UPLOAD_DIR / f"{assets['backgrounds'][0]}.jpg"
+    digest = hashlib.sha256(src.read_bytes()).hexdigest()
+    copy = UPLOAD_DIR / "reupload-bg.jpg"
+    shutil.copy(src, copy)
+    asset_index.register(assets["backgrounds"][0], src, sha256=digest)
+    asset_index.register("reupload-bg", copy, sha256=digest)
+    clear_image_cache()
+    before = _builds()
+
+    run_rules(make_canvas("story", seed=2, background_id=assets["backgrounds"][0], packshot_ids=[]))
+    run_rules(make_canvas("story", seed=3, background_id="reupload-bg", packshot_ids=[]))
+
+    assert _builds() == before + 1
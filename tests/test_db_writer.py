@@ -0,0 +1,41 @@
+# tests/test_db_writer.py
+import threading
+import time
+
+from backend.db import WriteBehindQueue
+
+
+def test_flush_times_out_instead_of_blocking_on_a_full_queue():
+    release = threading.Event()
+
+    class _StuckSession:
+        def merge(self, obj):
+            pass
+
+        def add(self, obj):
+            pass
+
+        def commit(self):
+            release.wait(5)  # writer stuck in a slow commit
+
+        def rollback(self):
+            pass
+
+        def close(self):
+            pass
+
+    class _Row:
+        def __init__(self, **values):
+            pass
+
+    writer = WriteBehindQueue(session_factory=_StuckSession, batch_size=1, interval_s=0, queue_max=1)
+    writer.submit(_Row, {"n": 0})   # picked up by the writer, which then blocks
+    time.sleep(0.1)
+    writer.submit(_Row, {"n": 1})   # fills the queue
+
+    t0 = time.monotonic()
+    assert writer.flush(timeout=0.2) is False
+    assert time.monotonic() - t0 < 1.0
+
+    release.set()
+    assert writer.flush(timeout=5) is True
@@ -0,0 +1,43 @@
+# tests/test_images.py
+import pytest
+
+from backend.benchmarks.synthetic import make_background, make_packshot
+from backend.utils.images import encode_with_size_limit
+
+
+def _feed_image():
+    img = make_background((1080, 1080), seed=5)
+    img.alpha_composite(make_packshot((600, 600), seed=1), (240, 240))
+    return img
+
+
+@pytest.mark.parametrize(
+    "img, fmt, max_bytes",
+    [
+        (make_background((1080, 1920), seed=3), "JPEG", 500 * 1024),
+        (make_background((1080, 1920), seed=3), "JPEG", 150 * 1024),
+        (make_background((1080, 1920), seed=3), "WEBP", 500 * 1024),
+        (_feed_image(), "JPEG", 150 * 1024),
+        (_feed_image(), "JPEG", 60 * 1024),
+        (_feed_image(), "WEBP", 150 * 1024),
+    ],
+)
+def test_lossy_encode_fits_in_few_attempts(img, fmt, max_bytes):
+    res = encode_with_size_limit(img, fmt, max_bytes)
+    assert res.nbytes <= max_bytes
+    assert res.nbytes >= max_bytes * 0.6  # not needlessly degraded
+    assert len(res.attempts) <= 4
+
+
+def test_image_under_budget_is_encoded_once():
+    res = encode_with_size_limit(_feed_image(), "JPEG", 2 * 1024 ** 2)
+    assert res.quality == 95
+    assert len(res.attempts) == 1
+
+
+def test_png_fallback_to_jpeg_counts_probe_plus_lossy_search():
+    res = encode_with_size_limit(make_background((1080, 1920), seed=3), "PNG", 500 * 1024)
+    assert res.format == "JPEG"
+    assert res.nbytes <= 500 * 1024
+    full_size = [a for a in res.attempts if a[2] == (1080, 1920)]
+    assert len(full_size) <= 4  # the quarter-scale PNG probe aside
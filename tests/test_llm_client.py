@@ -0,0 +1,86 @@
+# tests/test_llm_client.py
+import asyncio
+import json
+import re
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+from backend.models.llm_client import ComplianceClient
+from backend.utils.cache import DiskCache
+
+
+class _StubOllama(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so connection reuse is observable
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.calls.append(payload)
+        self.server.client_ports.add(self.client_address[1])
+        if payload.get("format") == "json":
+            ids = [int(i) for i in re.findall(r"^\[(\d+)\]", payload["prompt"], re.M)]
+            answer = json.dumps({"results": [{"id": i, "issues": [f"item {i}"]} for i in ids]})
+        else:
+            answer = "- competition claim"
+        body = json.dumps({"response": answer}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubOllama)
+    server.calls, server.client_ports = [], set()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def client(stub):
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"http://127.0.0.1:{stub.server_address[1]}/api/generate"
+        yield ComplianceClient(url=url, disk_cache=DiskCache(Path(tmp), 1 << 20, suffix=".json"))
+
+
+def test_check_makes_one_call_and_caches(stub, client):
+    assert client.check(["Win a TV"]) == ["competition claim"]
+    assert client.check(["  win a tv "]) == ["competition claim"]  # normalized cache hit
+    assert len(stub.calls) == 1
+
+
+def test_check_batch_sends_one_prompt_for_all_misses(stub, client):
+    client.check(["Cached headline"])
+    items = [["Win a TV"], ["Guaranteed fresh"], ["win a tv"], ["Cached headline"], [""]]
+    results = client.check_batch(items)
+
+    assert len(stub.calls) == 2
+    assert stub.calls[-1]["format"] == "json"
+    assert results[0] == results[2]
+    assert results[3] == ["competition claim"]
+    assert results[4] == []
+
+
+def test_sequential_calls_reuse_one_connection(stub, client):
+    for i in range(5):
+        client.check([f"headline {i}"])
+    client.check_batch([["a"], ["b"]])
+    assert len(stub.calls) == 6
+    assert len(stub.client_ports) == 1
+
+
+def test_acheck_many_sends_duplicates_once(stub, client):
+    results = asyncio.run(client.acheck_many([["Win a TV"], ["Eco range"], ["win a TV"]]))
+    assert len(stub.calls) == 2
+    assert results[0] == results[2]
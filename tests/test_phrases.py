@@ -0,0 +1,36 @@
+# tests/test_phrases.py
+import pytest
+
+from backend.rules.phrases import PhraseMatcher
+from backend.rules.presets import DEFAULT_BANNED_PHRASES
+
+matcher = PhraseMatcher(DEFAULT_BANNED_PHRASES)
+
+
+@pytest.mark.parametrize("text, phrase", [
+    ("Win a holiday", "win"),
+    ("Two lucky wins", "win"),
+    ("Winning offer", "win"),
+    ("Every winner gets one", "win"),
+    ("Guaranteed results", "guarantee"),
+    ("Our Eco Friendly range", "eco-friendly"),
+    ("carbon-neutral delivery", "carbon neutral"),
+    ("Prizes inside", "prize"),
+])
+def test_inflections_are_flagged(text, phrase):
+    assert phrase in matcher.find(text)
+
+
+@pytest.mark.parametrize("text", [
+    "windproof wind jacket",
+    "Fine wines on offer",
+    "New window display",
+    "Wined and dined",
+    "Freedom to choose",
+])
+def test_other_words_sharing_a_prefix_are_not_flagged(text):
+    assert matcher.find(text) == []
+
+
+def test_longer_phrase_wins():
+    assert PhraseMatcher(["carbon", "carbon neutral"]).find("Carbon neutral by 2030") == ["carbon neutral"]
@@ -0,0 +1,40 @@
+# tests/test_pipeline_manager.py
+import sys
+import types
+
+from backend.models.image_gen import PipelineManager
+
+
+class _FakePipe:
+    def __call__(self, *args, **kwargs):
+        return types.SimpleNamespace(images=[])
+
+
+def _manager(monkeypatch, pool_size=2):
+    fake = types.ModuleType("optimum.onnxruntime")
+    fake.ORTStableDiffusionPipeline = types.SimpleNamespace(from_pretrained=lambda *a, **k: _FakePipe())
+    monkeypatch.setitem(sys.modules, "optimum.onnxruntime", fake)
+    mgr = PipelineManager("fake-model", pool_size=pool_size)
+    monkeypatch.setattr(mgr, "available", lambda: True)
+    return mgr
+
+
+def test_pipe_borrowed_before_reset_is_not_returned_to_new_pool(monkeypatch):
+    mgr = _manager(monkeypatch)
+    assert mgr.load(warmup=False)
+
+    with mgr.acquire() as stale:
+        mgr.reset()
+        assert mgr.load(warmup=False)
+    fresh = [mgr._pool.get_nowait() for _ in range(mgr._pool.qsize())]
+
+    assert len(fresh) == mgr.pool_size
+    assert all(p is not stale for p in fresh)
+
+
+def test_release_returns_pipe_within_same_generation(monkeypatch):
+    mgr = _manager(monkeypatch)
+    assert mgr.load(warmup=True)
+    with mgr.acquire():
+        assert mgr.status()["idle"] == 1
+    assert mgr.status()["idle"] == 2
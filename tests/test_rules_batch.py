@@ -0,0 +1,32 @@
+# tests/test_rules_batch.py
+from backend.benchmarks.synthetic import make_canvas
+from backend.rules.batch import run_rules_batch
+from backend.rules.engine import run_rules
+
+
+def _codes(result):
+    return sorted(i.code for i in result.issues if i.code != "LOW_CONTRAST")
+
+
+def test_warning_only_canvas_passes_like_run_rules():
+    canvas = make_canvas("story", seed=1, n_blocks=2)
+    canvas.text_blocks[0].text = "Win a guaranteed prize"
+    canvas.text_blocks[0].color = "#000000"
+
+    single = run_rules(canvas)
+    batched = run_rules_batch([canvas])[0]
+
+    assert "BANNED_PHRASE" in _codes(batched)
+    assert not any(i.severity == "error" for i in batched.issues)
+    assert batched.passed is True
+    assert batched.passed == single.passed
+    assert _codes(batched) == _codes(single)
+
+
+def test_batch_matches_run_rules_on_mixed_canvases():
+    canvases = [make_canvas(fmt, seed=s, n_blocks=3, compliant=s % 2 == 0)
+                for fmt in ("story", "feed", "banner") for s in range(4)]
+    canvases[1].text_blocks[0].text = "eco-friendly and carbon neutral"
+    for single, batched in zip(map(run_rules, canvases), run_rules_batch(canvases)):
+        assert batched.passed == single.passed
+        assert _codes(batched) == _codes(single)
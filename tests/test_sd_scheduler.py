@@ -0,0 +1,84 @@
+# tests/test_sd_scheduler.py
+import threading
+import time
+
+import pytest
+
+from backend.models import image_gen, sd_client
+from backend.models.sd_scheduler import GenerationScheduler, GenerationTimeout
+
+
+def _recording_runner(delay_s):
+    sizes = []
+    lock = threading.Lock()
+
+    def runner(prompts, steps, guidance, seed):
+        with lock:
+            sizes.append(len(prompts))
+        time.sleep(delay_s)
+        return [None] * len(prompts)
+
+    return runner, sizes
+
+
+def test_requests_arriving_during_a_run_are_merged():
+    runner, sizes = _recording_runner(0.25)
+    sched = GenerationScheduler(runner, window_s=0.01, max_batch=4, max_concurrent=1)
+    futures = []
+    for i in range(8):
+        futures.append(sched.submit(f"prompt {i}", 20, 7.5))
+        time.sleep(0.05)
+    for f in futures:
+        f.result(timeout=5)
+
+    assert sum(sizes) == 8
+    assert sizes[0] == 1  # nothing else was waiting yet
+    assert max(sizes) == 4  # the backlog became a full batch
+    assert len(sizes) <= 4
+
+
+def test_seeded_and_mismatched_requests_are_not_batched_together():
+    runner, sizes = _recording_runner(0.0)
+    sched = GenerationScheduler(runner, window_s=0.05, max_batch=8, max_concurrent=1)
+    futures = [
+        sched.submit("a", 20, 7.5),
+        sched.submit("b", 20, 7.5, seed=1),
+        sched.submit("c", 30, 7.5),
+        sched.submit("d", 20, 7.5),
+    ]
+    for f in futures:
+        f.result(timeout=5)
+    assert sorted(sizes) == [1, 1, 2]
+
+
+def test_identical_requests_share_a_future():
+    runner, sizes = _recording_runner(0.0)
+    sched = GenerationScheduler(runner, window_s=0.05)
+    assert sched.submit("same", 20, 7.5) is sched.submit("same", 20, 7.5)
+
+
+def test_generate_times_out_on_a_hung_batch():
+    release = threading.Event()
+
+    def hung_runner(prompts, steps, guidance, seed):
+        release.wait(5)
+        return [None] * len(prompts)
+
+    sched = GenerationScheduler(hung_runner, window_s=0.0, max_batch=4, max_concurrent=1)
+    t0 = time.monotonic()
+    with pytest.raises(GenerationTimeout):
+        sched.generate("stuck", 20, 7.5, timeout=0.2)
+    assert time.monotonic() - t0 < 1.0
+    assert sched.stats()["timeouts"] == 1
+    release.set()
+
+
+def test_generation_timeout_reaches_the_render_path(monkeypatch):
+    def timed_out(*args, **kwargs):
+        raise GenerationTimeout("image generation took longer than 1s")
+
+    monkeypatch.setattr(image_gen.pipeline_manager, "available", lambda: True)
+    monkeypatch.setattr(image_gen.generation_scheduler, "generate", timed_out)
+    sd_client.clear_cache()
+    with pytest.raises(GenerationTimeout):
+        sd_client.generate_background("a hung prompt", size=(64, 64))
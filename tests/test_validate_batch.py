@@ -0,0 +1,54 @@
+# tests/test_validate_batch.py
+import pytest
+
+from backend.benchmarks.synthetic import make_canvas
+from backend.rules.batch import BatchInputError, check_raw_canvases, validate_catalog
+from backend.rules.engine import run_rules
+
+
+def test_validate_catalog_reports_the_same_issues_as_run_rules():
+    canvases = [make_canvas("story", seed=s, n_blocks=3, compliant=s % 2 == 0) for s in range(6)]
+    canvases[0].text_blocks[0].text = "Win a guaranteed prize"
+    summary = validate_catalog([c.dict() for c in canvases])
+
+    by_id = {r["canvas_id"]: r for r in summary["results"]}
+    for canvas in canvases:
+        single = run_rules(canvas)
+        codes = sorted(i.code for i in single.issues if i.code != "LOW_CONTRAST")
+        result = by_id.get(canvas.id, {"issues": [], "passed": True})
+        assert sorted(i["code"] for i in result["issues"]) == codes
+        assert result["passed"] == single.passed
+    assert summary["failed"] == sum(not run_rules(c).passed for c in canvases)
+
+
+@pytest.mark.parametrize("patch, field", [
+    (lambda c: c["text_blocks"].__setitem__(0, ["oops"]), "canvases[1].text_blocks[0]"),
+    (lambda c: c["text_blocks"][0].__setitem__("y", 1e30), "canvases[1].text_blocks[0].y"),
+    (lambda c: c["text_blocks"][0].__setitem__("font_size", "big"), "canvases[1].text_blocks[0].font_size"),
+    (lambda c: c.__setitem__("packshot_ids", "p1"), "canvases[1].packshot_ids"),
+    (lambda c: c.pop("id"), "canvases[1].id"),
+])
+def test_malformed_raw_canvas_names_index_and_field(patch, field):
+    canvases = [make_canvas("story", seed=s, n_blocks=2).dict() for s in range(2)]
+    patch(canvases[1])
+    with pytest.raises(BatchInputError) as exc:
+        check_raw_canvases(canvases)
+    assert str(exc.value).startswith(field + ":")
+
+
+def test_validate_batch_endpoint_rejects_malformed_input_with_422():
+    from fastapi.testclient import TestClient
+
+    from backend.main import app
+
+    good = make_canvas("story", seed=1, n_blocks=2).dict()
+    bad = make_canvas("story", seed=2, n_blocks=2).dict()
+    bad["text_blocks"][1]["y"] = 1e30
+    with TestClient(app) as client:
+        ok = client.post("/validate/batch", json={"canvases": [good]})
+        resp = client.post("/validate/batch", json={"canvases": [good, bad]})
+        missing = client.post("/validate/batch", json={"items": []})
+    assert ok.status_code == 200
+    assert resp.status_code == 422
+    assert "canvases[1].text_blocks[1].y" in resp.json()["detail"]
+    assert missing.status_code == 422